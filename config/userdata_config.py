@@ -140,8 +140,9 @@ PANEL_PARAMS = {
 PANEL_PARAMS['max_panels_by_area'] = int(
     PANEL_PARAMS['available_roof_area_m2'] // PANEL_PARAMS['panel_area_m2']
 )
+# STC rating of the panels that fit: covered area x efficiency at 1 kW/m2.
 PANEL_PARAMS['max_power_by_area_kw'] = round(
-    PANEL_PARAMS['max_panels_by_area'] * PANEL_PARAMS['panel_power_kw'], 2
+    PANEL_PARAMS['max_panels_by_area'] * PANEL_PARAMS['panel_area_m2'] * PANEL_PARAMS['panel_efficiency'], 2
 )
 
 LOSS_PARAMS = {
@@ -163,11 +164,21 @@ ECON_PARAMS = {
     'sell_back_rate': 0.10,
     'incentive_rate': 0.12,
     'annual_rate_increase': 0.03,
+    'annual_rate_volatility': 0.015,
     'household_consumption': 2700,
     'analysis_years': 25,
     'discount_rate': 0.02,
 }
 
+# mode: 'flat' prices every kWh at electricity_rate / sell_back_rate, 'bands' uses the ARERA
+# F1/F2/F3 time bands below and 'curve' reads hourly euro/kWh prices from price_curve_file.
+TARIFF_PARAMS = {
+    'mode': _get_env('TARIFF_MODE', 'flat'),
+    'import_band_rates': {'F1': 0.34, 'F2': 0.30, 'F3': 0.26},
+    'export_band_rates': {'F1': 0.11, 'F2': 0.10, 'F3': 0.09},
+    'price_curve_file': _get_env('TARIFF_PRICE_CURVE_FILE', ''),
+}
+
 SELF_CONSUMPTION_PERC = {
     'ten': 0.1,
     'twenty': 0.2,
@@ -215,6 +226,18 @@ SIMULATION_PARAMS = {
     'albedo': 0.20,
     'nominal_operating_cell_temp_c': 45.0,
     'site_calibration_factor': 0.84,
+    'noise_mode': 'sha256',
+    'cache_dir': _get_env('SIMULATION_CACHE_DIR', ''),
+    'cache_max_mb': _get_int_env('SIMULATION_CACHE_MAX_MB', 512),
+    'monte_carlo_draws': _get_int_env('SIMULATION_MONTE_CARLO_DRAWS', 0),
+    # None draws weather years from the simulation seed; vary_rates also samples the electricity price path.
+    'monte_carlo_seed': _get_int_env('SIMULATION_MONTE_CARLO_SEED', None),
+    'monte_carlo_vary_rates': bool(_get_int_env('SIMULATION_MONTE_CARLO_VARY_RATES', 0)),
+    # 'npy' writes memory-mappable column files; 'parquet' is an opt-in zstd export that needs pyarrow.
+    'artifact_format': _get_env('SIMULATION_ARTIFACT_FORMAT', 'npy'),
+    'export_csv': _get_int_env('SIMULATION_EXPORT_CSV', 0),
+    # Stage fingerprints and intermediate outputs used to skip unchanged stages on the next run.
+    'build_dir': _get_env('SIMULATION_BUILD_DIR', ''),
 }
 
 LOAD_PROFILE_PARAMS = {
@@ -223,4 +246,84 @@ LOAD_PROFILE_PARAMS = {
     'evening_peak_kw': 0.85,
     'winter_bias': 0.10,
     'weekend_bias': 0.06,
+    'midday_peak_kw': 0.16,
+}
+
+# Household archetypes share the peak shapes of LOAD_PROFILE_PARAMS (the commuter default) and
+# differ in how much load sits in each peak and how strongly it follows the heating season.
+LOAD_ARCHETYPE_PARAMS = {
+    'commuter': LOAD_PROFILE_PARAMS,
+    'home_office': {
+        'base_load_kw': 0.20,
+        'morning_peak_kw': 0.35,
+        'evening_peak_kw': 0.70,
+        'winter_bias': 0.14,
+        'weekend_bias': 0.02,
+        'midday_peak_kw': 0.45,
+    },
+    'retired': {
+        'base_load_kw': 0.20,
+        'morning_peak_kw': 0.40,
+        'evening_peak_kw': 0.60,
+        'winter_bias': 0.18,
+        'weekend_bias': 0.0,
+        'midday_peak_kw': 0.50,
+    },
+    'electric_heating': {
+        'base_load_kw': 0.22,
+        'morning_peak_kw': 0.75,
+        'evening_peak_kw': 1.00,
+        'winter_bias': 0.55,
+        'weekend_bias': 0.06,
+        'midday_peak_kw': 0.20,
+    },
+}
+
+# Per-household variation for portfolio runs: peaks move by up to peak_shift_hours and each
+# hour is scaled by a normal factor with standard deviation hourly_sigma.
+LOAD_JITTER_PARAMS = {
+    'peak_shift_hours': 0.75,
+    'hourly_sigma': 0.15,
+}
+
+# Flexible consumers on top of household_consumption; each runs at max_power_kw from
+# baseline_start_hour when unscheduled and may be moved anywhere inside [window_start, window_end).
+DEFERRABLE_LOAD_PARAMS = {
+    'heat_pump_water_heater': {
+        'daily_energy_kwh': 1.5,
+        'max_power_kw': 0.8,
+        'window_start_hour': 0,
+        'window_end_hour': 24,
+        'baseline_start_hour': 18,
+    },
+    'ev_charger': {
+        'daily_energy_kwh': 3.0,
+        'max_power_kw': 2.3,
+        'window_start_hour': 8,
+        'window_end_hour': 24,
+        'baseline_start_hour': 19,
+    },
+    'appliances': {
+        'daily_energy_kwh': 0.9,
+        'max_power_kw': 1.0,
+        'window_start_hour': 8,
+        'window_end_hour': 22,
+        'baseline_start_hour': 20,
+    },
+}
+
+# Local what-if service for the dashboard; cache_entries bounds the LRU of answered queries.
+SCENARIO_SERVICE_PARAMS = {
+    'host': _get_env('SCENARIO_SERVICE_HOST', '127.0.0.1'),
+    'port': _get_int_env('SCENARIO_SERVICE_PORT', 8765),
+    'cache_entries': _get_int_env('SCENARIO_SERVICE_CACHE_ENTRIES', 256),
+    # The dashboard dev server (`next dev -p 3001`); override to serve another origin.
+    'allow_origin': _get_env('SCENARIO_SERVICE_ALLOW_ORIGIN', 'http://localhost:3001'),
+}
+
+# Dense metric cube (tariff x size x self-consumption share) written for client-side interpolation;
+# the build fails rather than ship a cube larger than max_kb.
+SCENARIO_CUBE_PARAMS = {
+    'size_step_kw': 0.25,
+    'max_kb': _get_int_env('SCENARIO_CUBE_MAX_KB', 256),
 }
@@ -1,3 +1,4 @@
+import DecisionWorkbench from "../components/decision-workbench";
 import {
   formatCompactNumber,
   formatCurrency,
@@ -480,10 +481,12 @@ function SeasonalityChart({ data }: { data: MonthlySummary[] }) {
 
 function CashFlowChart({
   current,
-  optimal
+  optimal,
+  optimalLabel
 }: {
   current: ScenarioMetrics;
   optimal: ScenarioMetrics;
+  optimalLabel: string;
 }) {
   const values = [...current.cumulative, ...optimal.cumulative];
   const minValue = Math.min(...values);
@@ -528,7 +531,7 @@ function CashFlowChart({
         </span>
         <span>
           <i className="legend-swatch optimal" />
-          Best tested size
+          {optimalLabel}
         </span>
       </div>
     </article>
@@ -841,6 +844,7 @@ function StructureSection() {
 function AnalysisSection({
   current,
   optimal,
+  optimalLabel,
   strengths,
   concerns,
   monthlySummary,
@@ -848,6 +852,7 @@ function AnalysisSection({
 }: {
   current: ScenarioMetrics;
   optimal: ScenarioMetrics;
+  optimalLabel: string;
   strengths: string[];
   concerns: string[];
   monthlySummary: MonthlySummary[];
@@ -869,7 +874,7 @@ function AnalysisSection({
           emphasis="neutral"
         />
         <ScenarioCard
-          title="Best tested size"
+          title={optimalLabel}
           caption="The sizing sweep is useful in the portfolio because it shows how the project moves from simulation into real trade-off analysis."
           scenario={optimal}
           emphasis="highlight"
@@ -882,9 +887,11 @@ function AnalysisSection({
       </div>
 
       <div className="analysis-grid wide">
-        <CashFlowChart current={current} optimal={optimal} />
+        <CashFlowChart current={current} optimal={optimal} optimalLabel={optimalLabel} />
         <SensitivityTable rows={sensitivity} />
       </div>
+
+      <DecisionWorkbench current={current} optimal={optimal} sensitivity={sensitivity} />
     </section>
   );
 }
@@ -893,6 +900,8 @@ export default function HomePage() {
   const summary = getAnalysisSummary();
   const current = summary.current_system;
   const optimal = summary.optimal_system;
+  // A search that stopped on a bound found the best allowed size, not a turning point.
+  const optimalLabel = summary.size_search?.at_bound ? "Best size within limits" : "Optimal size";
   const dagSteps = getDagSteps();
   const stackItems = getStackItems();
   const dataProducts = getDataProducts();
@@ -1020,6 +1029,7 @@ export default function HomePage() {
       <AnalysisSection
         current={current}
         optimal={optimal}
+        optimalLabel={optimalLabel}
         strengths={summary.strengths}
         concerns={summary.concerns}
         monthlySummary={summary.monthly_summary}
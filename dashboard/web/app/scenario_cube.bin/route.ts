@@ -0,0 +1,19 @@
+import fs from "node:fs/promises";
+import path from "node:path";
+
+// Served straight from the analysis output so the dashboard always reads the cube the last run built.
+const CUBE_PATH = path.join(process.cwd(), "..", "..", "solar_analysis_data", "notebooks_output", "scenario_cube.bin");
+
+export async function GET(): Promise<Response> {
+  try {
+    const cube = await fs.readFile(CUBE_PATH);
+    return new Response(cube, {
+      headers: {
+        "Content-Type": "application/octet-stream",
+        "Cache-Control": "no-cache"
+      }
+    });
+  } catch {
+    return new Response("Scenario cube not built; run solar_analysis_data/reliable_analysis.py", { status: 404 });
+  }
+}
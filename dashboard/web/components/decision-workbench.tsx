@@ -1,6 +1,8 @@
 "use client";
 
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
+import { interpolateScenario, loadScenarioCube, modelledSelfConsumption, type ScenarioCube } from "../lib/scenario-cube";
+import { fetchScenario, type ScenarioResult } from "../lib/scenario-service";
 import {
   formatCurrency,
   formatDecimal,
@@ -396,6 +398,163 @@ function recommendationTone(priority: Priority): {
   };
 }
 
+function ScenarioExplorer({ initialSizeKw }: { initialSizeKw: number }) {
+  const [cube, setCube] = useState<ScenarioCube | null>(null);
+  const [cubeError, setCubeError] = useState<string | null>(null);
+  const [tariff, setTariff] = useState("flat");
+  const [sizeKw, setSizeKw] = useState(initialSizeKw);
+  const [share, setShare] = useState<number | null>(null);
+  const [checked, setChecked] = useState<ScenarioResult | null>(null);
+  const [checkError, setCheckError] = useState<string | null>(null);
+  const [checking, setChecking] = useState(false);
+
+  // The cube is fetched once; every slider move after that is a local interpolation.
+  useEffect(() => {
+    let active = true;
+    loadScenarioCube()
+      .then((loaded) => {
+        if (active) {
+          setCube(loaded);
+          setTariff(loaded.tariffs.includes("flat") ? "flat" : loaded.tariffs[0]);
+        }
+      })
+      .catch((error: Error) => {
+        if (active) {
+          setCubeError(error.message);
+        }
+      });
+    return () => {
+      active = false;
+    };
+  }, []);
+
+  const point = useMemo(
+    () => (cube ? interpolateScenario(cube, tariff, sizeKw, share ?? undefined) : null),
+    [cube, tariff, sizeKw, share]
+  );
+
+  // A service answer only describes the size and tariff it was asked about.
+  useEffect(() => {
+    setChecked(null);
+    setCheckError(null);
+  }, [sizeKw, tariff]);
+
+  function checkWithService() {
+    setChecking(true);
+    fetchScenario({ sizeKw, tariff })
+      .then((result) => setChecked(result))
+      .catch((error: Error) =>
+        setCheckError(`${error.message}. Start it with python solar_analysis_data/scenario_service.py`)
+      )
+      .finally(() => setChecking(false));
+  }
+
+  if (!cube || !point) {
+    return (
+      <div className="scenario-explorer">
+        <span className="eyebrow">Scenario explorer</span>
+        <p>{cubeError ?? "Loading the precomputed scenario cube..."}</p>
+      </div>
+    );
+  }
+
+  const sizes = cube.sizesKw;
+  const shares = cube.selfConsumption;
+  const activeShare = share ?? modelledSelfConsumption(cube, sizeKw);
+
+  return (
+    <div className="scenario-explorer">
+      <div className="workbench-head">
+        <span className="eyebrow">Scenario explorer</span>
+        <h3>Move size, tariff and self-consumption and read the economics instantly</h3>
+        <p>
+          Values are interpolated in the browser from the scenario cube built by the reliable analysis, so they track
+          the hourly model closely without another simulation run.
+        </p>
+      </div>
+
+      <div className="control-grid">
+        <div className="control-group">
+          <span className="control-label">System size: {formatDecimal(sizeKw, 2)} kWp</span>
+          <input
+            type="range"
+            min={sizes[0]}
+            max={sizes[sizes.length - 1]}
+            step={0.05}
+            value={sizeKw}
+            onChange={(event) => setSizeKw(Number(event.target.value))}
+          />
+        </div>
+
+        <div className="control-group">
+          <span className="control-label">Self-consumption: {formatDecimal(activeShare * 100, 0)}%</span>
+          <input
+            type="range"
+            min={shares[0]}
+            max={shares[shares.length - 1]}
+            step={0.01}
+            value={activeShare}
+            onChange={(event) => setShare(Number(event.target.value))}
+          />
+          <button type="button" className="choice-chip" onClick={() => setShare(null)} disabled={share === null}>
+            Use the hourly model&apos;s share
+          </button>
+        </div>
+      </div>
+
+      <div className="control-group">
+        <span className="control-label">Tariff</span>
+        <div className="chip-row">
+          {cube.tariffs.map((item) => (
+            <button
+              key={item}
+              type="button"
+              className={`choice-chip ${tariff === item ? "active" : ""}`}
+              onClick={() => setTariff(item)}
+            >
+              {item}
+            </button>
+          ))}
+        </div>
+      </div>
+
+      <div className="decision-stats">
+        <div>
+          <span>25-year NPV</span>
+          <strong>{point.npv_25_years_euro === null ? "n/a" : formatCurrency(point.npv_25_years_euro)}</strong>
+        </div>
+        <div>
+          <span>Payback</span>
+          <strong>{point.payback_years === null ? "Not reached" : `${formatDecimal(point.payback_years, 1)} years`}</strong>
+        </div>
+        <div>
+          <span>Investment</span>
+          <strong>{formatCurrency(point.installation_cost_euro)}</strong>
+        </div>
+        <div>
+          <span>Year-one benefit</span>
+          <strong>{point.year_one_benefit_euro === null ? "n/a" : formatCurrency(point.year_one_benefit_euro)}</strong>
+        </div>
+      </div>
+
+      <div className="control-group">
+        <span className="control-label">Hourly model check</span>
+        <button type="button" className="choice-chip" onClick={checkWithService} disabled={checking}>
+          {checking ? "Asking the scenario service..." : "Check this size against the hourly model"}
+        </button>
+        {checked ? (
+          <p>
+            The local scenario service evaluates {formatDecimal(checked.panel_size_kw, 2)} kWp at{" "}
+            {formatCurrency(checked.npv_25_years_euro)} 25-year NPV with{" "}
+            {formatDecimal(checked.year_one.self_consumption_pct, 1)}% self-consumption (payback: {checked.payback_display}).
+          </p>
+        ) : null}
+        {checkError ? <p>{checkError}</p> : null}
+      </div>
+    </div>
+  );
+}
+
 export default function DecisionWorkbench({
   current,
   optimal,
@@ -694,6 +853,8 @@ export default function DecisionWorkbench({
             </div>
           </aside>
         </div>
+
+        <ScenarioExplorer initialSizeKw={current.panel_size_kw} />
       </div>
     </section>
   );
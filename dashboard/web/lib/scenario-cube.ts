@@ -0,0 +1,140 @@
+const CUBE_MAGIC = "SCUB";
+const CUBE_VERSION = 1;
+
+export type CubeMetric =
+  | "npv_25_years_euro"
+  | "roi_20_years"
+  | "net_profit_20_years_euro"
+  | "payback_years"
+  | "year_one_benefit_euro";
+
+export type ScenarioCube = {
+  tariffs: string[];
+  sizesKw: number[];
+  selfConsumption: number[];
+  annualProductionKwhPerKw: number;
+  annualLoadKwh: number;
+  installationCostPerKw: number;
+  modelledSelfConsumption: Float32Array;
+  metrics: Record<CubeMetric, Float32Array>;
+};
+
+export type CubePoint = Record<CubeMetric, number | null> & {
+  panel_size_kw: number;
+  self_consumption: number;
+  installation_cost_euro: number;
+  annual_production_kwh: number;
+};
+
+type CubeHeader = {
+  version: number;
+  dtype: string;
+  tariffs: string[];
+  sizes_kw: number[];
+  self_consumption: number[];
+  annual_production_kwh_per_kw: number;
+  annual_load_kwh: number;
+  installation_cost_per_kw: number;
+  arrays: { name: string; shape: number[]; offset: number }[];
+};
+
+export function parseScenarioCube(buffer: ArrayBuffer): ScenarioCube {
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, CUBE_MAGIC.length));
+  if (magic !== CUBE_MAGIC) {
+    throw new Error("Not a scenario cube");
+  }
+  const headerLength = new DataView(buffer).getUint32(CUBE_MAGIC.length, true);
+  const headerStart = CUBE_MAGIC.length + 4;
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, headerStart, headerLength))
+  ) as CubeHeader;
+  if (header.version !== CUBE_VERSION || header.dtype !== "<f4") {
+    throw new Error(`Unsupported scenario cube version ${header.version} (${header.dtype})`);
+  }
+
+  // The writer aligns the float32 block, so every array is a view on the fetched buffer.
+  const dataStart = headerStart + headerLength;
+  const arrays: Record<string, Float32Array> = {};
+  for (const entry of header.arrays) {
+    const count = entry.shape.reduce((product, length) => product * length, 1);
+    arrays[entry.name] = new Float32Array(buffer, dataStart + entry.offset, count);
+  }
+
+  const { modelled_self_consumption: modelledSelfConsumption, ...metrics } = arrays;
+  return {
+    tariffs: header.tariffs,
+    sizesKw: header.sizes_kw,
+    selfConsumption: header.self_consumption,
+    annualProductionKwhPerKw: header.annual_production_kwh_per_kw,
+    annualLoadKwh: header.annual_load_kwh,
+    installationCostPerKw: header.installation_cost_per_kw,
+    modelledSelfConsumption,
+    metrics: metrics as Record<CubeMetric, Float32Array>
+  };
+}
+
+export async function loadScenarioCube(url = "/scenario_cube.bin"): Promise<ScenarioCube> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Scenario cube request failed with ${response.status}`);
+  }
+  return parseScenarioCube(await response.arrayBuffer());
+}
+
+function bracket(axis: number[], value: number): [number, number] {
+  const clamped = Math.min(Math.max(value, axis[0]), axis[axis.length - 1]);
+  const upper = axis.findIndex((point) => point >= clamped);
+  if (upper <= 0) {
+    return [0, 0];
+  }
+  const lower = upper - 1;
+  return [lower, (clamped - axis[lower]) / (axis[upper] - axis[lower])];
+}
+
+function lerp(low: number, high: number, weight: number): number {
+  return weight === 0 ? low : low + (high - low) * weight;
+}
+
+export function modelledSelfConsumption(cube: ScenarioCube, sizeKw: number): number {
+  const [index, weight] = bracket(cube.sizesKw, sizeKw);
+  const next = Math.min(index + 1, cube.sizesKw.length - 1);
+  return lerp(cube.modelledSelfConsumption[index], cube.modelledSelfConsumption[next], weight);
+}
+
+export function interpolateScenario(
+  cube: ScenarioCube,
+  tariff: string,
+  sizeKw: number,
+  selfConsumption = modelledSelfConsumption(cube, sizeKw)
+): CubePoint {
+  const tariffIndex = cube.tariffs.indexOf(tariff);
+  if (tariffIndex < 0) {
+    throw new Error(`Unknown tariff ${tariff}; the cube has ${cube.tariffs.join(", ")}`);
+  }
+  const sizes = cube.sizesKw.length;
+  const shares = cube.selfConsumption.length;
+  const [sizeIndex, sizeWeight] = bracket(cube.sizesKw, sizeKw);
+  const [shareIndex, shareWeight] = bracket(cube.selfConsumption, selfConsumption);
+  const nextSize = Math.min(sizeIndex + 1, sizes - 1);
+  const nextShare = Math.min(shareIndex + 1, shares - 1);
+
+  // Bilinear over size and share inside one tariff slice; a payback that is not reached at a
+  // contributing corner (NaN) comes out as null rather than a made-up year.
+  const at = (values: Float32Array, size: number, share: number) =>
+    values[(tariffIndex * sizes + size) * shares + share];
+  const point = {} as Record<CubeMetric, number | null>;
+  for (const [name, values] of Object.entries(cube.metrics) as [CubeMetric, Float32Array][]) {
+    const low = lerp(at(values, sizeIndex, shareIndex), at(values, sizeIndex, nextShare), shareWeight);
+    const high = lerp(at(values, nextSize, shareIndex), at(values, nextSize, nextShare), shareWeight);
+    const value = lerp(low, high, sizeWeight);
+    point[name] = Number.isNaN(value) ? null : value;
+  }
+
+  return {
+    ...point,
+    panel_size_kw: sizeKw,
+    self_consumption: selfConsumption,
+    installation_cost_euro: sizeKw * cube.installationCostPerKw,
+    annual_production_kwh: sizeKw * cube.annualProductionKwhPerKw
+  };
+}
@@ -0,0 +1,50 @@
+import type { ScenarioMetrics } from "./shared";
+
+export type BatteryMetrics = {
+  battery_capacity_kwh: number;
+  panel_size_kw: number;
+  installation_cost_euro: number;
+  self_consumption_pct: number;
+  demand_coverage_pct: number;
+  npv_25_years_euro: number;
+  payback_years: number | null;
+};
+
+export type ScenarioQuery = {
+  sizeKw: number;
+  tariff?: string;
+  batteryKwh?: number;
+};
+
+export type ScenarioResult = ScenarioMetrics & {
+  tariff: string;
+  battery: BatteryMetrics | null;
+};
+
+const DEFAULT_SERVICE_URL = process.env.NEXT_PUBLIC_SCENARIO_SERVICE_URL ?? "http://127.0.0.1:8765";
+
+async function getJson<T>(url: string, signal?: AbortSignal): Promise<T> {
+  const response = await fetch(url, { signal });
+  const payload = await response.json();
+  if (!response.ok) {
+    throw new Error(payload.error ?? `Scenario service responded with ${response.status}`);
+  }
+  return payload as T;
+}
+
+export function fetchScenario(
+  query: ScenarioQuery,
+  options: { baseUrl?: string; signal?: AbortSignal } = {}
+): Promise<ScenarioResult> {
+  const params = new URLSearchParams({
+    size_kw: String(query.sizeKw),
+    tariff: query.tariff ?? "flat",
+    battery_kwh: String(query.batteryKwh ?? 0)
+  });
+  return getJson<ScenarioResult>(`${options.baseUrl ?? DEFAULT_SERVICE_URL}/scenario?${params}`, options.signal);
+}
+
+export async function fetchTariffs(baseUrl = DEFAULT_SERVICE_URL): Promise<string[]> {
+  const payload = await getJson<{ tariffs: string[] }>(`${baseUrl}/tariffs`);
+  return payload.tariffs;
+}
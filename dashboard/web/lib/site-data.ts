@@ -26,6 +26,11 @@ export type AnalysisSummary = {
   current_system: ScenarioMetrics;
   optimal_system: ScenarioMetrics;
   sensitivity: SensitivityRow[];
+  size_search?: {
+    bounds_kw: [number, number];
+    at_bound: boolean;
+    evaluations: number;
+  };
   monthly_summary: MonthlySummary[];
   score: number;
   verdict: string;
@@ -13,7 +13,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
 from config import userdata_config as cfg
-from solar_analysis_data.turin_model import TurinSimulationConfig, build_live_panel_event
+from solar_analysis_data.turin_model import TurinSimulationConfig, build_fleet_events, build_live_panel_event
 
 KAFKA_CONF = {
     'bootstrap.servers': cfg.KAFKA_CONFIG['bootstrap.servers'],
@@ -46,9 +46,7 @@ def get_producer():
     return producer
 
 
-def generate_solar_event(panel_id):
-    simulated = build_live_panel_event(panel_id=panel_id, config=SIM_CONFIG)
-
+def to_kafka_event(simulated):
     return {
         "event_id": str(uuid.uuid4()),
         "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -64,6 +62,29 @@ def generate_solar_event(panel_id):
     }
 
 
+def generate_solar_event(panel_id):
+    simulated = build_live_panel_event(panel_id=panel_id, config=SIM_CONFIG)
+    return to_kafka_event(simulated)
+
+
+def generate_fleet_events(panel_ids=PANEL_IDS):
+    return [to_kafka_event(simulated) for simulated in build_fleet_events(panel_ids, config=SIM_CONFIG)]
+
+
+def send_event(active_producer, event):
+    # A batch is simulated once but sent over several seconds, so each event is stamped when it
+    # is actually produced rather than when the batch was built.
+    event = {**event, "timestamp": datetime.now(timezone.utc).isoformat()}
+    active_producer.produce(
+        topic=TOPIC,
+        key=event["panel_id"],
+        value=json.dumps(event),
+        callback=delivery_report,
+    )
+    active_producer.poll(0)
+    return event
+
+
 def main():
     print(" Solar Panel Data Producer Started")
     print(f"   City: {CITY}")
@@ -75,19 +96,9 @@ def main():
     try:
         active_producer = get_producer()
         while True:
-            for panel_id in PANEL_IDS:
-                event = generate_solar_event(panel_id)
-                message = json.dumps(event)
-
-                active_producer.produce(
-                    topic=TOPIC,
-                    key=panel_id,
-                    value=message,
-                    callback=delivery_report,
-                )
-                active_producer.poll(0)
-
-                print(f"Sent: {panel_id} - {event['production_kw']} kW\n")
+            for event in generate_fleet_events(PANEL_IDS):
+                event = send_event(active_producer, event)
+                print(f"Sent: {event['panel_id']} - {event['production_kw']} kW\n")
                 time.sleep(0.1)
 
             active_producer.flush()
@@ -102,4 +113,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .hourly_frame import HourlyFrame
+except ImportError:
+    from solar_analysis_data.hourly_frame import HourlyFrame
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+ARTIFACT_FORMATS = ("npy", "parquet")
+ARTIFACT_VERSION = 1
+PARQUET_SUFFIX = ".parquet"
+NPY_SUFFIX = ".columns"
+SCHEMA_NAME = "schema.json"
+PARQUET_COMPRESSION = "zstd"
+
+
+def resolve_format(artifact_format: str | None = None) -> str:
+    # npy columns are the memory-mapped default; compressed Parquet has to be decoded on read, so
+    # it is only written when asked for as an export.
+    artifact_format = artifact_format or cfg.SIMULATION_PARAMS.get("artifact_format", "npy")
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"artifact format must be one of {ARTIFACT_FORMATS}")
+    if artifact_format == "parquet" and pq is None:
+        raise ImportError("writing Parquet artifacts requires the optional pyarrow dependency from requirements.txt")
+    return artifact_format
+
+
+def artifact_path(stem: Path | str, artifact_format: str | None = None) -> Path:
+    suffix = PARQUET_SUFFIX if resolve_format(artifact_format) == "parquet" else NPY_SUFFIX
+    return Path(stem).with_suffix(suffix)
+
+
+def _split_aliases(columns: dict[str, np.ndarray]) -> tuple[dict[str, np.ndarray], dict[str, str]]:
+    # Columns that are the same array as an earlier one (the production aliases) are stored once
+    # and recorded as aliases in the schema.
+    stored: dict[str, np.ndarray] = {}
+    aliases: dict[str, str] = {}
+    for name, values in columns.items():
+        original = next((other for other, kept in stored.items() if kept is values), None)
+        if original is None:
+            stored[name] = values
+        else:
+            aliases[name] = original
+    return stored, aliases
+
+
+def write_columns(
+    columns: dict[str, np.ndarray],
+    stem: Path | str,
+    metadata: dict[str, object] | None = None,
+    artifact_format: str | None = None,
+) -> Path:
+    path = artifact_path(stem, artifact_format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stored, aliases = _split_aliases(columns)
+    schema = {
+        "artifact_version": ARTIFACT_VERSION,
+        "rows": len(next(iter(stored.values()))) if stored else 0,
+        "columns": {name: np.asarray(values).dtype.str for name, values in stored.items()},
+        "aliases": aliases,
+        "order": list(columns),
+        "metadata": metadata or {},
+    }
+
+    # Both formats are written next to the target and moved into place, so readers never see a
+    # half-written artifact.
+    if path.suffix == PARQUET_SUFFIX:
+        table = pa.table({name: np.ascontiguousarray(values) for name, values in stored.items()})
+        table = table.replace_schema_metadata({"solar_artifact": json.dumps(schema, default=str)})
+        staging = path.with_name(f".{path.name}.tmp")
+        pq.write_table(table, staging, compression=PARQUET_COMPRESSION)
+        os.replace(staging, path)
+        return path
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    for name, values in stored.items():
+        np.save(staging / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+    (staging / SCHEMA_NAME).write_text(json.dumps(schema, default=str), encoding="utf-8")
+    # A directory cannot be replaced over an existing one, so the old artifact is renamed aside
+    # first and only deleted once the new one is in place.
+    retired = None
+    if path.exists():
+        retired = Path(tempfile.mkdtemp(prefix=f".{path.name}-old-", dir=path.parent)) / path.name
+        os.replace(path, retired)
+    os.replace(staging, path)
+    if retired is not None:
+        shutil.rmtree(retired.parent, ignore_errors=True)
+    return path
+
+
+def read_schema(path: Path | str) -> dict[str, object]:
+    path = Path(path)
+    if path.suffix == PARQUET_SUFFIX:
+        if pq is None:
+            raise ImportError("reading Parquet artifacts requires pyarrow")
+        raw = pq.read_schema(path).metadata[b"solar_artifact"]
+        return json.loads(raw)
+    return json.loads((path / SCHEMA_NAME).read_text(encoding="utf-8"))
+
+
+def read_columns(
+    path: Path | str,
+    columns: list[str] | None = None,
+    memory_map: bool = True,
+) -> tuple[dict[str, np.ndarray], dict[str, object]]:
+    path = Path(path)
+    schema = read_schema(path)
+    aliases: dict[str, str] = schema["aliases"]
+    wanted = list(schema["order"]) if columns is None else list(columns)
+    unknown = [name for name in wanted if name not in schema["columns"] and name not in aliases]
+    if unknown:
+        raise KeyError(f"{path} has no columns {unknown}")
+    physical = list(dict.fromkeys(aliases.get(name, name) for name in wanted))
+
+    if path.suffix == PARQUET_SUFFIX:
+        table = pq.read_table(path, columns=physical, memory_map=memory_map)
+        loaded = {name: table.column(name).to_numpy() for name in physical}
+    else:
+        mmap_mode = "r" if memory_map else None
+        loaded = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in physical}
+    return {name: loaded[aliases.get(name, name)] for name in wanted}, schema["metadata"]
+
+
+def write_frame(frame: HourlyFrame, stem: Path | str, artifact_format: str | None = None) -> Path:
+    return write_columns(frame.columns, stem, metadata={"city": frame.city}, artifact_format=artifact_format)
+
+
+def read_frame(path: Path | str, columns: list[str] | None = None, memory_map: bool = True) -> HourlyFrame:
+    loaded, metadata = read_columns(path, columns=columns, memory_map=memory_map)
+    return HourlyFrame(str(metadata.get("city", "")), loaded)
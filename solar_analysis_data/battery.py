@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .econ_sweep import inverter_replacement_costs, investment_metrics
+except ImportError:
+    from solar_analysis_data.econ_sweep import inverter_replacement_costs, investment_metrics
+
+
+BATTERY_CAPACITIES_KWH = [0.0, 2.5, 5.0, 7.5, 10.0, 15.0]
+
+
+def battery_capacities() -> list[float]:
+    # The configured battery is always sized alongside the standard grid.
+    return sorted({*BATTERY_CAPACITIES_KWH, float(cfg.BATTERY_PARAMS["battery_capacity_kwh"])})
+
+
+def dispatch_battery(
+    production_kwh: np.ndarray,
+    load_kwh: np.ndarray,
+    production_scale: np.ndarray,
+    capacity_kwh: np.ndarray,
+    efficiency: float | None = None,
+) -> dict[str, np.ndarray]:
+    production = np.asarray(production_kwh, dtype=float)
+    load = np.asarray(load_kwh, dtype=float)
+    scale, capacity = np.broadcast_arrays(
+        np.asarray(production_scale, dtype=float), np.asarray(capacity_kwh, dtype=float)
+    )
+    efficiency = cfg.BATTERY_PARAMS["battery_efficiency"] if efficiency is None else efficiency
+
+    # Self-consumption first: surplus charges the battery (losing the round-trip efficiency on the
+    # way in), deficits drain it, and only what the battery cannot absorb or cover meets the grid.
+    # Every configuration advances through the year in lockstep, one hour per step.
+    state_of_charge = np.zeros(scale.shape)
+    headroom = np.empty(scale.shape)
+    self_consumed = np.zeros(scale.shape)
+    exported = np.zeros(scale.shape)
+    imported = np.zeros(scale.shape)
+    discharged_total = np.zeros(scale.shape)
+    for hour_production, hour_load in zip(production.tolist(), load.tolist()):
+        supply = scale * hour_production
+        direct = np.minimum(supply, hour_load)
+        surplus = supply - direct
+        deficit = hour_load - direct
+
+        np.subtract(capacity, state_of_charge, out=headroom)
+        charged = np.minimum(surplus, headroom / efficiency)
+        discharged = np.minimum(deficit, state_of_charge)
+        state_of_charge += charged * efficiency - discharged
+
+        self_consumed += direct + discharged
+        exported += surplus - charged
+        imported += deficit - discharged
+        discharged_total += discharged
+
+    annual_production = scale * production.sum()
+    return {
+        "annual_production_kwh": annual_production,
+        "annual_self_consumed_kwh": self_consumed,
+        "annual_exported_kwh": exported,
+        "annual_imported_kwh": imported,
+        "annual_load_kwh": np.full(scale.shape, load.sum()),
+        "battery_discharged_kwh": discharged_total,
+        "self_consumption_pct": np.divide(
+            self_consumed * 100, annual_production, out=np.zeros(scale.shape), where=annual_production > 0
+        ),
+    }
+
+
+def battery_replacement_costs(
+    capacity_kwh: np.ndarray,
+    econ: dict[str, float],
+    battery: dict[str, float],
+) -> np.ndarray:
+    years = np.arange(1, int(econ["analysis_years"]) + 1)
+    lifetime = int(battery["battery_lifetime_years"])
+    replaced = (years % lifetime == 0) & (years < years[-1])
+    return np.asarray(capacity_kwh, dtype=float)[..., None] * battery["battery_cost_per_kwh"] * replaced
+
+
+def evaluate_battery_grid(
+    production_kwh: np.ndarray,
+    load_kwh: np.ndarray,
+    system_sizes_kw: list[float],
+    capacities_kwh: list[float],
+    base_system_size_kw: float,
+    econ: dict[str, float] | None = None,
+    battery: dict[str, float] | None = None,
+) -> dict[str, object]:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    battery = {**cfg.BATTERY_PARAMS, **(battery or {})}
+    analysis_years = int(econ["analysis_years"])
+    capacities = np.asarray(capacities_kwh, dtype=float)
+    sizes = np.asarray(system_sizes_kw, dtype=float)
+
+    # Axes: capacity x size x analysis year, so PV degradation is dispatched year by year too.
+    degradation = (1 - cfg.LOSS_PARAMS.get("degradation_rate", 0.0)) ** np.arange(analysis_years)
+    scale = (sizes / base_system_size_kw)[None, :, None] * degradation[None, None, :]
+    yearly = dispatch_battery(
+        production_kwh, load_kwh, scale, capacities[:, None, None], efficiency=battery["battery_efficiency"]
+    )
+
+    years = np.arange(1, analysis_years + 1)
+    multiplier = (1 + econ["annual_rate_increase"]) ** (years - 1)
+    exchanged = np.minimum(yearly["annual_exported_kwh"], yearly["annual_imported_kwh"])
+    benefit = (
+        multiplier
+        * (
+            yearly["annual_self_consumed_kwh"] * econ["electricity_rate"]
+            + yearly["annual_exported_kwh"] * econ["sell_back_rate"]
+            + exchanged * econ["incentive_rate"]
+        )
+        - econ["annual_maintenance"]
+        - inverter_replacement_costs(econ)
+        - battery_replacement_costs(capacities[:, None], econ, battery)
+    )
+    installation_cost = (
+        sizes[None, :] * econ["installation_cost_per_kw"] + capacities[:, None] * battery["battery_cost_per_kwh"]
+    )
+    metrics = investment_metrics(benefit, installation_cost, econ["discount_rate"])
+
+    return {
+        "capacities_kwh": capacities,
+        "system_sizes_kw": sizes,
+        "installation_cost_euro": installation_cost,
+        "annual_self_consumed_kwh": yearly["annual_self_consumed_kwh"][..., 0],
+        "self_consumption_pct": yearly["self_consumption_pct"][..., 0],
+        "demand_coverage_pct": yearly["annual_self_consumed_kwh"][..., 0] / yearly["annual_load_kwh"][..., 0] * 100,
+        "battery_discharged_kwh": yearly["battery_discharged_kwh"][..., 0],
+        **metrics,
+    }
+
+
+def battery_configuration(grid: dict[str, object], capacity_index: int, size_index: int) -> dict[str, object]:
+    payback = float(grid["payback_years"][capacity_index, size_index])
+    return {
+        "battery_capacity_kwh": float(grid["capacities_kwh"][capacity_index]),
+        "panel_size_kw": float(grid["system_sizes_kw"][size_index]),
+        "installation_cost_euro": float(grid["installation_cost_euro"][capacity_index, size_index]),
+        "self_consumption_pct": float(grid["self_consumption_pct"][capacity_index, size_index]),
+        "demand_coverage_pct": float(grid["demand_coverage_pct"][capacity_index, size_index]),
+        "npv_25_years_euro": float(grid["npv_25_years_euro"][capacity_index, size_index]),
+        "payback_years": None if np.isnan(payback) else int(payback),
+    }
+
+
+def battery_rank(configuration: dict[str, object]) -> tuple[float, int, float, float]:
+    return (
+        configuration["npv_25_years_euro"],
+        -999 if configuration["payback_years"] is None else -configuration["payback_years"],
+        -configuration["battery_capacity_kwh"],
+        -configuration["panel_size_kw"],
+    )
+
+
+def best_battery_configuration(grid: dict[str, object]) -> dict[str, object]:
+    capacities, sizes = np.shape(grid["npv_25_years_euro"])
+    configurations = [
+        battery_configuration(grid, capacity_index, size_index)
+        for capacity_index in range(capacities)
+        for size_index in range(sizes)
+    ]
+    return max(configurations, key=battery_rank)
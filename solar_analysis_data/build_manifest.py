@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+from config import userdata_config as cfg
+
+
+# Bump when a stage's logic changes in a way its inputs cannot show, so every stage reruns once.
+BUILD_VERSION = 1
+DEFAULT_BUILD_DIR = Path(__file__).resolve().parent / ".build"
+MANIFEST_NAME = "manifest.json"
+
+
+def stage_fingerprint(*parts: object) -> str:
+    encoded = json.dumps([BUILD_VERSION, *parts], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_fingerprint(path: Path | str | None) -> str | None:
+    if not path or not Path(path).is_file():
+        return None
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def write_json(path: Path, payload: object) -> None:
+    # Written beside the target and moved into place so an interrupted run leaves no torn file.
+    staging = path.with_name(f".{path.name}.tmp")
+    staging.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+    os.replace(staging, path)
+
+
+def read_json(path: Path) -> object:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class BuildManifest:
+    """Input fingerprints of the last completed run of each stage, kept beside the stage outputs."""
+
+    def __init__(self, directory: Path | str | None = None, force: bool = False):
+        self.directory = Path(directory or cfg.SIMULATION_PARAMS.get("build_dir") or DEFAULT_BUILD_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.force = force
+        self.path = self.directory / MANIFEST_NAME
+        self.stages: dict[str, str] = read_json(self.path) if self.path.exists() else {}
+        self.ran: list[str] = []
+        self.skipped: list[str] = []
+
+    def stage_path(self, name: str) -> Path:
+        return self.directory / name
+
+    def is_current(self, stage: str, fingerprint: str, outputs: Iterable[Path]) -> bool:
+        # A stage is skipped only when its inputs are unchanged and everything it wrote still exists.
+        current = not self.force and self.stages.get(stage) == fingerprint and all(path.exists() for path in outputs)
+        (self.skipped if current else self.ran).append(stage)
+        return current
+
+    def record(self, stage: str, fingerprint: str) -> None:
+        self.stages[stage] = fingerprint
+        write_json(self.path, self.stages)
+
+    def summary(self) -> dict[str, list[str]]:
+        return {"ran": list(self.ran), "skipped": list(self.skipped)}
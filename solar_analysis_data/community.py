@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .econ_sweep import inverter_replacement_costs, investment_metrics
+except ImportError:
+    from solar_analysis_data.econ_sweep import inverter_replacement_costs, investment_metrics
+
+
+ALLOCATION_RULES = ("export_share", "import_share", "equal")
+
+
+@dataclass(frozen=True, eq=False)
+class Community:
+    """Member households of a renewable energy community, stored as member x hour arrays."""
+
+    member_ids: np.ndarray
+    pv_size_kw: np.ndarray
+    load_kwh: np.ndarray
+    production_per_kw: np.ndarray
+
+    def __post_init__(self) -> None:
+        count = len(self.member_ids)
+        if self.pv_size_kw.shape != (count,):
+            raise ValueError(f"pv_size_kw must have shape ({count},)")
+        if self.load_kwh.ndim != 2 or self.load_kwh.shape[0] != count:
+            raise ValueError(f"load_kwh must have shape ({count}, hours)")
+        if self.production_per_kw.shape not in ((self.load_kwh.shape[1],), self.load_kwh.shape):
+            raise ValueError("production_per_kw must have shape (hours,) or match load_kwh")
+
+    def __len__(self) -> int:
+        return len(self.member_ids)
+
+    def production_kwh(self, scale: float = 1.0) -> np.ndarray:
+        return (self.pv_size_kw * scale)[:, None] * self.production_per_kw
+
+
+def _per_unit_share(shared: np.ndarray, basis_total: np.ndarray) -> np.ndarray:
+    return np.divide(shared, basis_total, out=np.zeros_like(shared), where=basis_total > 0)
+
+
+def community_balance(
+    community: Community,
+    scale: float = 1.0,
+    allocation: str = "export_share",
+) -> dict[str, np.ndarray]:
+    if allocation not in ALLOCATION_RULES:
+        raise ValueError(f"allocation must be one of {ALLOCATION_RULES}")
+
+    # Members without PV simply import their load, so only producers need member x hour work.
+    producers = np.flatnonzero(community.pv_size_kw > 0)
+    consumers = np.flatnonzero(community.pv_size_kw <= 0)
+    per_kw = community.production_per_kw[producers] if community.production_per_kw.ndim == 2 else community.production_per_kw
+    production = (community.pv_size_kw[producers] * scale)[:, None] * per_kw
+    producer_load = community.load_kwh[producers]
+    consumer_load = community.load_kwh[consumers]
+    self_consumed = np.minimum(production, producer_load)
+    exported = production - self_consumed
+    imported = producer_load - self_consumed
+
+    # Shared energy is the hourly overlap between what members feed in and what they draw; it
+    # is credited back in proportion to each member's hourly export, import or headcount.
+    hourly_export = exported.sum(axis=0)
+    hourly_import = imported.sum(axis=0) + consumer_load.sum(axis=0)
+    shared = np.minimum(hourly_export, hourly_import)
+
+    count = len(community)
+    allocated = np.zeros(count)
+    if allocation == "export_share":
+        allocated[producers] = exported @ _per_unit_share(shared, hourly_export)
+    elif allocation == "import_share":
+        unit = _per_unit_share(shared, hourly_import)
+        allocated[producers] = imported @ unit
+        allocated[consumers] = consumer_load @ unit
+    else:
+        allocated[:] = shared.sum() / count
+
+    def per_member(producer_values: np.ndarray, consumer_values: np.ndarray | float = 0.0) -> np.ndarray:
+        values = np.zeros(count)
+        values[producers] = producer_values
+        values[consumers] = consumer_values
+        return values
+
+    return {
+        "shared_kwh": shared,
+        "production_kwh": per_member(production.sum(axis=1)),
+        "load_kwh": community.load_kwh.sum(axis=1),
+        "self_consumed_kwh": per_member(self_consumed.sum(axis=1)),
+        "exported_kwh": per_member(exported.sum(axis=1)),
+        "imported_kwh": per_member(imported.sum(axis=1), consumer_load.sum(axis=1)),
+        "allocated_shared_kwh": allocated,
+    }
+
+
+def simulate_community(
+    community: Community,
+    econ: dict[str, float] | None = None,
+    allocation: str = "export_share",
+) -> dict[str, object]:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    analysis_years = int(econ["analysis_years"])
+    degradation = (1 - cfg.LOSS_PARAMS.get("degradation_rate", 0.0)) ** np.arange(analysis_years)
+    has_pv = community.pv_size_kw > 0
+
+    # Member-by-hour arrays are rebuilt once per analysis year so memory stays at a few N x H
+    # blocks; only the per-member totals are kept for every year.
+    yearly = [community_balance(community, float(factor), allocation) for factor in degradation]
+    year_one = yearly[0]
+    stacked = {name: np.stack([balance[name] for balance in yearly], axis=-1) for name in yearly[0]}
+
+    years = np.arange(1, analysis_years + 1)
+    multiplier = (1 + econ["annual_rate_increase"]) ** (years - 1)
+    benefit = multiplier * (
+        stacked["self_consumed_kwh"] * econ["electricity_rate"]
+        + stacked["exported_kwh"] * econ["sell_back_rate"]
+        + stacked["allocated_shared_kwh"] * econ["incentive_rate"]
+    ) - has_pv[:, None] * (econ["annual_maintenance"] + inverter_replacement_costs(econ))
+    installation_cost = community.pv_size_kw * econ["installation_cost_per_kw"]
+    metrics = investment_metrics(benefit, installation_cost, econ["discount_rate"])
+
+    members = {
+        "member_ids": community.member_ids,
+        "pv_size_kw": community.pv_size_kw,
+        "installation_cost_euro": installation_cost,
+        **{name: values for name, values in year_one.items() if name != "shared_kwh"},
+        **metrics,
+    }
+    return {
+        "members": members,
+        "hourly_shared_kwh": year_one["shared_kwh"],
+        "allocation": allocation,
+        "community": {
+            "members": len(community),
+            "producers": int(has_pv.sum()),
+            "annual_shared_kwh": float(year_one["shared_kwh"].sum()),
+            "annual_incentive_euro": float(year_one["shared_kwh"].sum() * econ["incentive_rate"]),
+            "annual_production_kwh": float(year_one["production_kwh"].sum()),
+            "annual_load_kwh": float(year_one["load_kwh"].sum()),
+            "total_npv_25_years_euro": float(metrics["npv_25_years_euro"].sum()),
+        },
+    }
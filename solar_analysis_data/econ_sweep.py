@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .energy_index import EnergyBalanceIndex
+    from .tariffs import Tariff, priced_index
+except ImportError:
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+    from solar_analysis_data.tariffs import Tariff, priced_index
+
+
+SWEEP_PARAMETERS = (
+    "electricity_rate",
+    "sell_back_rate",
+    "incentive_rate",
+    "annual_rate_increase",
+    "discount_rate",
+    "installation_cost_per_kw",
+    "annual_maintenance",
+)
+
+
+def yearly_energy(
+    index: EnergyBalanceIndex,
+    system_size_kw: float,
+    base_system_size_kw: float,
+    analysis_years: int,
+    tariff: Tariff | None = None,
+) -> dict[str, np.ndarray]:
+    degradation = (1 - cfg.LOSS_PARAMS.get("degradation_rate", 0.0)) ** np.arange(analysis_years)
+    scales = system_size_kw / base_system_size_kw * degradation
+    balances = index.balances(scales)
+    energy = {
+        "self_consumed_kwh": balances["annual_self_consumed_kwh"],
+        "exported_kwh": balances["annual_exported_kwh"],
+        "exchanged_kwh": np.minimum(balances["annual_exported_kwh"], balances["annual_imported_kwh"]),
+    }
+    if tariff is not None:
+        energy.update(priced_index(index, tariff).values(scales))
+    return energy
+
+
+def _grid_axes(grid: dict[str, object], econ: dict[str, float]) -> dict[str, np.ndarray]:
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"cannot sweep {sorted(unknown)}; choose from {SWEEP_PARAMETERS}")
+
+    # Swept parameters take one axis each, in the order given; fixed ones broadcast as scalars
+    # and a trailing axis holds the analysis years.
+    ndim = len(grid)
+    axes: dict[str, np.ndarray] = {}
+    for position, name in enumerate(grid):
+        shape = [1] * (ndim + 1)
+        shape[position] = -1
+        axes[name] = np.asarray(grid[name], dtype=float).reshape(shape)
+    for name in SWEEP_PARAMETERS:
+        if name not in axes:
+            axes[name] = np.full([1] * (ndim + 1), float(econ[name]))
+    return axes
+
+
+def inverter_replacement_costs(econ: dict[str, float]) -> np.ndarray:
+    losses = cfg.LOSS_PARAMS
+    years = np.arange(1, int(econ["analysis_years"]) + 1)
+    inverter_year = losses.get("inverter_replacement_year", econ.get("inverter_replacement_year"))
+    inverter_cost = losses.get("inverter_replacement_cost", econ.get("inverter_replacement_cost", 0))
+    return np.where(years == inverter_year, inverter_cost, 0.0)
+
+
+def investment_metrics(
+    benefit: np.ndarray,
+    installation_cost: np.ndarray | float,
+    discount_rate: np.ndarray | float,
+) -> dict[str, np.ndarray]:
+    years = np.arange(1, benefit.shape[-1] + 1)
+    installation_cost = np.asarray(installation_cost, dtype=float)
+    discount_rate = np.asarray(discount_rate, dtype=float)
+    cumulative = np.cumsum(benefit, axis=-1) - installation_cost[..., None]
+
+    recovered = cumulative >= 0
+    payback_years = np.where(recovered.any(axis=-1), recovered.argmax(axis=-1) + 1.0, np.nan)
+
+    horizon_20 = min(20, benefit.shape[-1])
+    net_profit_20 = cumulative[..., horizon_20 - 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi_20_years = np.where(installation_cost != 0, net_profit_20 / installation_cost * 100, 0.0)
+    discounted = benefit / (1 + discount_rate[..., None]) ** years
+    return {
+        "npv_25_years_euro": discounted.sum(axis=-1) - installation_cost,
+        "roi_20_years": roi_20_years,
+        "net_profit_20_years_euro": net_profit_20,
+        "payback_years": payback_years,
+    }
+
+
+def sweep_economics(
+    index: EnergyBalanceIndex,
+    system_size_kw: float,
+    base_system_size_kw: float,
+    grid: dict[str, object],
+    econ: dict[str, float] | None = None,
+    tariff: Tariff | None = None,
+) -> dict[str, object]:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    if tariff is not None and {"electricity_rate", "sell_back_rate"} & set(grid):
+        raise ValueError("electricity_rate and sell_back_rate come from the tariff and cannot be swept with it")
+    analysis_years = int(econ["analysis_years"])
+    energy = yearly_energy(index, system_size_kw, base_system_size_kw, analysis_years, tariff=tariff)
+    params = _grid_axes(grid, econ)
+    years = np.arange(1, analysis_years + 1)
+
+    if tariff is None:
+        energy_value = (
+            energy["self_consumed_kwh"] * params["electricity_rate"]
+            + energy["exported_kwh"] * params["sell_back_rate"]
+        )
+    else:
+        energy_value = energy["savings_euro"] + energy["export_revenue_euro"]
+    multiplier = (1 + params["annual_rate_increase"]) ** (years - 1)
+    benefit = (
+        multiplier * (energy_value + energy["exchanged_kwh"] * params["incentive_rate"])
+        - params["annual_maintenance"]
+        - inverter_replacement_costs(econ)
+    )
+    installation_cost = system_size_kw * params["installation_cost_per_kw"][..., 0]
+    metrics = investment_metrics(benefit, installation_cost, params["discount_rate"][..., 0])
+
+    shape = tuple(len(np.atleast_1d(grid[name])) for name in grid)
+    return {
+        "panel_size_kw": system_size_kw,
+        "axes": {name: np.asarray(grid[name], dtype=float).reshape(-1) for name in grid},
+        "shape": shape,
+        "installation_cost_euro": np.broadcast_to(installation_cost, shape),
+        **{name: np.broadcast_to(values, shape) for name, values in metrics.items()},
+    }
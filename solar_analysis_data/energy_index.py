@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
+
+try:
+    from .hourly_frame import HourlyFrame
+except ImportError:
+    from solar_analysis_data.hourly_frame import HourlyFrame
+
+
+@dataclass(frozen=True, eq=False)
+class EnergyBalanceIndex:
+    """Hourly load/production ratios sorted with prefix sums, answering energy balances for any scale."""
+
+    sorted_ratio: np.ndarray = field(repr=False)
+    load_prefix: np.ndarray = field(repr=False)
+    production_prefix: np.ndarray = field(repr=False)
+    hour_order: np.ndarray = field(repr=False)
+    production_total: float
+    load_total: float
+    hour_count: int
+
+    @classmethod
+    def from_arrays(cls, production_kwh: np.ndarray, load_kwh: np.ndarray) -> EnergyBalanceIndex:
+        production = np.asarray(production_kwh, dtype=float)
+        load = np.asarray(load_kwh, dtype=float)
+        if production.shape != load.shape:
+            raise ValueError("production_kwh and load_kwh must have the same shape")
+
+        # Hours without production never self-consume, so only producing hours enter the index.
+        # For those, min(s * p, l) is s * p while s <= l / p and l afterwards.
+        producing = np.flatnonzero(production > 0)
+        ratio = load[producing] / production[producing]
+        order = np.argsort(ratio, kind="stable")
+        return cls(
+            sorted_ratio=ratio[order],
+            load_prefix=np.concatenate(([0.0], np.cumsum(load[producing][order]))),
+            production_prefix=np.concatenate(([0.0], np.cumsum(production[producing][order]))),
+            hour_order=producing[order],
+            production_total=float(production.sum()),
+            load_total=float(load.sum()),
+            hour_count=len(load),
+        )
+
+    @classmethod
+    def from_frame(cls, frame: HourlyFrame) -> EnergyBalanceIndex:
+        return cls.from_arrays(frame["hourly_production_kwh"], frame["load_kwh"])
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, object]]) -> EnergyBalanceIndex:
+        production = np.fromiter((float(row["hourly_production_kwh"]) for row in rows), dtype=float, count=len(rows))
+        load = np.fromiter((float(row["load_kwh"]) for row in rows), dtype=float, count=len(rows))
+        return cls.from_arrays(production, load)
+
+    def __len__(self) -> int:
+        return len(self.sorted_ratio)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        # Plain balances ignore hour order, but hourly prices do not, so the order is hashed too.
+        digest = hashlib.sha256()
+        for values in (self.sorted_ratio, self.load_prefix, self.production_prefix, self.hour_order):
+            digest.update(np.ascontiguousarray(values).tobytes())
+        digest.update(np.array([self.production_total, self.load_total]).tobytes())
+        return digest.hexdigest()
+
+    def self_consumed(self, scales: np.ndarray) -> np.ndarray:
+        scales = np.asarray(scales, dtype=float)
+        saturated = np.searchsorted(self.sorted_ratio, scales, side="left")
+        producing_total = self.production_prefix[-1]
+        return self.load_prefix[saturated] + scales * (producing_total - self.production_prefix[saturated])
+
+    def balances(self, scales: np.ndarray) -> dict[str, np.ndarray]:
+        scales = np.asarray(scales, dtype=float)
+        production = scales * self.production_total
+        self_consumed = self.self_consumed(scales)
+        load = np.full(scales.shape, self.load_total)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self_consumption_pct = np.where(production > 0, self_consumed / production * 100, 0.0)
+        demand_coverage_pct = self_consumed / self.load_total * 100 if self.load_total else np.zeros(scales.shape)
+        production_coverage_pct = production / self.load_total * 100 if self.load_total else np.zeros(scales.shape)
+        return {
+            "annual_production_kwh": production,
+            "annual_self_consumed_kwh": self_consumed,
+            "annual_exported_kwh": np.maximum(0.0, production - self_consumed),
+            "annual_imported_kwh": np.maximum(0.0, load - self_consumed),
+            "annual_load_kwh": load,
+            "self_consumption_pct": self_consumption_pct,
+            "demand_coverage_pct": demand_coverage_pct,
+            "production_coverage_pct": production_coverage_pct,
+        }
+
+    def balance(self, scale: float) -> dict[str, float]:
+        return {name: float(values) for name, values in self.balances(np.asarray(scale, dtype=float)).items()}
+
+    def weighted_prefixes(self, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Weights are bands x hours in the original hour order, e.g. tariff band masks or a
+        # price curve; the prefixes follow the index order, one row per band.
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))[:, self.hour_order]
+        start = np.zeros((len(weights), 1))
+        load = np.diff(self.load_prefix) * weights
+        production = np.diff(self.production_prefix) * weights
+        return (
+            np.concatenate((start, np.cumsum(load, axis=1)), axis=1),
+            np.concatenate((start, np.cumsum(production, axis=1)), axis=1),
+        )
+
+    def weighted_balances(
+        self,
+        scales: np.ndarray,
+        prefixes: tuple[np.ndarray, np.ndarray],
+    ) -> dict[str, np.ndarray]:
+        # Same split as self_consumed: hours with l / p below the scale export s * p - l and
+        # self-consume l, the rest self-consume s * p. Bands form the trailing axis.
+        load_prefix, production_prefix = (prefix.T for prefix in prefixes)
+        scales = np.asarray(scales, dtype=float)
+        saturated = np.searchsorted(self.sorted_ratio, scales, side="left")
+        load_part, production_part = load_prefix[saturated], production_prefix[saturated]
+        column_scales = scales[..., None]
+        return {
+            "self_consumed_kwh": load_part + column_scales * (production_prefix[-1] - production_part),
+            "exported_kwh": column_scales * production_part - load_part,
+        }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, tzinfo
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+EPHEMERIS_CACHE_SIZE = 32
+
+_EPHEMERIS_CACHE: OrderedDict[tuple[int, float, float, str], SolarEphemeris] = OrderedDict()
+
+
+def utc_offset_hours(days: list[date], tz: tzinfo) -> np.ndarray:
+    offsets = np.empty((len(days), 24))
+    for index, day in enumerate(days):
+        first = datetime(day.year, day.month, day.day, 0, tzinfo=tz).utcoffset()
+        last = datetime(day.year, day.month, day.day, 23, tzinfo=tz).utcoffset()
+        if first == last:
+            offsets[index, :] = first.total_seconds() / 3600
+            continue
+        for hour in range(24):
+            offset = datetime(day.year, day.month, day.day, hour, tzinfo=tz).utcoffset()
+            offsets[index, hour] = offset.total_seconds() / 3600
+    return offsets.reshape(-1)
+
+
+def solar_position_arrays(
+    day_of_year: np.ndarray,
+    fractional_hour: np.ndarray,
+    utc_offset: np.ndarray,
+    latitude: float,
+    longitude: float,
+) -> dict[str, np.ndarray]:
+    n = day_of_year
+    b = np.radians((360 / 364) * (n - 81))
+    equation_of_time = 9.87 * np.sin(2 * b) - 7.53 * np.cos(b) - 1.5 * np.sin(b)
+    local_standard_meridian = 15 * utc_offset
+    time_correction = 4 * (longitude - local_standard_meridian) + equation_of_time
+    local_solar_time = fractional_hour + time_correction / 60
+
+    hour_angle_deg = 15 * (local_solar_time - 12)
+    declination_deg = 23.45 * np.sin(np.radians(360 * (284 + n) / 365))
+
+    latitude_rad = np.radians(latitude)
+    declination_rad = np.radians(declination_deg)
+    hour_angle_rad = np.radians(hour_angle_deg)
+
+    cos_zenith = np.sin(latitude_rad) * np.sin(declination_rad) + np.cos(latitude_rad) * np.cos(
+        declination_rad
+    ) * np.cos(hour_angle_rad)
+    cos_zenith = np.clip(cos_zenith, -1.0, 1.0)
+    zenith_rad = np.arccos(cos_zenith)
+    elevation_deg = 90 - np.degrees(zenith_rad)
+
+    sin_azimuth = -np.sin(hour_angle_rad) * np.cos(declination_rad)
+    cos_azimuth = (
+        np.sin(declination_rad) * np.cos(latitude_rad)
+        - np.cos(declination_rad) * np.sin(latitude_rad) * np.cos(hour_angle_rad)
+    ) / np.maximum(np.cos(zenith_rad), 1e-6)
+    azimuth_deg = (np.degrees(np.arctan2(sin_azimuth, cos_azimuth)) + 180) % 360
+
+    return {
+        "equation_of_time_min": equation_of_time,
+        "declination_deg": declination_deg,
+        "hour_angle_deg": hour_angle_deg,
+        "zenith_deg": np.degrees(zenith_rad),
+        "elevation_deg": elevation_deg,
+        "azimuth_deg": azimuth_deg,
+        "solar_factor": np.maximum(0.0, np.sin(np.radians(np.maximum(elevation_deg, 0.0)))),
+    }
+
+
+@dataclass(frozen=True, eq=False)
+class SolarEphemeris:
+    """Hourly sun position for one year on the local wall-clock grid of a site."""
+
+    year: int
+    latitude: float
+    longitude: float
+    timezone: str
+    columns: dict[str, np.ndarray] = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.columns["hour"])
+
+    def index_of(self, timestamp: datetime) -> int | None:
+        if timestamp.year != self.year or (timestamp.minute, timestamp.second, timestamp.microsecond) != (0, 0, 0):
+            return None
+        index = (timestamp.timetuple().tm_yday - 1) * 24 + timestamp.hour
+        offset = timestamp.utcoffset()
+        offset_hours = offset.total_seconds() / 3600 if offset else 0
+        if self.columns["utc_offset_hours"][index] != offset_hours:
+            return None
+        return index
+
+    def position_at(self, timestamp: datetime) -> dict[str, float] | None:
+        index = self.index_of(timestamp)
+        if index is None:
+            return None
+        position = {name: float(values[index]) for name, values in self.columns.items()}
+        position["day_of_year"] = int(self.columns["day_of_year"][index])
+        position["hour"] = int(self.columns["hour"][index])
+        return position
+
+    def slice_days(self, first_day_of_year: int, n_days: int) -> dict[str, np.ndarray]:
+        start = (first_day_of_year - 1) * 24
+        return {name: values[start : start + n_days * 24] for name, values in self.columns.items()}
+
+
+def build_ephemeris(year: int, latitude: float, longitude: float, timezone: str, tz: tzinfo) -> SolarEphemeris:
+    start = date(year, 1, 1)
+    days = [start + timedelta(days=offset) for offset in range((date(year + 1, 1, 1) - start).days)]
+    day_of_year = np.repeat(np.arange(1, len(days) + 1, dtype=np.int64), 24)
+    hour = np.tile(np.arange(24, dtype=np.int64), len(days))
+    utc_offset = utc_offset_hours(days, tz)
+
+    columns = {"day_of_year": day_of_year, "hour": hour, "utc_offset_hours": utc_offset}
+    columns.update(solar_position_arrays(day_of_year, hour.astype(float), utc_offset, latitude, longitude))
+    for values in columns.values():
+        values.flags.writeable = False
+    return SolarEphemeris(year, latitude, longitude, timezone, columns)
+
+
+def solar_ephemeris(
+    year: int,
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    tz: tzinfo | None = None,
+) -> SolarEphemeris:
+    key = (year, float(latitude), float(longitude), timezone)
+    cached = _EPHEMERIS_CACHE.get(key)
+    if cached is not None:
+        _EPHEMERIS_CACHE.move_to_end(key)
+        return cached
+
+    return cache_ephemeris(build_ephemeris(year, latitude, longitude, timezone, tz or ZoneInfo(timezone)))
+
+
+def cache_ephemeris(ephemeris: SolarEphemeris) -> SolarEphemeris:
+    key = (ephemeris.year, float(ephemeris.latitude), float(ephemeris.longitude), ephemeris.timezone)
+    _EPHEMERIS_CACHE[key] = ephemeris
+    _EPHEMERIS_CACHE.move_to_end(key)
+    while len(_EPHEMERIS_CACHE) > EPHEMERIS_CACHE_SIZE:
+        _EPHEMERIS_CACHE.popitem(last=False)
+    return ephemeris
+
+
+def ephemeris_for_days(
+    days: list[date],
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    tz: tzinfo | None = None,
+) -> dict[str, np.ndarray]:
+    if not days:
+        return {}
+
+    blocks: list[dict[str, np.ndarray]] = []
+    run_start = 0
+    for index in range(1, len(days) + 1):
+        run_ends = (
+            index == len(days)
+            or days[index].year != days[run_start].year
+            or days[index] != days[index - 1] + timedelta(days=1)
+        )
+        if not run_ends:
+            continue
+        first = days[run_start]
+        table = solar_ephemeris(first.year, latitude, longitude, timezone, tz=tz)
+        blocks.append(table.slice_days(first.timetuple().tm_yday, index - run_start))
+        run_start = index
+
+    if len(blocks) == 1:
+        return blocks[0]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def clear_ephemeris_cache() -> None:
+    _EPHEMERIS_CACHE.clear()
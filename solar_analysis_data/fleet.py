@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import simulate_days
+except ImportError:
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import simulate_days
+
+
+WEATHER_COLUMNS = (
+    "year",
+    "hour",
+    "temperature",
+    "cloudcover",
+    "solar_angle",
+    "ghi_wm2",
+    "declination_deg",
+    "hour_angle_deg",
+)
+
+
+@dataclass(frozen=True, eq=False)
+class PanelFleet:
+    """Per-panel parameters stored as parallel arrays, one entry per module."""
+
+    panel_ids: np.ndarray
+    power_kw: np.ndarray
+    tilt_deg: np.ndarray
+    azimuth_deg: np.ndarray
+    install_year: np.ndarray
+    degradation_rate: np.ndarray
+    soiling_loss: np.ndarray
+    shading: np.ndarray = field(repr=False)
+
+    def __post_init__(self) -> None:
+        count = len(self.panel_ids)
+        for name in ("power_kw", "tilt_deg", "azimuth_deg", "install_year", "degradation_rate", "soiling_loss"):
+            if getattr(self, name).shape != (count,):
+                raise ValueError(f"{name} must have shape ({count},)")
+        if self.shading.shape != (count, 24):
+            raise ValueError(f"shading must have shape ({count}, 24)")
+
+    def __len__(self) -> int:
+        return len(self.panel_ids)
+
+    def subset(self, selector: np.ndarray | slice) -> PanelFleet:
+        return PanelFleet(
+            panel_ids=self.panel_ids[selector],
+            power_kw=self.power_kw[selector],
+            tilt_deg=self.tilt_deg[selector],
+            azimuth_deg=self.azimuth_deg[selector],
+            install_year=self.install_year[selector],
+            degradation_rate=self.degradation_rate[selector],
+            soiling_loss=self.soiling_loss[selector],
+            shading=self.shading[selector],
+        )
+
+
+def uniform_fleet(
+    panel_ids: list[str],
+    config: TurinSimulationConfig | None = None,
+    install_year: int | None = None,
+) -> PanelFleet:
+    config = config or TurinSimulationConfig()
+    count = len(panel_ids)
+    return PanelFleet(
+        panel_ids=np.asarray(panel_ids),
+        power_kw=np.full(count, config.system_size_kw / max(count, 1)),
+        tilt_deg=np.full(count, float(config.panel_tilt_deg)),
+        azimuth_deg=np.full(count, float(config.panel_azimuth_deg)),
+        install_year=np.full(count, install_year or cfg.SIMULATION_PARAMS["analysis_year"], dtype=np.int64),
+        degradation_rate=np.full(count, cfg.LOSS_PARAMS.get("degradation_rate", 0.0)),
+        soiling_loss=np.zeros(count),
+        shading=np.zeros((count, 24)),
+    )
+
+
+def generate_fleet(
+    n_panels: int,
+    config: TurinSimulationConfig | None = None,
+    seed: int | None = None,
+    panel_power_kw: float | None = None,
+    oldest_install_year: int = 2010,
+    shaded_share: float = 0.15,
+) -> PanelFleet:
+    config = config or TurinSimulationConfig()
+    rng = np.random.default_rng(config.seed if seed is None else seed)
+    newest_install_year = cfg.SIMULATION_PARAMS["analysis_year"]
+    base_degradation = cfg.LOSS_PARAMS.get("degradation_rate", 0.005)
+    base_soiling = cfg.LOSS_PARAMS.get("soiling_loss", 0.02)
+    power = panel_power_kw or config.system_size_kw / cfg.PANEL_PARAMS["panels"]
+
+    shading = np.zeros((n_panels, 24))
+    shaded = rng.random(n_panels) < shaded_share
+    obstruction_hour = rng.uniform(7.0, 18.0, n_panels)
+    obstruction_depth = rng.uniform(0.2, 0.9, n_panels)
+    hours = np.arange(24)
+    window = np.exp(-((hours[None, :] - obstruction_hour[:, None]) ** 2) / (2 * 1.2**2))
+    shading[shaded] = (obstruction_depth[:, None] * window)[shaded]
+
+    return PanelFleet(
+        panel_ids=np.array([f"Panel-{index:06d}" for index in range(1, n_panels + 1)]),
+        power_kw=power * rng.uniform(0.95, 1.05, n_panels),
+        tilt_deg=np.clip(config.panel_tilt_deg + rng.normal(0.0, 8.0, n_panels), 0.0, 90.0),
+        azimuth_deg=np.clip(config.panel_azimuth_deg + rng.normal(0.0, 25.0, n_panels), -180.0, 180.0),
+        install_year=rng.integers(oldest_install_year, newest_install_year + 1, n_panels),
+        degradation_rate=base_degradation * rng.uniform(0.7, 1.5, n_panels),
+        soiling_loss=base_soiling * rng.uniform(0.3, 2.0, n_panels),
+        shading=shading,
+    )
+
+
+def fleet_production(
+    fleet: PanelFleet,
+    weather: dict[str, np.ndarray],
+    config: TurinSimulationConfig | None = None,
+) -> np.ndarray:
+    config = config or TurinSimulationConfig()
+    ghi = np.asarray(weather["ghi_wm2"], dtype=float)
+    solar_factor = np.asarray(weather["solar_angle"], dtype=float)
+    cloud_cover = np.asarray(weather["cloudcover"], dtype=float)
+    latitude_rad = np.radians(config.latitude)
+    declination_rad = np.radians(weather["declination_deg"])
+    hour_angle_rad = np.radians(weather["hour_angle_deg"])
+
+    sun_terms = np.column_stack(
+        [
+            np.sin(declination_rad) * np.sin(latitude_rad)
+            + np.cos(declination_rad) * np.cos(latitude_rad) * np.cos(hour_angle_rad),
+            -np.sin(declination_rad) * np.cos(latitude_rad)
+            + np.cos(declination_rad) * np.sin(latitude_rad) * np.cos(hour_angle_rad),
+            np.cos(declination_rad) * np.sin(hour_angle_rad),
+        ]
+    )
+    tilt_rad = np.radians(fleet.tilt_deg)
+    azimuth_rad = np.radians(fleet.azimuth_deg)
+    panel_terms = np.vstack(
+        [np.cos(tilt_rad), np.sin(tilt_rad) * np.cos(azimuth_rad), np.sin(tilt_rad) * np.sin(azimuth_rad)]
+    )
+    cos_incidence = np.maximum(0.0, sun_terms @ panel_terms)
+
+    diffuse_fraction = np.clip(0.22 + 0.42 * (cloud_cover / 100), 0.18, 0.72)
+    diffuse_horizontal = ghi * diffuse_fraction
+    beam_horizontal = np.maximum(0.0, ghi - diffuse_horizontal)
+    beam_ratio = cos_incidence / np.maximum(solar_factor, 1e-6)[:, None]
+    unshaded = 1.0 - fleet.shading[:, np.asarray(weather["hour"], dtype=np.int64)].T
+
+    poa = (
+        beam_horizontal[:, None] * beam_ratio * unshaded
+        + diffuse_horizontal[:, None] * (1 + np.cos(tilt_rad)) / 2
+        + (ghi * config.albedo)[:, None] * (1 - np.cos(tilt_rad)) / 2
+    )
+    poa = np.where(((ghi > 0) & (solar_factor > 0))[:, None], np.maximum(0.0, poa), 0.0)
+    poa *= 1.0 - fleet.soiling_loss
+
+    cell_temperature = np.asarray(weather["temperature"], dtype=float)[:, None] + ((config.noct_c - 20) / 800.0) * poa
+    temp_efficiency = np.where(
+        cell_temperature <= 25,
+        1.0,
+        np.maximum(0.0, 1 - (cell_temperature - 25) * config.temp_coefficient),
+    )
+    # Panels installed after the weather year do not exist yet and produce nothing.
+    age = np.asarray(weather["year"], dtype=np.int64)[:, None] - fleet.install_year
+    degradation = np.where(age >= 0, (1 - fleet.degradation_rate) ** np.maximum(age, 0), 0.0)
+
+    return (
+        fleet.power_kw
+        * (poa / 1000.0)
+        * config.derating_factor
+        * config.site_calibration_factor
+        * temp_efficiency
+        * degradation
+    )
+
+
+def fleet_annual_energy(
+    fleet: PanelFleet,
+    weather: dict[str, np.ndarray],
+    config: TurinSimulationConfig | None = None,
+    chunk_hours: int = 168,
+) -> np.ndarray:
+    total = np.zeros(len(fleet))
+    daylight = np.flatnonzero((np.asarray(weather["ghi_wm2"]) > 0) & (np.asarray(weather["solar_angle"]) > 0))
+    for start in range(0, len(daylight), chunk_hours):
+        rows = daylight[start : start + chunk_hours]
+        chunk = {name: np.asarray(weather[name])[rows] for name in WEATHER_COLUMNS}
+        total += fleet_production(fleet, chunk, config=config).sum(axis=0)
+    return total
+
+
+def fleet_tick(
+    fleet: PanelFleet,
+    when: datetime | None = None,
+    config: TurinSimulationConfig | None = None,
+) -> np.ndarray:
+    config = config or TurinSimulationConfig()
+    local_now = when.astimezone(config.tzinfo) if when else datetime.now(config.tzinfo)
+    hour = simulate_days([local_now.date()], config=config, hours=[local_now.hour])
+    return fleet_production(fleet, {name: hour[name] for name in WEATHER_COLUMNS}, config=config)[0]
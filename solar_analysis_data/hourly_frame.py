@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+
+
+# Columns that only exist to derive the calendar and the text fields; row views leave them out.
+HIDDEN_COLUMNS = ("day_ordinal", "weekday", "utc_offset_hours")
+CALENDAR_COLUMNS = ("hour", "month", "day_of_year", "day_ordinal", "weekday")
+
+
+def _as_span(mask: np.ndarray) -> slice | np.ndarray:
+    # Calendar selections are usually one contiguous run, which a slice can return as a view.
+    positions = np.flatnonzero(mask)
+    if positions.size and positions[-1] - positions[0] + 1 == positions.size:
+        return slice(int(positions[0]), int(positions[-1]) + 1)
+    return positions
+
+
+@dataclass(eq=False)
+class HourlyFrame:
+    """Hourly results as typed columns of equal length; text fields are only built for row views."""
+
+    city: str
+    columns: dict[str, np.ndarray] = field(repr=False)
+
+    def __post_init__(self) -> None:
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("all columns of an HourlyFrame must have the same length")
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        view = self.columns[name].view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def fieldnames(self) -> list[str]:
+        return ["city", "timestamp", "date", *(name for name in self.columns if name not in HIDDEN_COLUMNS)]
+
+    @property
+    def nbytes(self) -> int:
+        # Aliased columns share one buffer and are counted once.
+        buffers = {}
+        for values in self.columns.values():
+            buffers[id(values if values.base is None else values.base)] = values.nbytes
+        return sum(buffers.values())
+
+    def add_column(self, name: str, values: np.ndarray) -> None:
+        values = np.asarray(values)
+        if self.columns and values.shape != (len(self),):
+            raise ValueError(f"column {name!r} must have shape ({len(self)},)")
+        self.columns[name] = values
+
+    def calendar(self) -> dict[str, np.ndarray]:
+        return {name: self[name] for name in CALENDAR_COLUMNS}
+
+    def take(self, selector: slice | np.ndarray) -> HourlyFrame:
+        return HourlyFrame(self.city, {name: values[selector] for name, values in self.columns.items()})
+
+    def month(self, month: int) -> HourlyFrame:
+        return self.take(_as_span(self.columns["month"] == month))
+
+    def day(self, day: date) -> HourlyFrame:
+        return self.take(_as_span(self.columns["day_ordinal"] == day.toordinal()))
+
+    def _text_columns(self) -> tuple[list[str], list[str]]:
+        ordinals = self.columns["day_ordinal"]
+        iso_days = {ordinal: date.fromordinal(ordinal).isoformat() for ordinal in np.unique(ordinals).tolist()}
+        dates = [iso_days[ordinal] for ordinal in ordinals.tolist()]
+        offsets = {}
+        for offset_hours in np.unique(self.columns["utc_offset_hours"]).tolist():
+            offset_minutes = int(round(offset_hours * 60))
+            sign = "+" if offset_minutes >= 0 else "-"
+            hours_part, minutes_part = divmod(abs(offset_minutes), 60)
+            offsets[offset_hours] = f"{sign}{hours_part:02d}:{minutes_part:02d}"
+        hours, utc_offsets = self.columns["hour"].tolist(), self.columns["utc_offset_hours"].tolist()
+        timestamps = [
+            f"{day}T{hour:02d}:00:00{offsets[offset]}" for day, hour, offset in zip(dates, hours, utc_offsets)
+        ]
+        return dates, timestamps
+
+    def rows(self) -> Iterator[dict[str, object]]:
+        visible = [name for name in self.columns if name not in HIDDEN_COLUMNS]
+        values = [self.columns[name].tolist() for name in visible]
+        dates, timestamps = self._text_columns()
+        for day, timestamp, record in zip(dates, timestamps, zip(*values)):
+            yield {"city": self.city, "timestamp": timestamp, "date": day, **dict(zip(visible, record))}
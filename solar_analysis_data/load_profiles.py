@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .turin_vectorized import calendar_columns, day_range
+except ImportError:
+    from solar_analysis_data.turin_vectorized import calendar_columns, day_range
+
+
+# Centre and width in hours of the daily peaks every archetype is built from.
+PEAK_SHAPES = {
+    "morning_peak_kw": (7.5, 1.7),
+    "evening_peak_kw": (19.5, 2.6),
+    "midday_peak_kw": (13.0, 2.8),
+}
+WEEKEND_HOURS = (10, 16)
+
+
+def year_calendar(year: int) -> dict[str, np.ndarray]:
+    start = date(year, 1, 1)
+    return calendar_columns(day_range(start, (date(year + 1, 1, 1) - start).days))
+
+
+def _archetype_params(archetype: str) -> dict[str, float]:
+    try:
+        return cfg.LOAD_ARCHETYPE_PARAMS[archetype]
+    except KeyError:
+        choices = sorted(cfg.LOAD_ARCHETYPE_PARAMS)
+        raise ValueError(f"unknown load archetype {archetype!r}; choose from {choices}") from None
+
+
+def archetype_weights(
+    calendar: dict[str, np.ndarray],
+    params: dict[str, float],
+    peak_shifts_hours: np.ndarray | None = None,
+) -> np.ndarray:
+    shifts = np.zeros(1) if peak_shifts_hours is None else np.asarray(peak_shifts_hours, dtype=float)
+    hour, weekday, day_of_year = calendar["hour"], calendar["weekday"], calendar["day_of_year"]
+
+    # The peaks only depend on the hour of day, so each household evaluates them on 24 hours and
+    # the year is gathered from that table; weekend and winter terms broadcast across households.
+    hours_of_day = np.arange(24) - shifts[:, None]
+    daily = np.full(hours_of_day.shape, params["base_load_kw"])
+    for name, (center, width) in PEAK_SHAPES.items():
+        daily += params.get(name, 0.0) * np.exp(-((hours_of_day - center) ** 2) / (2 * width**2))
+
+    weekend = (weekday >= 5) & (hour >= WEEKEND_HOURS[0]) & (hour <= WEEKEND_HOURS[1])
+    winter_factor = 1 + params["winter_bias"] * np.cos((2 * np.pi * (day_of_year - 15)) / 365)
+    weights = (daily[:, hour] + params["weekend_bias"] * weekend) * winter_factor
+    return weights if peak_shifts_hours is not None else weights[0]
+
+
+def load_profiles(
+    calendar: dict[str, np.ndarray],
+    archetypes: list[str] | str,
+    annual_consumption_kwh: np.ndarray | float,
+    seed: int | None = None,
+    jitter: dict[str, float] | None = None,
+) -> np.ndarray:
+    annual = np.atleast_1d(np.asarray(annual_consumption_kwh, dtype=float))
+    if isinstance(archetypes, str):
+        archetypes = [archetypes] * len(annual)
+    annual = np.broadcast_to(annual, (len(archetypes),))
+    count, hours = len(archetypes), len(calendar["hour"])
+
+    # Without a seed every household gets its archetype exactly; with one, peak times and hourly
+    # levels vary per household, drawn in a fixed order so the same seed gives the same portfolio.
+    shifts = np.zeros(count)
+    noise = None
+    if seed is not None:
+        jitter = {**cfg.LOAD_JITTER_PARAMS, **(jitter or {})}
+        rng = np.random.default_rng(seed)
+        shifts = rng.uniform(-jitter["peak_shift_hours"], jitter["peak_shift_hours"], count)
+        noise = np.maximum(rng.normal(1.0, jitter["hourly_sigma"], (count, hours)), 0.0)
+
+    names = np.asarray(archetypes)
+    weights = np.empty((count, hours))
+    for archetype in dict.fromkeys(archetypes):
+        members = np.flatnonzero(names == archetype)
+        weights[members] = archetype_weights(calendar, _archetype_params(archetype), shifts[members])
+    if noise is not None:
+        weights *= noise
+    return weights * (annual / weights.sum(axis=1))[:, None]
+
+
+def household_load(
+    calendar: dict[str, np.ndarray],
+    annual_consumption_kwh: float,
+    archetype: str = "commuter",
+) -> np.ndarray:
+    return load_profiles(calendar, [archetype], annual_consumption_kwh)[0]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .energy_index import EnergyBalanceIndex
+except ImportError:
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+
+
+@dataclass(frozen=True)
+class DeferrableLoad:
+    """A flexible consumer that needs a fixed amount of energy per day inside an hour window."""
+
+    name: str
+    daily_energy_kwh: float
+    max_power_kw: float
+    window_start_hour: int = 0
+    window_end_hour: int = 24
+    baseline_start_hour: int = 18
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.window_start_hour < self.window_end_hour <= 24:
+            raise ValueError(f"{self.name}: window must satisfy 0 <= start < end <= 24")
+        if self.daily_energy_kwh > self.max_power_kw * (self.window_end_hour - self.window_start_hour) + 1e-9:
+            raise ValueError(f"{self.name}: daily energy does not fit in the window at max power")
+        if self.daily_energy_kwh > self.max_power_kw * (24 - self.baseline_start_hour) + 1e-9:
+            raise ValueError(f"{self.name}: baseline run does not finish before midnight")
+
+    @property
+    def window(self) -> slice:
+        return slice(self.window_start_hour, self.window_end_hour)
+
+
+def deferrable_loads_from_config(params: dict[str, dict[str, float]] | None = None) -> list[DeferrableLoad]:
+    params = cfg.DEFERRABLE_LOAD_PARAMS if params is None else params
+    return [DeferrableLoad(name=name, **values) for name, values in params.items()]
+
+
+def _fill_in_order(order: np.ndarray, capacity: np.ndarray, energy: np.ndarray) -> np.ndarray:
+    # Pour `energy` into each day's hours in the given order, topping up one hour before the next.
+    sorted_capacity = np.take_along_axis(capacity, order, axis=1)
+    filled_before = np.cumsum(sorted_capacity, axis=1) - sorted_capacity
+    sorted_fill = np.clip(energy[:, None] - filled_before, 0.0, sorted_capacity)
+    fill = np.empty_like(sorted_fill)
+    np.put_along_axis(fill, order, sorted_fill, axis=1)
+    return fill
+
+
+def baseline_schedule(load: DeferrableLoad, n_days: int) -> np.ndarray:
+    hours = np.arange(24)
+    elapsed = np.clip(hours - load.baseline_start_hour, 0, None) * load.max_power_kw
+    profile = np.clip(load.daily_energy_kwh - elapsed, 0.0, load.max_power_kw) * (hours >= load.baseline_start_hour)
+    return np.tile(profile, (n_days, 1))
+
+
+def optimize_schedule(load: DeferrableLoad, surplus_kwh: np.ndarray) -> np.ndarray:
+    n_days = surplus_kwh.shape[0]
+    window_surplus = surplus_kwh[:, load.window]
+    energy = np.full(n_days, load.daily_energy_kwh)
+
+    # Placing a unit where PV is spare always self-consumes it, so the sunniest window hours are
+    # filled first up to the surplus; the rest goes into the hours with the most headroom left.
+    order = np.argsort(-window_surplus, axis=1, kind="stable")
+    on_surplus = _fill_in_order(order, np.minimum(window_surplus, load.max_power_kw), energy)
+    remainder = energy - on_surplus.sum(axis=1)
+    on_grid = _fill_in_order(order, load.max_power_kw - on_surplus, remainder)
+
+    schedule = np.zeros_like(surplus_kwh)
+    schedule[:, load.window] = on_surplus + on_grid
+    return schedule
+
+
+def shift_deferrable_loads(
+    production_kwh: np.ndarray,
+    rigid_load_kwh: np.ndarray,
+    loads: list[DeferrableLoad] | None = None,
+) -> dict[str, object]:
+    production = np.asarray(production_kwh, dtype=float)
+    rigid = np.asarray(rigid_load_kwh, dtype=float)
+    if production.shape != rigid.shape or production.size % 24:
+        raise ValueError("production and load must be aligned hourly series covering whole days")
+
+    loads = deferrable_loads_from_config() if loads is None else loads
+    production_days = production.reshape(-1, 24)
+    n_days = production_days.shape[0]
+
+    baseline = rigid.reshape(-1, 24).copy()
+    shifted = baseline.copy()
+    schedules: dict[str, np.ndarray] = {}
+    for load in loads:
+        baseline += baseline_schedule(load, n_days)
+        schedule = optimize_schedule(load, np.maximum(0.0, production_days - shifted))
+        shifted += schedule
+        schedules[load.name] = schedule.reshape(-1)
+
+    baseline = baseline.reshape(-1)
+    shifted = shifted.reshape(-1)
+    return {
+        "baseline_load_kwh": baseline,
+        "shifted_load_kwh": shifted,
+        "schedules": schedules,
+        "baseline_balance": EnergyBalanceIndex.from_arrays(production, baseline).balance(1.0),
+        "shifted_balance": EnergyBalanceIndex.from_arrays(production, shifted).balance(1.0),
+    }
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .energy_index import EnergyBalanceIndex
+    from .load_profiles import household_load, year_calendar
+    from .reliable_analysis import evaluate_system_size
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import ROUNDED_FIELDS, simulate_year
+except ImportError:
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+    from solar_analysis_data.load_profiles import household_load, year_calendar
+    from solar_analysis_data.reliable_analysis import evaluate_system_size
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import ROUNDED_FIELDS, simulate_year
+
+
+PERCENTILES = (10, 50, 90)
+DRAWS_PER_TASK = 25
+
+
+def draw_seeds(master_seed: int, n_draws: int) -> list[tuple[int, np.random.SeedSequence]]:
+    # Each draw owns one child sequence: its first word seeds the weather, the sequence itself
+    # drives the rate path. Results depend only on the master seed, not on how draws are split.
+    children = np.random.SeedSequence(master_seed).spawn(n_draws)
+    return [(int(child.generate_state(1)[0]), child) for child in children]
+
+
+def rate_escalation_path(
+    seed_sequence: np.random.SeedSequence,
+    years: int,
+    mean_increase: float,
+    volatility: float,
+) -> np.ndarray:
+    increases = np.random.default_rng(seed_sequence).normal(mean_increase, volatility, years - 1)
+    return np.concatenate(([1.0], np.cumprod(1 + np.maximum(increases, -0.99))))
+
+
+def _run_draws(
+    task: tuple[
+        int,
+        TurinSimulationConfig,
+        float,
+        dict[str, float],
+        np.ndarray,
+        list[tuple[int, np.random.SeedSequence]],
+        bool,
+        dict[str, list[float]] | None,
+    ],
+) -> list[dict[str, float | int | None]]:
+    year, config, system_size_kw, econ, load, draws, vary_rates, normals = task
+    results = []
+    for weather_seed, seed_sequence in draws:
+        arrays = simulate_year(year, config=replace(config, seed=weather_seed), normals=normals)
+        production = np.round(arrays["production_kw"], ROUNDED_FIELDS["production_kw"])
+        index = EnergyBalanceIndex.from_arrays(production, load)
+        rate_multipliers = None
+        if vary_rates:
+            rate_multipliers = rate_escalation_path(
+                seed_sequence, econ["analysis_years"], econ["annual_rate_increase"], econ["annual_rate_volatility"]
+            )
+        scenario = evaluate_system_size(
+            None, system_size_kw, config.system_size_kw, econ=econ, index=index, rate_multipliers=rate_multipliers
+        )
+        results.append(
+            {
+                "weather_seed": weather_seed,
+                "npv_25_years_euro": float(scenario["npv_25_years_euro"]),
+                "payback_years": scenario["payback_years"],
+                "self_consumption_pct": float(scenario["year_one"]["self_consumption_pct"]),
+                "annual_production_kwh": float(scenario["year_one"]["annual_production_kwh"]),
+            }
+        )
+    return results
+
+
+def percentile_summary(values: np.ndarray, method: str = "linear") -> dict[str, float | None]:
+    summary = {}
+    for percentile in PERCENTILES:
+        value = float(np.percentile(values, percentile, method=method))
+        summary[f"p{percentile}"] = value if np.isfinite(value) else None
+    return summary
+
+
+def run_monte_carlo(
+    n_draws: int,
+    year: int | None = None,
+    config: TurinSimulationConfig | None = None,
+    system_size_kw: float | None = None,
+    econ: dict[str, float] | None = None,
+    master_seed: int | None = None,
+    vary_rates: bool = False,
+    max_workers: int | None = None,
+    normals: dict[str, list[float]] | None = None,
+    load_archetype: str = "commuter",
+) -> dict[str, object]:
+    if n_draws <= 0:
+        raise ValueError("n_draws must be positive")
+    year = year or cfg.SIMULATION_PARAMS["analysis_year"]
+    config = config or TurinSimulationConfig()
+    system_size_kw = system_size_kw or config.system_size_kw
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    master_seed = config.seed if master_seed is None else master_seed
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # The household load depends on the calendar only, so every draw shares one profile.
+    load = np.round(household_load(year_calendar(year), econ["household_consumption"], load_archetype), 6)
+    draws = draw_seeds(master_seed, n_draws)
+    tasks = [
+        (year, config, system_size_kw, econ, load, draws[start : start + DRAWS_PER_TASK], vary_rates, normals)
+        for start in range(0, n_draws, DRAWS_PER_TASK)
+    ]
+
+    if max_workers == 1 or len(tasks) <= 1:
+        batches = [_run_draws(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            batches = list(executor.map(_run_draws, tasks))
+    results = [result for batch in batches for result in batch]
+
+    payback = np.array([np.inf if item["payback_years"] is None else item["payback_years"] for item in results])
+    return {
+        "draws": n_draws,
+        "master_seed": master_seed,
+        "simulation_year": year,
+        "panel_size_kw": system_size_kw,
+        "vary_rates": vary_rates,
+        "npv_25_years_euro": percentile_summary(np.array([item["npv_25_years_euro"] for item in results])),
+        "payback_years": percentile_summary(payback, method="nearest"),
+        "self_consumption_pct": percentile_summary(np.array([item["self_consumption_pct"] for item in results])),
+        "annual_production_kwh": percentile_summary(np.array([item["annual_production_kwh"] for item in results])),
+        "no_payback_share": float(np.mean(~np.isfinite(payback))),
+    }
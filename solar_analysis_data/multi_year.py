@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+try:
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import daily_cloud_states, day_range, simulate_days
+except ImportError:
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import daily_cloud_states, day_range, simulate_days
+
+
+CHUNK_UNITS = ("month", "year")
+
+
+def horizon_days(start_year: int, n_years: int) -> list[date]:
+    start = date(start_year, 1, 1)
+    return day_range(start, (date(start_year + n_years, 1, 1) - start).days)
+
+
+def cloud_state_chain(days: list[date], config: TurinSimulationConfig) -> np.ndarray:
+    # The AR(1) chain restarts every 1 January, exactly like `simulate_year`, so a multi-year
+    # run is the concatenation of the single-year runs and can share their cache entries.
+    states = np.empty(len(days))
+    start = 0
+    for index in range(1, len(days) + 1):
+        if index == len(days) or days[index].year != days[start].year:
+            states[start:index] = daily_cloud_states(days[start:index], config)
+            start = index
+    return states
+
+
+def chunk_bounds(days: list[date], unit: str = "month") -> list[tuple[int, int]]:
+    if unit not in CHUNK_UNITS:
+        raise ValueError(f"unit must be one of {CHUNK_UNITS}")
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    for index in range(1, len(days) + 1):
+        boundary = index == len(days) or days[index].year != days[start].year
+        if unit == "month":
+            boundary = boundary or days[index].month != days[start].month
+        if boundary:
+            bounds.append((start, index))
+            start = index
+    return bounds
+
+
+def _simulate_chunk(
+    task: tuple[int, int, TurinSimulationConfig, np.ndarray, dict[str, list[float]] | None],
+) -> dict[str, np.ndarray]:
+    first_ordinal, n_days, config, cloud_states, normals = task
+    days = day_range(date.fromordinal(first_ordinal), n_days)
+    return simulate_days(days, config=config, cloud_states=cloud_states, normals=normals)
+
+
+def simulate_years(
+    start_year: int,
+    n_years: int,
+    config: TurinSimulationConfig | None = None,
+    normals: dict[str, list[float]] | None = None,
+    max_workers: int | None = None,
+    chunk: str = "month",
+) -> dict[str, np.ndarray]:
+    config = config or TurinSimulationConfig()
+    max_workers = max_workers or os.cpu_count() or 1
+    days = horizon_days(start_year, n_years)
+    cloud_states = cloud_state_chain(days, config)
+    tasks = [
+        (days[start].toordinal(), end - start, config, cloud_states[start:end], normals)
+        for start, end in chunk_bounds(days, chunk)
+    ]
+
+    if max_workers == 1 or len(tasks) <= 1:
+        parts = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            parts = list(executor.map(_simulate_chunk, tasks))
+
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+
+NOISE_MODES = ("sha256", "counter")
+HOURS = np.arange(24, dtype=np.int64)
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_DAILY_SLOT = 24
+_SLOTS_PER_DAY = 25
+
+
+def _as_hours(hours: Sequence[int] | np.ndarray | None) -> np.ndarray | None:
+    return None if hours is None else np.asarray(hours, dtype=np.int64)
+
+
+def _scale(fraction: np.ndarray, low: float, high: float) -> np.ndarray:
+    return low + (high - low) * fraction
+
+
+def sha256_noise(
+    seed: int,
+    days: Sequence[date],
+    tag: str,
+    low: float = -1.0,
+    high: float = 1.0,
+    hours: Sequence[int] | np.ndarray | None = None,
+) -> np.ndarray:
+    hour_values = _as_hours(hours)
+    digests = bytearray()
+    if hour_values is None:
+        for day in days:
+            digests += hashlib.sha256(f"{seed}|{day}|{tag}".encode("utf-8")).digest()[:8]
+    else:
+        suffixes = [f"|{hour}|{tag}".encode("utf-8") for hour in hour_values.tolist()]
+        for day in days:
+            prefix = hashlib.sha256(f"{seed}|{day}".encode("utf-8"))
+            for suffix in suffixes:
+                hasher = prefix.copy()
+                hasher.update(suffix)
+                digests += hasher.digest()[:8]
+
+    fraction = np.frombuffer(bytes(digests), dtype=">u8").astype(np.float64) / float(2**64 - 1)
+    values = _scale(fraction, low, high)
+    return values if hour_values is None else values.reshape(len(days), len(hour_values))
+
+
+def _stream_key(seed: int, tag: str) -> np.uint64:
+    digest = hashlib.sha256(f"{seed}|{tag}".encode("utf-8")).digest()
+    return np.uint64(int.from_bytes(digest[:8], "big"))
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        z = values + _GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+        return z ^ (z >> np.uint64(31))
+
+
+def counter_noise(
+    seed: int,
+    days: Sequence[date] | np.ndarray,
+    tag: str,
+    low: float = -1.0,
+    high: float = 1.0,
+    hours: Sequence[int] | np.ndarray | None = None,
+) -> np.ndarray:
+    if isinstance(days, np.ndarray):
+        ordinals = days.astype(np.uint64)
+    else:
+        ordinals = np.array([day.toordinal() for day in days], dtype=np.uint64)
+    hour_values = _as_hours(hours)
+    if hour_values is None:
+        slots = np.full(1, _DAILY_SLOT, dtype=np.uint64)
+    else:
+        slots = hour_values.astype(np.uint64)
+
+    with np.errstate(over="ignore"):
+        counters = ordinals[:, None] * np.uint64(_SLOTS_PER_DAY) + slots[None, :]
+        mixed = _splitmix64(_splitmix64(counters ^ _stream_key(seed, tag)))
+    fraction = (mixed >> np.uint64(11)).astype(np.float64) * (1.0 / 2**53)
+    values = _scale(fraction, low, high)
+    return values[:, 0] if hour_values is None else values
+
+
+def bulk_noise(
+    seed: int,
+    days: Sequence[date],
+    tag: str,
+    low: float = -1.0,
+    high: float = 1.0,
+    hours: Sequence[int] | np.ndarray | None = None,
+    mode: str = "sha256",
+) -> np.ndarray:
+    if mode == "sha256":
+        return sha256_noise(seed, days, tag, low=low, high=high, hours=hours)
+    if mode == "counter":
+        return counter_noise(seed, days, tag, low=low, high=high, hours=hours)
+    raise ValueError(f"Unknown noise mode {mode!r}; expected one of {NOISE_MODES}")
@@ -4,9 +4,12 @@ import csv
 import json
 import math
 import sys
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
@@ -14,65 +17,65 @@ if str(PROJECT_ROOT) not in sys.path:
 from config import userdata_config as cfg
 
 try:
-    from .turin_model import TurinSimulationConfig, generate_hourly_dataset
+    from .artifacts import artifact_path, read_frame, write_frame
+    from .battery import battery_capacities, best_battery_configuration, evaluate_battery_grid
+    from .build_manifest import BuildManifest, file_fingerprint, read_json, stage_fingerprint, write_json
+    from .energy_index import EnergyBalanceIndex
+    from .hourly_frame import HourlyFrame
+    from .load_profiles import household_load
+    from .load_shifting import shift_deferrable_loads
+    from .scenario_cube import build_scenario_cube, cube_sizes, write_scenario_cube
+    from .simulation_cache import SimulationCache, cache_key
+    from .tariffs import Tariff, priced_index, tariff_from_config
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import frame_from_arrays
 except ImportError:
-    from solar_analysis_data.turin_model import TurinSimulationConfig, generate_hourly_dataset
+    from solar_analysis_data.artifacts import artifact_path, read_frame, write_frame
+    from solar_analysis_data.battery import battery_capacities, best_battery_configuration, evaluate_battery_grid
+    from solar_analysis_data.build_manifest import (
+        BuildManifest,
+        file_fingerprint,
+        read_json,
+        stage_fingerprint,
+        write_json,
+    )
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+    from solar_analysis_data.hourly_frame import HourlyFrame
+    from solar_analysis_data.load_profiles import household_load
+    from solar_analysis_data.load_shifting import shift_deferrable_loads
+    from solar_analysis_data.scenario_cube import build_scenario_cube, cube_sizes, write_scenario_cube
+    from solar_analysis_data.simulation_cache import SimulationCache, cache_key
+    from solar_analysis_data.tariffs import Tariff, priced_index, tariff_from_config
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import frame_from_arrays
 
 
 ROOT_DIR = Path(__file__).resolve().parent
 DATA_DIR = ROOT_DIR / "data"
 OUTPUT_DIR = ROOT_DIR / "notebooks_output"
+CANDIDATE_SIZES_KW = [2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0]
+MIN_SYSTEM_SIZE_KW = 0.5
+MAX_SYSTEM_SIZE_KW = 20.0
+SIZE_RESOLUTION_KW = 0.01
+GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
 
 
-def gaussian(hour: int, center: float, width: float) -> float:
-    return math.exp(-((hour - center) ** 2) / (2 * width**2))
-
-
-def build_household_load(rows: list[dict[str, object]], annual_consumption_kwh: float) -> None:
-    params = cfg.LOAD_PROFILE_PARAMS
-    raw_weights: list[float] = []
-
-    for row in rows:
-        timestamp = datetime.fromisoformat(str(row["timestamp"]))
-        hour = timestamp.hour
-        day_of_year = int(row["day_of_year"])
-        weekday = timestamp.weekday()
-
-        morning_peak = params["morning_peak_kw"] * gaussian(hour, 7.5, 1.7)
-        evening_peak = params["evening_peak_kw"] * gaussian(hour, 19.5, 2.6)
-        midday_bump = 0.16 * gaussian(hour, 13.0, 2.8)
-        weekend_bump = params["weekend_bias"] if weekday >= 5 and 10 <= hour <= 16 else 0.0
-        winter_factor = 1 + params["winter_bias"] * math.cos((2 * math.pi * (day_of_year - 15)) / 365)
-        weight = (
-            params["base_load_kw"] + morning_peak + evening_peak + midday_bump + weekend_bump
-        ) * winter_factor
-        raw_weights.append(weight)
-
-    scale = annual_consumption_kwh / sum(raw_weights)
-    for row, weight in zip(rows, raw_weights):
-        row["load_kwh"] = round(weight * scale, 6)
-
+def build_household_load(
+    frame: HourlyFrame,
+    annual_consumption_kwh: float,
+    archetype: str = "commuter",
+) -> None:
+    frame.add_column("load_kwh", np.round(household_load(frame.calendar(), annual_consumption_kwh, archetype), 6))
 
-def energy_balance(rows: list[dict[str, object]], size_scale: float) -> dict[str, float]:
-    annual_production = 0.0
-    annual_self_consumed = 0.0
-    annual_exported = 0.0
-    annual_imported = 0.0
-    annual_load = 0.0
 
-    for row in rows:
-        production = float(row["hourly_production_kwh"]) * size_scale
-        load = float(row["load_kwh"])
-        self_consumed = min(production, load)
-        exported = max(0.0, production - load)
-        imported = max(0.0, load - production)
-
-        annual_production += production
-        annual_self_consumed += self_consumed
-        annual_exported += exported
-        annual_imported += imported
-        annual_load += load
+def energy_balance(frame: HourlyFrame, size_scale: float) -> dict[str, float]:
+    production = frame["hourly_production_kwh"] * size_scale
+    load = frame["load_kwh"]
+    self_consumed = np.minimum(production, load)
 
+    annual_production = float(production.sum())
+    annual_self_consumed = float(self_consumed.sum())
+    annual_load = float(load.sum())
     self_consumption_pct = (annual_self_consumed / annual_production * 100) if annual_production else 0.0
     demand_coverage_pct = (annual_self_consumed / annual_load * 100) if annual_load else 0.0
     production_coverage_pct = (annual_production / annual_load * 100) if annual_load else 0.0
@@ -80,8 +83,8 @@ def energy_balance(rows: list[dict[str, object]], size_scale: float) -> dict[str
     return {
         "annual_production_kwh": annual_production,
         "annual_self_consumed_kwh": annual_self_consumed,
-        "annual_exported_kwh": annual_exported,
-        "annual_imported_kwh": annual_imported,
+        "annual_exported_kwh": float(np.maximum(0.0, production - load).sum()),
+        "annual_imported_kwh": float(np.maximum(0.0, load - production).sum()),
         "annual_load_kwh": annual_load,
         "self_consumption_pct": self_consumption_pct,
         "demand_coverage_pct": demand_coverage_pct,
@@ -94,15 +97,26 @@ def payback_display(payback_year: int | None) -> str:
 
 
 def evaluate_system_size(
-    rows: list[dict[str, object]],
+    frame: HourlyFrame | None,
     system_size_kw: float,
     base_system_size_kw: float,
+    econ: dict[str, float] | None = None,
+    index: EnergyBalanceIndex | None = None,
+    rate_multipliers: np.ndarray | None = None,
+    tariff: Tariff | None = None,
 ) -> dict[str, object]:
-    econ = cfg.ECON_PARAMS
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
     losses = cfg.LOSS_PARAMS
+    if index is None:
+        index = EnergyBalanceIndex.from_frame(frame)
+    if rate_multipliers is None:
+        rate_multipliers = (1 + econ["annual_rate_increase"]) ** np.arange(econ["analysis_years"])
+    if len(rate_multipliers) < econ["analysis_years"]:
+        raise ValueError("rate_multipliers must cover every analysis year")
+    rate_multipliers = [float(value) for value in rate_multipliers]
     size_scale = system_size_kw / base_system_size_kw
     installation_cost = system_size_kw * econ["installation_cost_per_kw"]
-    year_one = energy_balance(rows, size_scale)
+    year_one = index.balance(size_scale)
 
     cash_flow = [-installation_cost]
     cumulative = [-installation_cost]
@@ -110,18 +124,27 @@ def evaluate_system_size(
     yearly_snapshots: list[dict[str, float]] = []
     payback_year = None
 
+    degradation = (1 - losses.get("degradation_rate", 0.0)) ** np.arange(econ["analysis_years"])
+    yearly_balances = index.balances(size_scale * degradation)
+    # Without a tariff every kWh is priced at the flat rates; with one, the yearly savings and
+    # export revenue at base prices come from the price-weighted prefix sums in one call.
+    tariff_values = priced_index(index, tariff).values(size_scale * degradation) if tariff is not None else None
+
     for year in range(1, econ["analysis_years"] + 1):
-        degradation = (1 - losses.get("degradation_rate", 0.0)) ** (year - 1)
-        balance = energy_balance(rows, size_scale * degradation)
-        energy_multiplier = (1 + econ["annual_rate_increase"]) ** (year - 1)
+        balance = {name: float(values[year - 1]) for name, values in yearly_balances.items()}
+        energy_multiplier = rate_multipliers[year - 1]
         electricity_rate = econ["electricity_rate"] * energy_multiplier
         sell_back_rate = econ["sell_back_rate"] * energy_multiplier
         incentive_rate = econ["incentive_rate"] * energy_multiplier
         maintenance_cost = econ["annual_maintenance"]
 
         exchanged_kwh = min(balance["annual_exported_kwh"], balance["annual_imported_kwh"])
-        savings = balance["annual_self_consumed_kwh"] * electricity_rate
-        export_revenue = balance["annual_exported_kwh"] * sell_back_rate
+        if tariff_values is None:
+            savings = balance["annual_self_consumed_kwh"] * electricity_rate
+            export_revenue = balance["annual_exported_kwh"] * sell_back_rate
+        else:
+            savings = float(tariff_values["savings_euro"][year - 1]) * energy_multiplier
+            export_revenue = float(tariff_values["export_revenue_euro"][year - 1]) * energy_multiplier
         incentive = exchanged_kwh * incentive_rate
         yearly_benefit = savings + export_revenue + incentive - maintenance_cost
 
@@ -150,9 +173,10 @@ def evaluate_system_size(
     roi_20_years = (net_profit_20 / installation_cost) * 100 if installation_cost else 0.0
     npv_25_years = sum(discounted)
 
+    # The grid-only bill and the break-even rate stay flat-rate reference figures under any tariff.
     grid_cost_20_years = 0.0
     for year in range(1, horizon_20 + 1):
-        rate = econ["electricity_rate"] * ((1 + econ["annual_rate_increase"]) ** (year - 1))
+        rate = econ["electricity_rate"] * rate_multipliers[year - 1]
         grid_cost_20_years += year_one["annual_load_kwh"] * rate
 
     break_even_rate = (
@@ -167,6 +191,7 @@ def evaluate_system_size(
 
     return {
         "panel_size_kw": system_size_kw,
+        "tariff": "flat" if tariff is None else tariff.name,
         "installation_cost_euro": installation_cost,
         "year_one": year_one,
         "cash_flow": cash_flow,
@@ -184,10 +209,76 @@ def evaluate_system_size(
     }
 
 
-def build_sensitivity_table(rows: list[dict[str, object]], base_system_size_kw: float) -> list[dict[str, object]]:
+def scenario_rank(scenario: dict[str, object]) -> tuple[float, int, float]:
+    return (
+        float(scenario["npv_25_years_euro"]),
+        -999 if scenario["payback_years"] is None else -int(scenario["payback_years"]),
+        -float(scenario["panel_size_kw"]),
+    )
+
+
+def best_scenario(scenarios: list[dict[str, object]]) -> dict[str, object]:
+    return max(scenarios, key=scenario_rank)
+
+
+class ScenarioEvaluator:
+    """Memoised `evaluate_system_size` keyed by dataset fingerprint, size, economic parameters and tariff."""
+
+    def __init__(
+        self,
+        frame: HourlyFrame | None,
+        base_system_size_kw: float,
+        index: EnergyBalanceIndex | None = None,
+        cache: dict[tuple[object, ...], dict[str, object]] | None = None,
+        tariff: Tariff | None = None,
+    ):
+        self.frame = frame
+        self.base_system_size_kw = float(base_system_size_kw)
+        self.index = index if index is not None else EnergyBalanceIndex.from_frame(frame)
+        self.cache = cache if cache is not None else {}
+        self.tariff = tariff
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, system_size_kw: float, econ: dict[str, float] | None = None) -> tuple[object, ...]:
+        merged = {**cfg.ECON_PARAMS, **(econ or {})}
+        econ_key = tuple(sorted(merged.items()))
+        tariff_key = None if self.tariff is None else self.tariff.key
+        return (self.index.fingerprint, float(system_size_kw), self.base_system_size_kw, econ_key, tariff_key)
+
+    def evaluate(self, system_size_kw: float, econ: dict[str, float] | None = None) -> dict[str, object]:
+        key = self.key(system_size_kw, econ)
+        scenario = self.cache.get(key)
+        if scenario is not None:
+            self.hits += 1
+            return scenario
+
+        self.misses += 1
+        scenario = evaluate_system_size(
+            self.frame, system_size_kw, self.base_system_size_kw, econ=econ, index=self.index, tariff=self.tariff
+        )
+        self.cache[key] = scenario
+        return scenario
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.cache),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def build_sensitivity_table(
+    frame: HourlyFrame,
+    base_system_size_kw: float,
+    evaluator: ScenarioEvaluator | None = None,
+) -> list[dict[str, object]]:
+    evaluator = evaluator or ScenarioEvaluator(frame, base_system_size_kw)
     results = []
-    for panel_size_kw in [2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0]:
-        scenario = evaluate_system_size(rows, panel_size_kw, base_system_size_kw)
+    for panel_size_kw in candidate_sizes():
+        scenario = evaluator.evaluate(panel_size_kw)
         year_one = scenario["year_one"]
         results.append(
             {
@@ -203,6 +294,103 @@ def build_sensitivity_table(rows: list[dict[str, object]], base_system_size_kw:
     return results
 
 
+def size_bounds(low: float | None = None, high: float | None = None) -> tuple[float, float]:
+    roof_limit = cfg.PANEL_PARAMS.get("max_power_by_area_kw") or MAX_SYSTEM_SIZE_KW
+    low = MIN_SYSTEM_SIZE_KW if low is None else low
+    high = min(MAX_SYSTEM_SIZE_KW, roof_limit) if high is None else high
+    if not 0 < low <= high:
+        raise ValueError("size bounds must satisfy 0 < low <= high")
+    return float(low), float(high)
+
+
+def candidate_sizes() -> list[float]:
+    low, high = size_bounds()
+    return [size_kw for size_kw in CANDIDATE_SIZES_KW if low <= size_kw <= high]
+
+
+def quantize_size(size_kw: float) -> float:
+    return round(round(size_kw / SIZE_RESOLUTION_KW) * SIZE_RESOLUTION_KW, 6)
+
+
+def optimize_system_size(
+    evaluator: ScenarioEvaluator,
+    low: float | None = None,
+    high: float | None = None,
+    econ: dict[str, float] | None = None,
+    coarse_step_kw: float = 0.25,
+) -> dict[str, object]:
+    low, high = size_bounds(low, high)
+    evaluated: dict[float, dict[str, object]] = {}
+
+    def npv(size_kw: float) -> float:
+        size_kw = quantize_size(min(high, max(low, size_kw)))
+        if size_kw not in evaluated:
+            evaluated[size_kw] = evaluator.evaluate(size_kw, econ=econ)
+        return float(evaluated[size_kw]["npv_25_years_euro"])
+
+    grid = np.unique(np.append(np.arange(low, high, coarse_step_kw), high))
+    for size_kw in grid:
+        npv(size_kw)
+
+    # NPV is piecewise smooth in the size, so the coarse optimum brackets the true one; a
+    # golden-section search on the neighbouring grid cells refines it to SIZE_RESOLUTION_KW.
+    coarse = best_scenario(list(evaluated.values()))
+    position = int(np.searchsorted(grid, coarse["panel_size_kw"] - 1e-9))
+    left = float(grid[max(0, position - 1)])
+    right = float(grid[min(len(grid) - 1, position + 1)])
+    inner_left = right - GOLDEN_RATIO * (right - left)
+    inner_right = left + GOLDEN_RATIO * (right - left)
+    while right - left > SIZE_RESOLUTION_KW:
+        if npv(inner_left) >= npv(inner_right):
+            right, inner_right = inner_right, inner_left
+            inner_left = right - GOLDEN_RATIO * (right - left)
+        else:
+            left, inner_left = inner_left, inner_right
+            inner_right = left + GOLDEN_RATIO * (right - left)
+    npv(left)
+    npv(right)
+
+    # A winner on a bound means NPV was still improving there: the best size allowed, not a turning point.
+    optimal = best_scenario(list(evaluated.values()))
+    return {
+        "optimal": optimal,
+        "bounds_kw": [low, high],
+        "at_bound": optimal["panel_size_kw"] in (quantize_size(low), quantize_size(high)),
+        "evaluations": len(evaluated),
+    }
+
+
+def build_battery_sizing(frame: HourlyFrame, base_system_size_kw: float) -> dict[str, object]:
+    grid = evaluate_battery_grid(
+        frame["hourly_production_kwh"],
+        frame["load_kwh"],
+        candidate_sizes(),
+        battery_capacities(),
+        base_system_size_kw,
+    )
+    return {
+        "best": best_battery_configuration(grid),
+        "capacities_kwh": grid["capacities_kwh"].tolist(),
+        "system_sizes_kw": grid["system_sizes_kw"].tolist(),
+        "npv_25_years_euro": np.round(grid["npv_25_years_euro"], 0).tolist(),
+        "self_consumption_pct": np.round(grid["self_consumption_pct"], 1).tolist(),
+    }
+
+
+def build_smart_scheduling(frame: HourlyFrame) -> dict[str, object]:
+    shifted = shift_deferrable_loads(frame["system_hourly_kwh"], frame["load_kwh"])
+    summary: dict[str, object] = {"deferrable_loads": sorted(shifted["schedules"])}
+    for label in ("baseline", "shifted"):
+        balance = shifted[f"{label}_balance"]
+        summary[label] = {
+            "annual_load_kwh": round(balance["annual_load_kwh"], 1),
+            "annual_self_consumed_kwh": round(balance["annual_self_consumed_kwh"], 1),
+            "self_consumption_pct": round(balance["self_consumption_pct"], 1),
+            "demand_coverage_pct": round(balance["demand_coverage_pct"], 1),
+        }
+    return summary
+
+
 def score_recommendation(scenario: dict[str, object]) -> tuple[int, list[str], list[str]]:
     year_one = scenario["year_one"]
     score = 0
@@ -283,69 +471,49 @@ def verdict_from_score(score: int) -> str:
     return "NOT RECOMMENDED"
 
 
-def enrich_rows_for_current_system(rows: list[dict[str, object]], current_system_size_kw: float) -> None:
+def enrich_frame_for_current_system(frame: HourlyFrame, current_system_size_kw: float) -> None:
     base_system_size_kw = float(cfg.PANEL_PARAMS["panel_power_kw"])
-    scale = current_system_size_kw / base_system_size_kw
-    for row in rows:
-        production = float(row["hourly_production_kwh"]) * scale
-        load = float(row["load_kwh"])
-        row["system_hourly_kwh"] = round(production, 6)
-        row["self_consumed_kwh"] = round(min(production, load), 6)
-        row["grid_export_kwh"] = round(max(0.0, production - load), 6)
-        row["grid_import_kwh"] = round(max(0.0, load - production), 6)
-
-
-def monthly_summary(rows: list[dict[str, object]]) -> list[dict[str, object]]:
-    months: dict[int, dict[str, float]] = {}
-    counts: dict[int, int] = {}
-
-    for row in rows:
-        month = int(row["month"])
-        months.setdefault(
-            month,
-            {
-                "temperature_sum": 0.0,
-                "cloud_sum": 0.0,
-                "ghi_sum": 0.0,
-                "production_sum": 0.0,
-                "load_sum": 0.0,
-                "self_sum": 0.0,
-                "export_sum": 0.0,
-                "import_sum": 0.0,
-            },
-        )
-        counts[month] = counts.get(month, 0) + 1
-        bucket = months[month]
-        bucket["temperature_sum"] += float(row["temperature"])
-        bucket["cloud_sum"] += float(row["cloudcover"])
-        bucket["ghi_sum"] += float(row["ghi_wm2"])
-        bucket["production_sum"] += float(row["system_hourly_kwh"])
-        bucket["load_sum"] += float(row["load_kwh"])
-        bucket["self_sum"] += float(row["self_consumed_kwh"])
-        bucket["export_sum"] += float(row["grid_export_kwh"])
-        bucket["import_sum"] += float(row["grid_import_kwh"])
+    production = frame["hourly_production_kwh"] * (current_system_size_kw / base_system_size_kw)
+    load = frame["load_kwh"]
+    frame.add_column("system_hourly_kwh", np.round(production, 6))
+    frame.add_column("self_consumed_kwh", np.round(np.minimum(production, load), 6))
+    frame.add_column("grid_export_kwh", np.round(np.maximum(0.0, production - load), 6))
+    frame.add_column("grid_import_kwh", np.round(np.maximum(0.0, load - production), 6))
+
+
+def monthly_summary(frame: HourlyFrame) -> list[dict[str, object]]:
+    # Months are 1-12, so bincount sums every column per month without a Python loop over hours.
+    month = frame["month"].astype(np.intp)
+
+    def per_month(name: str) -> np.ndarray:
+        return np.bincount(month, weights=frame[name], minlength=13)
+
+    counts = np.bincount(month, minlength=13)
+    averages = {name: per_month(name) / np.maximum(counts, 1) for name in ("temperature", "cloudcover", "ghi_wm2")}
+    totals = {
+        name: per_month(name)
+        for name in ("system_hourly_kwh", "load_kwh", "self_consumed_kwh", "grid_export_kwh", "grid_import_kwh")
+    }
 
     summary: list[dict[str, object]] = []
-    for month in range(1, 13):
-        bucket = months[month]
-        count = counts[month]
+    for month_number in range(1, 13):
         summary.append(
             {
-                "month": month,
-                "avg_temperature_c": round(bucket["temperature_sum"] / count, 2),
-                "avg_cloud_cover_pct": round(bucket["cloud_sum"] / count, 1),
-                "avg_ghi_wm2": round(bucket["ghi_sum"] / count, 1),
-                "production_kwh": round(bucket["production_sum"], 1),
-                "load_kwh": round(bucket["load_sum"], 1),
-                "self_consumed_kwh": round(bucket["self_sum"], 1),
-                "grid_export_kwh": round(bucket["export_sum"], 1),
-                "grid_import_kwh": round(bucket["import_sum"], 1),
+                "month": month_number,
+                "avg_temperature_c": round(float(averages["temperature"][month_number]), 2),
+                "avg_cloud_cover_pct": round(float(averages["cloudcover"][month_number]), 1),
+                "avg_ghi_wm2": round(float(averages["ghi_wm2"][month_number]), 1),
+                "production_kwh": round(float(totals["system_hourly_kwh"][month_number]), 1),
+                "load_kwh": round(float(totals["load_kwh"][month_number]), 1),
+                "self_consumed_kwh": round(float(totals["self_consumed_kwh"][month_number]), 1),
+                "grid_export_kwh": round(float(totals["grid_export_kwh"][month_number]), 1),
+                "grid_import_kwh": round(float(totals["grid_import_kwh"][month_number]), 1),
             }
         )
     return summary
 
 
-def write_csv(path: Path, rows: list[dict[str, object]], fieldnames: list[str]) -> None:
+def write_csv(path: Path, rows: Iterable[dict[str, object]], fieldnames: list[str]) -> None:
     with path.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
@@ -361,9 +529,17 @@ def build_text_report(
     concerns: list[str],
     monthly: list[dict[str, object]],
     year: int,
+    size_search: dict[str, object] | None = None,
 ) -> str:
     current_year_one = current["year_one"]
     optimal_year_one = optimal["year_one"]
+    optimal_heading = ["OPTIMAL SIZE"]
+    if size_search and size_search["at_bound"]:
+        low, high = size_search["bounds_kw"]
+        optimal_heading = [
+            "BEST SIZE WITHIN LIMITS",
+            f"  Search range: {low:g}-{high:g} kWp; NPV still improves at this bound, so it is not an optimum",
+        ]
     best_month = max(monthly, key=lambda row: float(row["production_kwh"]))
     worst_month = min(monthly, key=lambda row: float(row["production_kwh"]))
 
@@ -388,7 +564,7 @@ def build_text_report(
         f"  20-year net profit: EUR {float(current['net_profit_20_years_euro']):,.0f}",
         f"  25-year NPV: EUR {float(current['npv_25_years_euro']):,.0f}",
         "",
-        "BEST SIZE TESTED",
+        *optimal_heading,
         f"  Size: {optimal['panel_size_kw']} kWp",
         f"  Annual production: {float(optimal_year_one['annual_production_kwh']):.0f} kWh",
         f"  Self-consumption: {float(optimal_year_one['self_consumption_pct']):.1f}%",
@@ -430,79 +606,219 @@ def build_text_report(
     return "\n".join(lines)
 
 
-def run_reliable_analysis(year: int | None = None) -> dict[str, object]:
+def _monte_carlo_params() -> dict[str, object]:
+    params = cfg.SIMULATION_PARAMS
+    master_seed = params.get("monte_carlo_seed")
+    return {
+        "draws": int(params.get("monte_carlo_draws", 0)),
+        "master_seed": params["seed"] if master_seed is None else int(master_seed),
+        "vary_rates": bool(params.get("monte_carlo_vary_rates", False)),
+    }
+
+
+def _economics_inputs() -> dict[str, object]:
+    # Everything the scenario evaluation reads from the config; a price curve is tracked by content.
+    return {
+        "econ": cfg.ECON_PARAMS,
+        "loss": cfg.LOSS_PARAMS,
+        "panel": cfg.PANEL_PARAMS,
+        "battery": cfg.BATTERY_PARAMS,
+        "tariff": cfg.TARIFF_PARAMS,
+        "price_curve": file_fingerprint(cfg.TARIFF_PARAMS.get("price_curve_file")),
+        "candidate_sizes_kw": CANDIDATE_SIZES_KW,
+        "monte_carlo": _monte_carlo_params(),
+    }
+
+
+def run_reliable_analysis(
+    year: int | None = None,
+    cache: SimulationCache | None = None,
+    build_dir: Path | str | None = None,
+    force: bool = False,
+) -> dict[str, object]:
     year = year or cfg.SIMULATION_PARAMS["analysis_year"]
+    cache = cache or SimulationCache()
+    manifest = BuildManifest(build_dir, force=force)
     DATA_DIR.mkdir(exist_ok=True)
     OUTPUT_DIR.mkdir(exist_ok=True)
 
+    # Each stage fingerprints its inputs and the config slice it reads, and is skipped when that
+    # fingerprint matches the last completed run and its outputs are still on disk.
     config = TurinSimulationConfig(system_size_kw=cfg.PANEL_PARAMS["panel_power_kw"])
-    rows = generate_hourly_dataset(year, config=config)
-    build_household_load(rows, cfg.ECON_PARAMS["household_consumption"])
-
-    current = evaluate_system_size(rows, cfg.PANEL_PARAMS["panel_power_kw"], config.system_size_kw)
-    sensitivity = build_sensitivity_table(rows, config.system_size_kw)
-
-    candidate_sizes = [2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0]
-    scenarios = [evaluate_system_size(rows, size, config.system_size_kw) for size in candidate_sizes]
-    optimal = max(
-        scenarios,
-        key=lambda scenario: (
-            float(scenario["npv_25_years_euro"]),
-            -999 if scenario["payback_years"] is None else -int(scenario["payback_years"]),
-            -float(scenario["panel_size_kw"]),
-        ),
-    )
-
-    score, strengths, concerns = score_recommendation(optimal)
-    verdict = verdict_from_score(score)
-
-    enrich_rows_for_current_system(rows, float(current["panel_size_kw"]))
-    monthly = monthly_summary(rows)
+    load_inputs = {
+        "profile": cfg.LOAD_PROFILE_PARAMS,
+        "archetypes": cfg.LOAD_ARCHETYPE_PARAMS,
+        "household_consumption": cfg.ECON_PARAMS["household_consumption"],
+    }
+    profile_key = stage_fingerprint("profile", cache_key(config, year), load_inputs)
+    profile_path = artifact_path(manifest.stage_path(f"profile_{year}"))
+    frame = None
+
+    def profile_frame() -> HourlyFrame:
+        nonlocal frame
+        if frame is None:
+            frame = read_frame(profile_path)
+        return frame
+
+    if not manifest.is_current("profile", profile_key, [profile_path]):
+        frame = frame_from_arrays(cache.get_or_simulate(year, config=config), config=config)
+        build_household_load(frame, cfg.ECON_PARAMS["household_consumption"])
+        write_frame(frame, profile_path.with_suffix(""))
+        manifest.record("profile", profile_key)
+
+    economics_key = stage_fingerprint("economics", profile_key, _economics_inputs())
+    economics_path = manifest.stage_path(f"economics_{year}.json")
+    if manifest.is_current("economics", economics_key, [economics_path]):
+        economics = read_json(economics_path)
+    else:
+        tariff = tariff_from_config(profile_frame().calendar())
+        evaluator = ScenarioEvaluator(profile_frame(), config.system_size_kw, tariff=tariff)
+        current = evaluator.evaluate(cfg.PANEL_PARAMS["panel_power_kw"])
+        sensitivity = build_sensitivity_table(profile_frame(), config.system_size_kw, evaluator=evaluator)
+        size_search = optimize_system_size(evaluator)
+        battery_sizing = None
+        if cfg.BATTERY_PARAMS["include_battery"]:
+            battery_sizing = build_battery_sizing(profile_frame(), config.system_size_kw)
+        monte_carlo = None
+        monte_carlo_params = _monte_carlo_params()
+        if monte_carlo_params["draws"] > 0:
+            # monte_carlo imports this module, so it is only loaded once the stage needs it.
+            try:
+                from .monte_carlo import run_monte_carlo
+            except ImportError:
+                from solar_analysis_data.monte_carlo import run_monte_carlo
+
+            monte_carlo = run_monte_carlo(
+                monte_carlo_params["draws"],
+                year,
+                config=config,
+                master_seed=monte_carlo_params["master_seed"],
+                vary_rates=monte_carlo_params["vary_rates"],
+            )
+        economics = {
+            "tariff": "flat" if tariff is None else tariff.name,
+            "current_system": current,
+            "optimal_system": size_search["optimal"],
+            "sensitivity": sensitivity,
+            "size_search": {name: size_search[name] for name in ("bounds_kw", "at_bound", "evaluations")},
+            "scenario_cache": evaluator.stats(),
+            "battery_sizing": battery_sizing,
+            "monte_carlo": monte_carlo,
+        }
+        write_json(economics_path, economics)
+        manifest.record("economics", economics_key)
+
+    # The cube prices every configured tariff, so neither the active tariff mode nor the Monte Carlo
+    # settings are among its inputs.
+    cube_inputs = {
+        **{name: value for name, value in _economics_inputs().items() if name not in ("tariff", "monte_carlo")},
+        "tariff": {name: value for name, value in cfg.TARIFF_PARAMS.items() if name != "mode"},
+        "self_consumption": cfg.SELF_CONSUMPTION_PERC,
+        "cube": cfg.SCENARIO_CUBE_PARAMS,
+    }
+    cube_key = stage_fingerprint("cube", profile_key, cube_inputs)
+    cube_path = OUTPUT_DIR / "scenario_cube.bin"
+    if not manifest.is_current("cube", cube_key, [cube_path]):
+        cube = build_scenario_cube(profile_frame(), config.system_size_kw, cube_sizes(*size_bounds()))
+        write_scenario_cube(cube, cube_path)
+        manifest.record("cube", cube_key)
+
+    current = economics["current_system"]
+    optimal = economics["optimal_system"]
+    export_csv = bool(cfg.SIMULATION_PARAMS.get("export_csv"))
+    dataset_path = artifact_path(DATA_DIR / f"turin_hourly_simulated_{year}")
+    csv_path = DATA_DIR / f"turin_hourly_simulated_{year}.csv" if export_csv else None
+    hourly_inputs = {
+        "current_system_kw": current["panel_size_kw"],
+        "panel": cfg.PANEL_PARAMS,
+        "deferrable": cfg.DEFERRABLE_LOAD_PARAMS,
+        "artifact": dataset_path.suffix,
+        "export_csv": export_csv,
+    }
+    hourly_key = stage_fingerprint("hourly", profile_key, hourly_inputs)
+    hourly_path = manifest.stage_path(f"hourly_{year}.json")
+    hourly_outputs = [hourly_path, dataset_path] + ([csv_path] if csv_path is not None else [])
+    if manifest.is_current("hourly", hourly_key, hourly_outputs):
+        hourly = read_json(hourly_path)
+    else:
+        enrich_frame_for_current_system(profile_frame(), float(current["panel_size_kw"]))
+        hourly = {
+            "monthly_summary": monthly_summary(profile_frame()),
+            "smart_scheduling": build_smart_scheduling(profile_frame()),
+        }
+        # The hourly dataset is a columnar artifact; the CSV copy is only written when asked for.
+        write_frame(profile_frame(), dataset_path.with_suffix(""))
+        if csv_path is not None:
+            write_csv(csv_path, profile_frame().rows(), profile_frame().fieldnames)
+        write_json(hourly_path, hourly)
+        manifest.record("hourly", hourly_key)
 
-    dataset_path = DATA_DIR / f"turin_hourly_simulated_{year}.csv"
     monthly_path = OUTPUT_DIR / "reliable_monthly_summary.csv"
     summary_path = OUTPUT_DIR / "reliable_analysis_summary.json"
     report_path = OUTPUT_DIR / "reliable_final_recommendations.txt"
-
-    write_csv(dataset_path, rows, list(rows[0].keys()))
-    write_csv(monthly_path, monthly, list(monthly[0].keys()))
-
-    summary = {
-        "generated_at": datetime.now().isoformat(timespec="seconds"),
-        "simulation_year": year,
-        "location": cfg.LOCATION_PARAMS,
-        "current_system": current,
-        "optimal_system": optimal,
-        "sensitivity": sensitivity,
-        "monthly_summary": monthly,
-        "score": score,
-        "verdict": verdict,
-        "strengths": strengths,
-        "concerns": concerns,
-        "dataset_path": str(dataset_path.relative_to(ROOT_DIR)),
-    }
-
-    with summary_path.open("w", encoding="utf-8") as handle:
-        json.dump(summary, handle, indent=2)
-
-    report_text = build_text_report(current, optimal, score, verdict, strengths, concerns, monthly, year)
-    report_path.write_text(report_text, encoding="utf-8")
+    report_key = stage_fingerprint("report", economics_key, hourly_key, year, cfg.LOCATION_PARAMS)
+    if manifest.is_current("report", report_key, [monthly_path, summary_path, report_path]):
+        summary = read_json(summary_path)
+    else:
+        monthly = hourly["monthly_summary"]
+        score, strengths, concerns = score_recommendation(optimal)
+        verdict = verdict_from_score(score)
+        write_csv(monthly_path, monthly, list(monthly[0].keys()))
+
+        summary = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "simulation_year": year,
+            "location": cfg.LOCATION_PARAMS,
+            "tariff": economics["tariff"],
+            "current_system": current,
+            "optimal_system": optimal,
+            "sensitivity": economics["sensitivity"],
+            "size_search": economics["size_search"],
+            "monthly_summary": monthly,
+            "score": score,
+            "verdict": verdict,
+            "strengths": strengths,
+            "concerns": concerns,
+            "scenario_cache": economics["scenario_cache"],
+            "battery_sizing": economics["battery_sizing"],
+            "smart_scheduling": hourly["smart_scheduling"],
+            "dataset_path": str(dataset_path.relative_to(ROOT_DIR)),
+            "csv_path": None if csv_path is None else str(csv_path.relative_to(ROOT_DIR)),
+            "dataset_note": "Hourly datasets are regenerated by reliable_analysis.py and are not committed.",
+        }
+        if economics.get("monte_carlo") is not None:
+            summary["monte_carlo"] = economics["monte_carlo"]
+
+        with summary_path.open("w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+
+        report_text = build_text_report(
+            current, optimal, score, verdict, strengths, concerns, monthly, year, economics["size_search"]
+        )
+        report_path.write_text(report_text, encoding="utf-8")
+        manifest.record("report", report_key)
 
     return {
         "dataset_path": dataset_path,
+        "csv_path": csv_path,
         "monthly_path": monthly_path,
         "summary_path": summary_path,
         "report_path": report_path,
+        "cube_path": cube_path,
         "summary": summary,
+        "build": manifest.summary(),
     }
 
 
 def main() -> None:
     result = run_reliable_analysis()
     print(f"Dataset written to: {result['dataset_path']}")
+    if result["csv_path"] is not None:
+        print(f"CSV export written to: {result['csv_path']}")
     print(f"Monthly summary written to: {result['monthly_path']}")
     print(f"Summary JSON written to: {result['summary_path']}")
     print(f"Report written to: {result['report_path']}")
+    print(f"Scenario cube written to: {result['cube_path']}")
     print(f"Verdict: {result['summary']['verdict']}")
 
 
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .econ_sweep import inverter_replacement_costs, investment_metrics
+    from .energy_index import EnergyBalanceIndex
+    from .hourly_frame import HourlyFrame
+    from .tariffs import Tariff, available_tariffs
+except ImportError:
+    from solar_analysis_data.econ_sweep import inverter_replacement_costs, investment_metrics
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+    from solar_analysis_data.hourly_frame import HourlyFrame
+    from solar_analysis_data.tariffs import Tariff, available_tariffs
+
+
+CUBE_MAGIC = b"SCUB"
+CUBE_VERSION = 1
+CUBE_DTYPE = np.dtype("<f4")
+# Metrics over tariff x size x self-consumption share; payback is NaN where it is not reached.
+CUBE_METRICS = (
+    "npv_25_years_euro",
+    "roi_20_years",
+    "net_profit_20_years_euro",
+    "payback_years",
+    "year_one_benefit_euro",
+)
+
+
+def cube_sizes(low_kw: float, high_kw: float, size_step_kw: float | None = None) -> np.ndarray:
+    step = size_step_kw or cfg.SCENARIO_CUBE_PARAMS["size_step_kw"]
+    return np.round(np.arange(low_kw, high_kw + step / 2, step), 6)
+
+
+def cube_shares() -> np.ndarray:
+    return np.array(sorted(cfg.SELF_CONSUMPTION_PERC.values()), dtype=float)
+
+
+def _average_prices(production: np.ndarray, tariffs: dict[str, Tariff | None], econ: dict[str, float]) -> np.ndarray:
+    # With a fixed self-consumption share, consumed and exported energy follow the production
+    # curve, so each tariff collapses to its production-weighted import and export price.
+    total = production.sum()
+    prices = []
+    for tariff in tariffs.values():
+        if tariff is None:
+            prices.append((econ["electricity_rate"], econ["sell_back_rate"]))
+        else:
+            prices.append((tariff.import_price() @ production / total, tariff.export_price() @ production / total))
+    return np.array(prices, dtype=float)
+
+
+def build_scenario_cube(
+    frame: HourlyFrame,
+    base_system_size_kw: float,
+    sizes_kw: np.ndarray,
+    tariffs: dict[str, Tariff | None] | None = None,
+    shares: np.ndarray | None = None,
+    econ: dict[str, float] | None = None,
+) -> dict[str, object]:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    tariffs = tariffs if tariffs is not None else available_tariffs(frame.calendar())
+    sizes = np.asarray(sizes_kw, dtype=float)
+    shares = cube_shares() if shares is None else np.asarray(shares, dtype=float)
+    production, load = frame["hourly_production_kwh"], frame["load_kwh"]
+    analysis_years = int(econ["analysis_years"])
+
+    # Axes: tariff x size x share x analysis year; energy is tariff independent and broadcasts.
+    degradation = (1 - cfg.LOSS_PARAMS.get("degradation_rate", 0.0)) ** np.arange(analysis_years)
+    yearly_production = (sizes / base_system_size_kw * production.sum())[:, None, None] * degradation
+    self_consumed = shares[None, :, None] * yearly_production
+    exported = yearly_production - self_consumed
+    imported = np.maximum(load.sum() - self_consumed, 0.0)
+    prices = _average_prices(production, tariffs, econ)
+
+    multiplier = (1 + econ["annual_rate_increase"]) ** np.arange(analysis_years)
+    energy_value = self_consumed * prices[:, 0, None, None, None] + exported * prices[:, 1, None, None, None]
+    benefit = (
+        multiplier * (energy_value + np.minimum(exported, imported) * econ["incentive_rate"])
+        - econ["annual_maintenance"]
+        - inverter_replacement_costs(econ)
+    )
+    installation_cost = np.broadcast_to((sizes * econ["installation_cost_per_kw"])[None, :, None], benefit.shape[:-1])
+    metrics = investment_metrics(benefit, installation_cost, econ["discount_rate"])
+
+    # The hourly model's own self-consumption share per size lets a reader place it on the share axis.
+    index = EnergyBalanceIndex.from_frame(frame)
+    modelled = index.balances(sizes / base_system_size_kw)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        modelled_share = np.nan_to_num(modelled["annual_self_consumed_kwh"] / modelled["annual_production_kwh"])
+
+    return {
+        "tariffs": list(tariffs),
+        "sizes_kw": sizes,
+        "self_consumption": shares,
+        "annual_production_kwh_per_kw": float(production.sum() / base_system_size_kw),
+        "annual_load_kwh": float(load.sum()),
+        "installation_cost_per_kw": float(econ["installation_cost_per_kw"]),
+        "modelled_self_consumption": modelled_share,
+        "metrics": {**metrics, "year_one_benefit_euro": benefit[..., 0]},
+    }
+
+
+def _encode_cube(cube: dict[str, object]) -> bytes:
+    arrays = {name: cube["metrics"][name] for name in CUBE_METRICS}
+    arrays["modelled_self_consumption"] = cube["modelled_self_consumption"]
+    layout, offset = [], 0
+    for name, values in arrays.items():
+        layout.append({"name": name, "shape": list(np.shape(values)), "offset": offset})
+        offset += int(np.size(values)) * CUBE_DTYPE.itemsize
+
+    header = {
+        "version": CUBE_VERSION,
+        "dtype": CUBE_DTYPE.str,
+        "tariffs": cube["tariffs"],
+        "sizes_kw": np.asarray(cube["sizes_kw"]).tolist(),
+        "self_consumption": np.asarray(cube["self_consumption"]).tolist(),
+        "annual_production_kwh_per_kw": round(cube["annual_production_kwh_per_kw"], 3),
+        "annual_load_kwh": round(cube["annual_load_kwh"], 3),
+        "installation_cost_per_kw": cube["installation_cost_per_kw"],
+        "arrays": layout,
+    }
+    # The JSON header is space-padded so the float32 block starts 4-byte aligned for typed-array views.
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    encoded += b" " * (-(len(CUBE_MAGIC) + 4 + len(encoded)) % CUBE_DTYPE.itemsize)
+    body = b"".join(np.ascontiguousarray(values, dtype=CUBE_DTYPE).tobytes() for values in arrays.values())
+    return CUBE_MAGIC + struct.pack("<I", len(encoded)) + encoded + body
+
+
+def write_scenario_cube(cube: dict[str, object], path: Path | str, max_bytes: int | None = None) -> Path:
+    path = Path(path)
+    max_bytes = max_bytes if max_bytes is not None else cfg.SCENARIO_CUBE_PARAMS["max_kb"] * 1024
+    payload = _encode_cube(cube)
+    if len(payload) > max_bytes:
+        raise ValueError(
+            f"scenario cube is {len(payload)} bytes, over the {max_bytes} byte budget; "
+            "widen size_step_kw or raise max_kb"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.tmp")
+    staging.write_bytes(payload)
+    os.replace(staging, path)
+    return path
+
+
+def read_scenario_cube(path: Path | str) -> dict[str, object]:
+    payload = Path(path).read_bytes()
+    if payload[: len(CUBE_MAGIC)] != CUBE_MAGIC:
+        raise ValueError(f"{path} is not a scenario cube")
+    (header_length,) = struct.unpack_from("<I", payload, len(CUBE_MAGIC))
+    start = len(CUBE_MAGIC) + 4
+    header = json.loads(payload[start : start + header_length])
+    if header["version"] != CUBE_VERSION:
+        raise ValueError(f"{path} has cube version {header['version']}, expected {CUBE_VERSION}")
+    data_start = start + header_length
+    arrays = {}
+    for entry in header.pop("arrays"):
+        count = int(np.prod(entry["shape"]))
+        values = np.frombuffer(payload, dtype=header["dtype"], count=count, offset=data_start + entry["offset"])
+        arrays[entry["name"]] = values.reshape(entry["shape"])
+    return {**header, "arrays": arrays}
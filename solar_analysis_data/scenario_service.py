@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import copy
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from config import userdata_config as cfg
+
+try:
+    from .battery import battery_capacities, battery_configuration, evaluate_battery_grid
+    from .energy_index import EnergyBalanceIndex
+    from .hourly_frame import HourlyFrame
+    from .reliable_analysis import (
+        build_household_load,
+        candidate_sizes,
+        evaluate_system_size,
+        quantize_size,
+        size_bounds,
+    )
+    from .simulation_cache import SimulationCache
+    from .tariffs import Tariff, available_tariffs, priced_index
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import frame_from_arrays
+except ImportError:
+    from solar_analysis_data.battery import battery_capacities, battery_configuration, evaluate_battery_grid
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+    from solar_analysis_data.hourly_frame import HourlyFrame
+    from solar_analysis_data.reliable_analysis import (
+        build_household_load,
+        candidate_sizes,
+        evaluate_system_size,
+        quantize_size,
+        size_bounds,
+    )
+    from solar_analysis_data.simulation_cache import SimulationCache
+    from solar_analysis_data.tariffs import Tariff, available_tariffs, priced_index
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import frame_from_arrays
+
+
+def json_safe(value: object) -> object:
+    # Non-finite floats (an unreachable break-even rate) become null rather than invalid JSON.
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {name: json_safe(item) for name, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+class ScenarioService:
+    """One simulated year and its energy balance index kept in memory, answering what-if queries through an LRU."""
+
+    def __init__(
+        self,
+        frame: HourlyFrame,
+        base_system_size_kw: float,
+        tariffs: dict[str, Tariff | None] | None = None,
+        max_entries: int | None = None,
+    ):
+        self.frame = frame
+        self.base_system_size_kw = float(base_system_size_kw)
+        self.index = EnergyBalanceIndex.from_frame(frame)
+        self.tariffs = tariffs if tariffs is not None else available_tariffs(frame.calendar())
+        self.max_entries = max_entries or cfg.SCENARIO_SERVICE_PARAMS["cache_entries"]
+        self.cache: OrderedDict[tuple[float, str, float], dict[str, object]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, year: int | None = None, cache: SimulationCache | None = None, **kwargs) -> ScenarioService:
+        year = year or cfg.SIMULATION_PARAMS["analysis_year"]
+        config = TurinSimulationConfig(system_size_kw=cfg.PANEL_PARAMS["panel_power_kw"])
+        frame = frame_from_arrays((cache or SimulationCache()).get_or_simulate(year, config=config), config=config)
+        build_household_load(frame, cfg.ECON_PARAMS["household_consumption"])
+        return cls(frame, config.system_size_kw, **kwargs)
+
+    def warm(self) -> None:
+        # Weighted prefixes for every tariff are built once, and the candidate battery grid is
+        # dispatched in one pass, since a single battery query walks the whole year hour by hour.
+        for tariff in self.tariffs.values():
+            if tariff is not None:
+                priced_index(self.index, tariff)
+        sizes = candidate_sizes()
+        capacities = [capacity for capacity in battery_capacities() if capacity > 0]
+        grid = self._battery_grid(sizes, capacities)
+        for capacity_index, capacity in enumerate(capacities):
+            for size_index, size_kw in enumerate(sizes):
+                battery = battery_configuration(grid, capacity_index, size_index)
+                self._store((quantize_size(size_kw), "flat", float(capacity)), self._scenario(size_kw, "flat", battery))
+
+    def _battery_grid(self, sizes_kw: list[float], capacities_kwh: list[float]) -> dict[str, object]:
+        production, load = self.frame["hourly_production_kwh"], self.frame["load_kwh"]
+        return evaluate_battery_grid(production, load, sizes_kw, capacities_kwh, self.base_system_size_kw)
+
+    def _scenario(self, size_kw: float, tariff: str, battery: dict[str, object] | None) -> dict[str, object]:
+        scenario = evaluate_system_size(
+            None, size_kw, self.base_system_size_kw, index=self.index, tariff=self.tariffs[tariff]
+        )
+        return json_safe({**scenario, "tariff": tariff, "battery": battery})
+
+    def _store(self, key: tuple[float, str, float], result: dict[str, object]) -> None:
+        with self.lock:
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    def query(self, system_size_kw: float, tariff: str = "flat", battery_kwh: float = 0.0) -> dict[str, object]:
+        # Callers get their own copy, so nothing they change leaks into later cache hits.
+        low, high = size_bounds()
+        if not low <= system_size_kw <= high:
+            raise ValueError(f"system_size_kw must lie in [{low}, {high}]")
+        if tariff not in self.tariffs:
+            raise ValueError(f"unknown tariff {tariff!r}; choose from {sorted(self.tariffs)}")
+        if battery_kwh < 0:
+            raise ValueError("battery_kwh must not be negative")
+        if battery_kwh > 0 and self.tariffs[tariff] is not None:
+            # Battery dispatch is priced at the flat electricity and sell-back rates.
+            raise ValueError("battery scenarios are only priced with the flat tariff")
+
+        key = (quantize_size(system_size_kw), tariff, float(battery_kwh))
+        with self.lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(result)
+            self.misses += 1
+
+        battery = None
+        if battery_kwh > 0:
+            battery = battery_configuration(self._battery_grid([key[0]], [key[2]]), 0, 0)
+        result = self._scenario(key[0], tariff, battery)
+        self._store(key, result)
+        return copy.deepcopy(result)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def _query_value(params: dict[str, list[str]], name: str, default: str | None = None) -> str:
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise ValueError(f"missing query parameter {name!r}")
+        return default
+    return values[-1]
+
+
+def make_handler(service: ScenarioService) -> type[BaseHTTPRequestHandler]:
+    allow_origin = cfg.SCENARIO_SERVICE_PARAMS["allow_origin"]
+
+    class ScenarioRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: object) -> None:
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", allow_origin)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            if url.path == "/health":
+                self._send_json(200, {"status": "ok", "cache": service.stats()})
+            elif url.path == "/tariffs":
+                self._send_json(200, {"tariffs": sorted(service.tariffs)})
+            elif url.path == "/scenario":
+                try:
+                    result = service.query(
+                        float(_query_value(params, "size_kw")),
+                        tariff=_query_value(params, "tariff", "flat"),
+                        battery_kwh=float(_query_value(params, "battery_kwh", "0")),
+                    )
+                except ValueError as error:
+                    self._send_json(400, {"error": str(error)})
+                else:
+                    self._send_json(200, result)
+            else:
+                self._send_json(404, {"error": f"unknown path {url.path}"})
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return ScenarioRequestHandler
+
+
+def make_server(service: ScenarioService, host: str | None = None, port: int | None = None) -> ThreadingHTTPServer:
+    params = cfg.SCENARIO_SERVICE_PARAMS
+    host = params["host"] if host is None else host
+    port = params["port"] if port is None else port
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main() -> None:
+    service = ScenarioService.from_config()
+    service.warm()
+    server = make_server(service)
+    host, port = server.server_address[:2]
+    print(f"Scenario service listening on http://{host}:{port} ({len(service.frame)} hours in memory)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .turin_model import MODEL_VERSION, TurinSimulationConfig
+    from .turin_vectorized import simulate_year
+except ImportError:
+    from solar_analysis_data.turin_model import MODEL_VERSION, TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import simulate_year
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".simulation_cache"
+MANIFEST_NAME = "manifest.json"
+
+
+def cache_key(config: TurinSimulationConfig, year: int, **extra: object) -> str:
+    payload = {"config": asdict(config), "year": year, "model_version": MODEL_VERSION, **extra}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _year_key(year: int, config: TurinSimulationConfig, normals: dict[str, list[float]] | None) -> str:
+    if normals is None:
+        return cache_key(config, year)
+    return cache_key(config, year, normals=normals)
+
+
+def _touch(path: Path) -> None:
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def _directory_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.iterdir() if item.is_file())
+
+
+class SimulationCache:
+    """Content-addressed store of simulated years, one .npy file per column."""
+
+    def __init__(self, directory: Path | str | None = None, max_bytes: int | None = None):
+        configured_dir = cfg.SIMULATION_PARAMS.get("cache_dir") or DEFAULT_CACHE_DIR
+        self.directory = Path(directory or configured_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else cfg.SIMULATION_PARAMS.get("cache_max_mb", 512) * 2**20
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / key
+
+    def entries(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return [path for path in self.directory.iterdir() if (path / MANIFEST_NAME).exists()]
+
+    def size_bytes(self) -> int:
+        return sum(_directory_size(path) for path in self.entries())
+
+    def load_key(self, key: str, mmap: bool = True) -> dict[str, np.ndarray] | None:
+        entry = self.entry_path(key)
+        manifest_path = entry / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        mmap_mode = "r" if mmap else None
+        try:
+            arrays = {name: np.load(entry / f"{name}.npy", mmap_mode=mmap_mode) for name in manifest["columns"]}
+        except (OSError, ValueError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        _touch(manifest_path)
+        return arrays
+
+    def store_key(self, key: str, arrays: dict[str, np.ndarray], metadata: dict[str, object] | None = None) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.directory))
+        for name, values in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+
+        manifest = {"key": key, "model_version": MODEL_VERSION, "columns": list(arrays), **(metadata or {})}
+        (staging / MANIFEST_NAME).write_text(json.dumps(manifest, default=str), encoding="utf-8")
+
+        entry = self.entry_path(key)
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+        _touch(entry / MANIFEST_NAME)
+        self.evict()
+        return entry
+
+    def load(
+        self,
+        year: int,
+        config: TurinSimulationConfig,
+        mmap: bool = True,
+        normals: dict[str, list[float]] | None = None,
+    ) -> dict[str, np.ndarray] | None:
+        return self.load_key(_year_key(year, config, normals), mmap=mmap)
+
+    def store(
+        self,
+        year: int,
+        config: TurinSimulationConfig,
+        arrays: dict[str, np.ndarray],
+        normals: dict[str, list[float]] | None = None,
+    ) -> Path:
+        metadata = {"year": year, "config": asdict(config), "normals": normals}
+        return self.store_key(_year_key(year, config, normals), arrays, metadata)
+
+    def get_or_simulate(
+        self,
+        year: int,
+        config: TurinSimulationConfig | None = None,
+        normals: dict[str, list[float]] | None = None,
+    ) -> dict[str, np.ndarray]:
+        config = config or TurinSimulationConfig()
+        cached = self.load(year, config, normals=normals)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        arrays = simulate_year(year, config=config, normals=normals)
+        self.store(year, config, arrays, normals=normals)
+        return arrays
+
+    def evict(self) -> list[str]:
+        entries = sorted(self.entries(), key=lambda path: (path / MANIFEST_NAME).stat().st_mtime_ns)
+        sizes = {path: _directory_size(path) for path in entries}
+        total = sum(sizes.values())
+        evicted: list[str] = []
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+            evicted.append(path.name)
+        return evicted
+
+    def clear(self) -> None:
+        for path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
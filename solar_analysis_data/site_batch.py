@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from config import userdata_config as cfg
+
+try:
+    from .ephemeris import SolarEphemeris, cache_ephemeris, solar_ephemeris
+    from .reliable_analysis import (
+        OUTPUT_DIR,
+        ScenarioEvaluator,
+        best_scenario,
+        build_household_load,
+        optimize_system_size,
+    )
+    from .monte_carlo import run_monte_carlo
+    from .simulation_cache import SimulationCache
+    from .turin_model import TurinSimulationConfig
+    from .turin_vectorized import frame_from_arrays, simulate_year
+except ImportError:
+    from solar_analysis_data.ephemeris import SolarEphemeris, cache_ephemeris, solar_ephemeris
+    from solar_analysis_data.reliable_analysis import (
+        OUTPUT_DIR,
+        ScenarioEvaluator,
+        best_scenario,
+        build_household_load,
+        optimize_system_size,
+    )
+    from solar_analysis_data.monte_carlo import run_monte_carlo
+    from solar_analysis_data.simulation_cache import SimulationCache
+    from solar_analysis_data.turin_model import TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import frame_from_arrays, simulate_year
+
+
+# Coordinates are grouped at this precision so float noise from JSON or arithmetic does not split a location.
+LOCATION_KEY_DIGITS = 6
+
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """A candidate rooftop: location, climate normals, PV system and household parameters."""
+
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str = cfg.LOCATION_PARAMS["timezone"]
+    system_size_kw: float = cfg.PANEL_PARAMS["panel_power_kw"]
+    panel_tilt_deg: float = cfg.SIMULATION_PARAMS["panel_tilt_deg"]
+    panel_azimuth_deg: float = cfg.SIMULATION_PARAMS["panel_azimuth_deg"]
+    household_consumption_kwh: float = cfg.ECON_PARAMS["household_consumption"]
+    load_archetype: str = "commuter"
+    monthly_normals: dict[str, list[float]] | None = field(default=None, compare=False, hash=False)
+    econ_overrides: dict[str, float] | None = field(default=None, compare=False, hash=False)
+
+    @property
+    def location_key(self) -> tuple[float, float, str]:
+        return (round(self.latitude, LOCATION_KEY_DIGITS), round(self.longitude, LOCATION_KEY_DIGITS), self.timezone)
+
+    def simulation_config(self) -> TurinSimulationConfig:
+        return replace(
+            TurinSimulationConfig(),
+            city=self.name,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            timezone=self.timezone,
+            system_size_kw=self.system_size_kw,
+            panel_tilt_deg=self.panel_tilt_deg,
+            panel_azimuth_deg=self.panel_azimuth_deg,
+        )
+
+
+def _scenario_digest(scenario: dict[str, object]) -> dict[str, object]:
+    year_one = scenario["year_one"]
+    return {
+        "panel_size_kw": scenario["panel_size_kw"],
+        "installation_cost_euro": round(float(scenario["installation_cost_euro"]), 0),
+        "annual_production_kwh": round(float(year_one["annual_production_kwh"]), 1),
+        "self_consumption_pct": round(float(year_one["self_consumption_pct"]), 1),
+        "demand_coverage_pct": round(float(year_one["demand_coverage_pct"]), 1),
+        "payback_years": scenario["payback_years"],
+        "roi_20_years": round(float(scenario["roi_20_years"]), 1),
+        "npv_25_years_euro": round(float(scenario["npv_25_years_euro"]), 0),
+    }
+
+
+def run_site(
+    site: SiteSpec,
+    year: int,
+    candidate_sizes: list[float] | None = None,
+    cache: SimulationCache | None = None,
+    monte_carlo_draws: int = 0,
+    monte_carlo_workers: int | None = 1,
+) -> dict[str, object]:
+    config = site.simulation_config()
+    if cache is not None:
+        arrays = cache.get_or_simulate(year, config=config, normals=site.monthly_normals)
+    else:
+        arrays = simulate_year(year, config=config, normals=site.monthly_normals)
+
+    frame = frame_from_arrays(arrays, config=config)
+    build_household_load(frame, site.household_consumption_kwh, site.load_archetype)
+    evaluator = ScenarioEvaluator(frame, config.system_size_kw)
+
+    current = evaluator.evaluate(site.system_size_kw, econ=site.econ_overrides)
+    at_bound = None
+    if candidate_sizes:
+        optimal = best_scenario([evaluator.evaluate(size, econ=site.econ_overrides) for size in candidate_sizes])
+    else:
+        size_search = optimize_system_size(evaluator, econ=site.econ_overrides)
+        optimal, at_bound = size_search["optimal"], size_search["at_bound"]
+
+    summary = {
+        "site": site.name,
+        "latitude": site.latitude,
+        "longitude": site.longitude,
+        "timezone": site.timezone,
+        "simulation_year": year,
+        "household_consumption_kwh": site.household_consumption_kwh,
+        "load_archetype": site.load_archetype,
+        "current_system": _scenario_digest(current),
+        "optimal_system": _scenario_digest(optimal),
+        "optimal_at_bound": at_bound,
+    }
+    if monte_carlo_draws > 0:
+        summary["monte_carlo"] = run_monte_carlo(
+            monte_carlo_draws,
+            year,
+            config=config,
+            system_size_kw=site.system_size_kw,
+            econ={"household_consumption": site.household_consumption_kwh, **(site.econ_overrides or {})},
+            max_workers=monte_carlo_workers,
+            normals=site.monthly_normals,
+            load_archetype=site.load_archetype,
+        )
+    return summary
+
+
+def _run_site_group(
+    task: tuple[
+        list[tuple[int, SiteSpec]], list[SolarEphemeris], int, list[float] | None, str | None, int, int | None
+    ],
+) -> list[tuple[int, dict[str, object]]]:
+    indexed_sites, ephemerides, year, candidate_sizes, cache_dir, monte_carlo_draws, monte_carlo_workers = task
+    for ephemeris in ephemerides:
+        cache_ephemeris(ephemeris)
+    cache = SimulationCache(cache_dir) if cache_dir else None
+    return [
+        (index, run_site(site, year, candidate_sizes, cache, monte_carlo_draws, monte_carlo_workers))
+        for index, site in indexed_sites
+    ]
+
+
+def group_sites_by_location(sites: list[SiteSpec]) -> list[list[tuple[int, SiteSpec]]]:
+    groups: dict[tuple[float, float, str], list[tuple[int, SiteSpec]]] = {}
+    for index, site in enumerate(sites):
+        groups.setdefault(site.location_key, []).append((index, site))
+    return list(groups.values())
+
+
+def plan_site_tasks(sites: list[SiteSpec], max_workers: int) -> list[list[tuple[int, SiteSpec]]]:
+    # Chunks never mix locations, and a location with many rooftops is split across workers.
+    chunk_size = max(1, math.ceil(len(sites) / max(max_workers, 1)))
+    return [
+        group[start : start + chunk_size]
+        for group in group_sites_by_location(sites)
+        for start in range(0, len(group), chunk_size)
+    ]
+
+
+def _chunk_ephemerides(
+    chunk: list[tuple[int, SiteSpec]], ephemerides: dict[tuple[float, float, str], SolarEphemeris]
+) -> list[SolarEphemeris]:
+    keys = {(site.latitude, site.longitude, site.timezone) for _, site in chunk}
+    return [ephemerides[key] for key in keys]
+
+
+def run_site_batch(
+    sites: list[SiteSpec],
+    year: int | None = None,
+    max_workers: int | None = None,
+    candidate_sizes: list[float] | None = None,
+    cache_dir: Path | str | None = None,
+    monte_carlo_draws: int | None = None,
+) -> list[dict[str, object]]:
+    year = year or cfg.SIMULATION_PARAMS["analysis_year"]
+    max_workers = max_workers or os.cpu_count() or 1
+    cache_path = str(cache_dir) if cache_dir else None
+    if monte_carlo_draws is None:
+        monte_carlo_draws = cfg.SIMULATION_PARAMS.get("monte_carlo_draws", 0)
+    chunks = plan_site_tasks(sites, max_workers)
+
+    # Parallelise across site chunks when there are several, otherwise across Monte Carlo draws.
+    if max_workers == 1 or len(chunks) <= 1:
+        tasks = [(chunk, [], year, candidate_sizes, cache_path, monte_carlo_draws, max_workers) for chunk in chunks]
+        finished = [_run_site_group(task) for task in tasks]
+    else:
+        # Each location's ephemeris is built once here and shipped with every chunk that needs it.
+        ephemerides = {
+            (site.latitude, site.longitude, site.timezone): solar_ephemeris(
+                year, site.latitude, site.longitude, site.timezone
+            )
+            for site in sites
+        }
+        tasks = [
+            (chunk, _chunk_ephemerides(chunk, ephemerides), year, candidate_sizes, cache_path, monte_carlo_draws, 1)
+            for chunk in chunks
+        ]
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            finished = list(executor.map(_run_site_group, tasks))
+
+    results: list[dict[str, object] | None] = [None] * len(sites)
+    for group_results in finished:
+        for index, summary in group_results:
+            results[index] = summary
+    return results
+
+
+def load_sites(path: Path) -> list[SiteSpec]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [SiteSpec(**entry) for entry in payload]
+
+
+def default_sites() -> list[SiteSpec]:
+    location = cfg.LOCATION_PARAMS
+    return [
+        SiteSpec(
+            name=location["city"],
+            latitude=location["latitude"],
+            longitude=location["longitude"],
+            timezone=location["timezone"],
+        )
+    ]
+
+
+def main() -> None:
+    sites = load_sites(Path(sys.argv[1])) if len(sys.argv) > 1 else default_sites()
+    results = run_site_batch(sites)
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    summary_path = OUTPUT_DIR / "site_batch_summary.json"
+    with summary_path.open("w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Evaluated {len(results)} sites; summary written to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date, timedelta
+
+import numpy as np
+
+try:
+    from .ephemeris import solar_position_arrays, utc_offset_hours
+    from .turin_model import MONTHLY_NORMALS, TurinSimulationConfig
+    from .turin_vectorized import (
+        HOURLY_NOISE,
+        _noise_grid,
+        calendar_columns,
+        daily_cloud_states,
+        day_range,
+        weather_and_production,
+    )
+except ImportError:
+    from solar_analysis_data.ephemeris import solar_position_arrays, utc_offset_hours
+    from solar_analysis_data.turin_model import MONTHLY_NORMALS, TurinSimulationConfig
+    from solar_analysis_data.turin_vectorized import (
+        HOURLY_NOISE,
+        _noise_grid,
+        calendar_columns,
+        daily_cloud_states,
+        day_range,
+        weather_and_production,
+    )
+
+
+DEFAULT_RESOLUTION_MINUTES = 15
+
+
+def steps_per_hour(resolution_minutes: int) -> int:
+    if resolution_minutes <= 0 or 60 % resolution_minutes:
+        raise ValueError("resolution_minutes must be a positive divisor of 60")
+    return 60 // resolution_minutes
+
+
+def _year_cloud_states(year: int, config: TurinSimulationConfig) -> np.ndarray:
+    start = date(year, 1, 1)
+    return daily_cloud_states(day_range(start, (date(year + 1, 1, 1) - start).days), config)
+
+
+def _interpolated_noise(
+    config: TurinSimulationConfig,
+    day: date,
+    hour: np.ndarray,
+    fraction: np.ndarray,
+) -> dict[str, np.ndarray]:
+    # Hourly draws are anchored on the hour and blended linearly towards the next one, so the
+    # sub-hourly series is continuous, including across midnight, and equals the hourly model on
+    # every full hour.
+    days = [day, day + timedelta(days=1)]
+    noise = {}
+    for tag, (low, high) in HOURLY_NOISE.items():
+        grid = _noise_grid(config, days, tag, low, high)
+        noise[tag] = grid[hour] + (grid[hour + 1] - grid[hour]) * fraction
+    return noise
+
+
+def simulate_day_at_resolution(
+    day: date,
+    config: TurinSimulationConfig,
+    resolution_minutes: int,
+    cloud_state: float,
+    normals: dict[str, list[float]] | None = None,
+) -> dict[str, np.ndarray]:
+    steps = steps_per_hour(resolution_minutes)
+    normals = normals or MONTHLY_NORMALS
+
+    columns = {name: np.repeat(values, steps) for name, values in calendar_columns([day]).items()}
+    minute = np.tile(np.arange(0, 60, resolution_minutes, dtype=np.int64), 24)
+    fraction = minute / 60.0
+    fractional_hour = columns["hour"] + fraction
+    columns["minute"] = minute
+
+    utc_offset = np.repeat(utc_offset_hours([day], config.tzinfo), steps)
+    position = solar_position_arrays(
+        columns["day_of_year"], fractional_hour, utc_offset, config.latitude, config.longitude
+    )
+    position["utc_offset_hours"] = utc_offset
+
+    columns.update(
+        weather_and_production(
+            config,
+            normals,
+            columns,
+            fractional_hour,
+            position,
+            cloud_state=np.full(len(minute), cloud_state),
+            daily_temp_shift=np.full(len(minute), _noise_grid(config, [day], "temp", -3.5, 3.5, hourly=False)[0]),
+            noise=_interpolated_noise(config, day, columns["hour"], fraction),
+        )
+    )
+    columns["interval_energy_kwh"] = columns["production_kw"] * (resolution_minutes / 60.0)
+    return columns
+
+
+def stream_simulation(
+    start: date,
+    end: date,
+    config: TurinSimulationConfig | None = None,
+    resolution_minutes: int = DEFAULT_RESOLUTION_MINUTES,
+    normals: dict[str, list[float]] | None = None,
+) -> Iterator[dict[str, np.ndarray]]:
+    config = config or TurinSimulationConfig()
+    steps_per_hour(resolution_minutes)
+
+    cloud_year: int | None = None
+    cloud_states = np.empty(0)
+    day = start
+    while day < end:
+        if day.year != cloud_year:
+            cloud_year = day.year
+            cloud_states = _year_cloud_states(day.year, config)
+        cloud_state = float(cloud_states[day.timetuple().tm_yday - 1])
+        yield simulate_day_at_resolution(day, config, resolution_minutes, cloud_state, normals=normals)
+        day += timedelta(days=1)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from config import userdata_config as cfg
+
+try:
+    from .energy_index import EnergyBalanceIndex
+except ImportError:
+    from solar_analysis_data.energy_index import EnergyBalanceIndex
+
+
+F_BANDS = ("F1", "F2", "F3")
+# Fixed-date Italian public holidays (month, day); Easter Monday is added per year.
+ITALIAN_HOLIDAYS = ((1, 1), (1, 6), (4, 25), (5, 1), (6, 2), (8, 15), (11, 1), (12, 8), (12, 25), (12, 26))
+PRICE_CURVE_COLUMNS = ("import_price_euro_kwh", "export_price_euro_kwh")
+
+
+@dataclass(frozen=True, eq=False)
+class Tariff:
+    """Hourly import and export prices, stored as band weights (bands x hours) and band rates in euro/kWh."""
+
+    name: str
+    import_weights: np.ndarray = field(repr=False)
+    import_rates: np.ndarray
+    export_weights: np.ndarray = field(repr=False)
+    export_rates: np.ndarray
+
+    def __post_init__(self) -> None:
+        for side in ("import", "export"):
+            weights, rates = getattr(self, f"{side}_weights"), getattr(self, f"{side}_rates")
+            if weights.ndim != 2 or rates.shape != (weights.shape[0],):
+                raise ValueError(f"{side}_weights must be bands x hours with one {side} rate per band")
+        if self.import_weights.shape[1] != self.export_weights.shape[1]:
+            raise ValueError("import and export weights must cover the same hours")
+
+    @property
+    def hours(self) -> int:
+        return self.import_weights.shape[1]
+
+    def import_price(self) -> np.ndarray:
+        return self.import_rates @ self.import_weights
+
+    def export_price(self) -> np.ndarray:
+        return self.export_rates @ self.export_weights
+
+    @cached_property
+    def key(self) -> str:
+        digest = hashlib.sha256(self.name.encode())
+        for values in (self.import_weights, self.import_rates, self.export_weights, self.export_rates):
+            digest.update(np.ascontiguousarray(values, dtype=float).tobytes())
+        return digest.hexdigest()
+
+
+def easter_sunday(year: int) -> date:
+    # Anonymous Gregorian computus.
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (b - (b + 8) // 25 + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday_shift = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * weekday_shift) // 433
+    month, day = divmod(h + weekday_shift - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def holiday_ordinals(years: list[int]) -> np.ndarray:
+    days = []
+    for year in years:
+        days.extend(date(year, month, day) for month, day in ITALIAN_HOLIDAYS)
+        days.append(easter_sunday(year) + timedelta(days=1))
+    return np.array([day.toordinal() for day in days], dtype=np.int64)
+
+
+def f_band_masks(calendar: dict[str, np.ndarray]) -> np.ndarray:
+    hour, weekday, ordinal = calendar["hour"], calendar["weekday"], calendar["day_ordinal"]
+    first, last = date.fromordinal(int(ordinal.min())), date.fromordinal(int(ordinal.max()))
+    holiday = np.isin(ordinal, holiday_ordinals(list(range(first.year, last.year + 1))))
+
+    # ARERA bands: F1 is 08-19 on working days, F2 the working-day shoulders (07-08, 19-23) and
+    # Saturday 07-23, F3 every night plus Sundays and public holidays.
+    working_day = (weekday < 5) & ~holiday
+    saturday = (weekday == 5) & ~holiday
+    f1 = working_day & (hour >= 8) & (hour < 19)
+    f2 = (working_day & ((hour == 7) | ((hour >= 19) & (hour < 23)))) | (saturday & (hour >= 7) & (hour < 23))
+    return np.stack([f1, f2, ~(f1 | f2)])
+
+
+def flat_tariff(hours: int, econ: dict[str, float] | None = None) -> Tariff:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    ones = np.ones((1, hours))
+    return Tariff(
+        name="flat",
+        import_weights=ones,
+        import_rates=np.array([econ["electricity_rate"]], dtype=float),
+        export_weights=ones,
+        export_rates=np.array([econ["sell_back_rate"]], dtype=float),
+    )
+
+
+def band_tariff(
+    calendar: dict[str, np.ndarray],
+    import_rates: dict[str, float] | None = None,
+    export_rates: dict[str, float] | None = None,
+) -> Tariff:
+    params = cfg.TARIFF_PARAMS
+    import_rates = import_rates or params["import_band_rates"]
+    export_rates = export_rates or params["export_band_rates"]
+    masks = f_band_masks(calendar).astype(float)
+    return Tariff(
+        name="bands",
+        import_weights=masks,
+        import_rates=np.array([import_rates[band] for band in F_BANDS], dtype=float),
+        export_weights=masks,
+        export_rates=np.array([export_rates[band] for band in F_BANDS], dtype=float),
+    )
+
+
+def price_curve_tariff(path: str | Path, econ: dict[str, float] | None = None) -> Tariff:
+    econ = {**cfg.ECON_PARAMS, **(econ or {})}
+    with Path(path).open(newline="", encoding="utf-8") as handle:
+        records = list(csv.DictReader(handle))
+    if not records or PRICE_CURVE_COLUMNS[0] not in records[0]:
+        raise ValueError(f"{path}: price curve needs a {PRICE_CURVE_COLUMNS[0]} column")
+
+    # The curve itself is the single band's weight, so a rate of 1.0 reproduces it exactly.
+    import_curve = np.array([float(record[PRICE_CURVE_COLUMNS[0]]) for record in records])
+    if PRICE_CURVE_COLUMNS[1] in records[0]:
+        export_curve = np.array([float(record[PRICE_CURVE_COLUMNS[1]]) for record in records])
+    else:
+        export_curve = np.full(len(records), float(econ["sell_back_rate"]))
+    return Tariff(
+        name=f"curve:{Path(path).name}",
+        import_weights=import_curve[None, :],
+        import_rates=np.ones(1),
+        export_weights=export_curve[None, :],
+        export_rates=np.ones(1),
+    )
+
+
+def tariff_from_config(calendar: dict[str, np.ndarray], econ: dict[str, float] | None = None) -> Tariff | None:
+    mode = cfg.TARIFF_PARAMS["mode"]
+    if mode == "flat":
+        return None
+    if mode == "bands":
+        return band_tariff(calendar)
+    if mode == "curve":
+        return price_curve_tariff(cfg.TARIFF_PARAMS["price_curve_file"], econ=econ)
+    raise ValueError(f"unknown tariff mode {mode!r}; choose flat, bands or curve")
+
+
+def available_tariffs(calendar: dict[str, np.ndarray]) -> dict[str, Tariff | None]:
+    # Every tariff that can be built from the config, whichever one TARIFF_PARAMS['mode'] selects.
+    tariffs: dict[str, Tariff | None] = {"flat": None, "bands": band_tariff(calendar)}
+    curve_file = cfg.TARIFF_PARAMS.get("price_curve_file")
+    if curve_file and Path(curve_file).is_file():
+        tariffs["curve"] = price_curve_tariff(curve_file)
+    return tariffs
+
+
+@dataclass(frozen=True, eq=False)
+class PricedIndex:
+    """An energy balance index with the tariff's band weights folded into its prefix sums."""
+
+    index: EnergyBalanceIndex
+    tariff: Tariff
+    import_prefixes: tuple[np.ndarray, np.ndarray] = field(repr=False)
+    export_prefixes: tuple[np.ndarray, np.ndarray] = field(repr=False)
+
+    def band_energy(self, scales: np.ndarray) -> dict[str, np.ndarray]:
+        return {
+            "self_consumed_kwh": self.index.weighted_balances(scales, self.import_prefixes)["self_consumed_kwh"],
+            "exported_kwh": self.index.weighted_balances(scales, self.export_prefixes)["exported_kwh"],
+        }
+
+    def values(self, scales: np.ndarray) -> dict[str, np.ndarray]:
+        energy = self.band_energy(scales)
+        return {
+            "savings_euro": energy["self_consumed_kwh"] @ self.tariff.import_rates,
+            "export_revenue_euro": energy["exported_kwh"] @ self.tariff.export_rates,
+        }
+
+
+@lru_cache(maxsize=32)
+def priced_index(index: EnergyBalanceIndex, tariff: Tariff) -> PricedIndex:
+    if tariff.hours != index.hour_count:
+        raise ValueError("tariff does not cover every hour of the dataset")
+    return PricedIndex(
+        index=index,
+        tariff=tariff,
+        import_prefixes=index.weighted_prefixes(tariff.import_weights),
+        export_prefixes=index.weighted_prefixes(tariff.export_weights),
+    )
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, tzinfo
+from functools import lru_cache
+
+
+# Zones following the EU summer-time rule: clocks move forward at 01:00 UTC on the last Sunday
+# of March and back at 01:00 UTC on the last Sunday of October, simultaneously in every zone.
+EU_RULE_ZONES: dict[str, tuple[int, str, str]] = {
+    "Atlantic/Canary": (0, "WET", "WEST"),
+    "Atlantic/Madeira": (0, "WET", "WEST"),
+    "Europe/Dublin": (0, "GMT", "IST"),
+    "Europe/Lisbon": (0, "WET", "WEST"),
+    "Europe/London": (0, "GMT", "BST"),
+    "Europe/Amsterdam": (1, "CET", "CEST"),
+    "Europe/Andorra": (1, "CET", "CEST"),
+    "Europe/Belgrade": (1, "CET", "CEST"),
+    "Europe/Berlin": (1, "CET", "CEST"),
+    "Europe/Bratislava": (1, "CET", "CEST"),
+    "Europe/Brussels": (1, "CET", "CEST"),
+    "Europe/Budapest": (1, "CET", "CEST"),
+    "Europe/Copenhagen": (1, "CET", "CEST"),
+    "Europe/Gibraltar": (1, "CET", "CEST"),
+    "Europe/Ljubljana": (1, "CET", "CEST"),
+    "Europe/Luxembourg": (1, "CET", "CEST"),
+    "Europe/Madrid": (1, "CET", "CEST"),
+    "Europe/Malta": (1, "CET", "CEST"),
+    "Europe/Monaco": (1, "CET", "CEST"),
+    "Europe/Oslo": (1, "CET", "CEST"),
+    "Europe/Paris": (1, "CET", "CEST"),
+    "Europe/Prague": (1, "CET", "CEST"),
+    "Europe/Rome": (1, "CET", "CEST"),
+    "Europe/San_Marino": (1, "CET", "CEST"),
+    "Europe/Sarajevo": (1, "CET", "CEST"),
+    "Europe/Skopje": (1, "CET", "CEST"),
+    "Europe/Stockholm": (1, "CET", "CEST"),
+    "Europe/Tirane": (1, "CET", "CEST"),
+    "Europe/Vaduz": (1, "CET", "CEST"),
+    "Europe/Vatican": (1, "CET", "CEST"),
+    "Europe/Vienna": (1, "CET", "CEST"),
+    "Europe/Warsaw": (1, "CET", "CEST"),
+    "Europe/Zagreb": (1, "CET", "CEST"),
+    "Europe/Zurich": (1, "CET", "CEST"),
+    "Asia/Nicosia": (2, "EET", "EEST"),
+    "Europe/Athens": (2, "EET", "EEST"),
+    "Europe/Bucharest": (2, "EET", "EEST"),
+    "Europe/Helsinki": (2, "EET", "EEST"),
+    "Europe/Kyiv": (2, "EET", "EEST"),
+    "Europe/Riga": (2, "EET", "EEST"),
+    "Europe/Sofia": (2, "EET", "EEST"),
+    "Europe/Tallinn": (2, "EET", "EEST"),
+    "Europe/Vilnius": (2, "EET", "EEST"),
+}
+
+ONE_HOUR = timedelta(hours=1)
+
+
+def last_sunday(year: int, month: int) -> date:
+    last_day = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    last_day -= timedelta(days=1)
+    return last_day - timedelta(days=(last_day.weekday() + 1) % 7)
+
+
+def eu_transitions_utc(year: int) -> tuple[datetime, datetime]:
+    start = last_sunday(year, 3)
+    end = last_sunday(year, 10)
+    return datetime(start.year, start.month, start.day, 1), datetime(end.year, end.month, end.day, 1)
+
+
+class EURuleFallbackTZ(tzinfo):
+    """Fallback for EU-rule zones when tzdata is unavailable, backed by per-year transition tables."""
+
+    def __init__(self, key: str = "Europe/Rome"):
+        if key not in EU_RULE_ZONES:
+            raise ValueError(f"{key} does not follow the EU summer-time rule")
+        standard_hours, self._standard_name, self._summer_name = EU_RULE_ZONES[key]
+        self.key = key
+        self._standard = timedelta(hours=standard_hours)
+        self._summer = self._standard + ONE_HOUR
+        self._tables: dict[int, tuple[datetime, datetime, datetime, datetime]] = {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key!r})"
+
+    def __reduce__(self):
+        return fallback_timezone, (self.key,)
+
+    def transitions(self, year: int) -> tuple[datetime, datetime, datetime, datetime]:
+        table = self._tables.get(year)
+        if table is None:
+            start_utc, end_utc = eu_transitions_utc(year)
+            # Local wall-clock bounds: summer time covers [start_local, end_local) and the hour
+            # before end_local is ambiguous, repeated once in summer and once in standard time.
+            start_local = start_utc + self._summer
+            end_local = end_utc + self._summer
+            table = (start_utc, end_utc, start_local, end_local)
+            self._tables[year] = table
+        return table
+
+    def _is_dst(self, dt: datetime | None) -> bool:
+        if dt is None:
+            return False
+        if dt.tzinfo is not self:
+            utc_naive = (dt - (dt.utcoffset() or timedelta(0))).replace(tzinfo=None)
+            start_utc, end_utc, _, _ = self.transitions(utc_naive.year)
+            return start_utc <= utc_naive < end_utc
+
+        naive = dt.replace(tzinfo=None, fold=0)
+        _, _, start_local, end_local = self.transitions(naive.year)
+        if dt.fold and end_local - ONE_HOUR <= naive < end_local:
+            return False
+        return start_local <= naive < end_local
+
+    def utcoffset(self, dt: datetime | None) -> timedelta:
+        return self._summer if self._is_dst(dt) else self._standard
+
+    def dst(self, dt: datetime | None) -> timedelta:
+        return ONE_HOUR if self._is_dst(dt) else timedelta(0)
+
+    def tzname(self, dt: datetime | None) -> str:
+        return self._summer_name if self._is_dst(dt) else self._standard_name
+
+    def fromutc(self, dt: datetime) -> datetime:
+        utc_naive = dt.replace(tzinfo=None)
+        start_utc, end_utc, _, _ = self.transitions(utc_naive.year)
+        if start_utc <= utc_naive < end_utc:
+            return (utc_naive + self._summer).replace(tzinfo=self)
+        local = (utc_naive + self._standard).replace(tzinfo=self)
+        if end_utc <= utc_naive < end_utc + ONE_HOUR:
+            return local.replace(fold=1)
+        return local
+
+
+@lru_cache(maxsize=None)
+def fallback_timezone(key: str) -> EURuleFallbackTZ:
+    return EURuleFallbackTZ(key)
@@ -3,11 +3,27 @@ from __future__ import annotations
 import hashlib
 import math
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone, tzinfo
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import numpy as np
+
 from config import userdata_config as cfg
 
+try:
+    from .ephemeris import solar_ephemeris
+    from .noise import NOISE_MODES, counter_noise
+    from .timezones import EU_RULE_ZONES, EURuleFallbackTZ, fallback_timezone
+except ImportError:
+    from solar_analysis_data.ephemeris import solar_ephemeris
+    from solar_analysis_data.noise import NOISE_MODES, counter_noise
+    from solar_analysis_data.timezones import EU_RULE_ZONES, EURuleFallbackTZ, fallback_timezone
+
+
+# Part of every simulation cache key; bump it whenever the columns or values simulate_days returns
+# change, so cached years are re-simulated (2026.2 added the declination and hour-angle columns).
+MODEL_VERSION = "2026.2"
 
 MONTHLY_NORMALS = {
     "temp_mean_c": [2.8, 4.7, 8.9, 12.8, 17.2, 21.1, 23.9, 23.3, 19.2, 13.7, 8.0, 3.7],
@@ -19,63 +35,8 @@ MONTHLY_NORMALS = {
 }
 
 
-class EuropeRomeFallbackTZ(tzinfo):
-    """Fallback timezone for Europe/Rome when tzdata is unavailable."""
-
-    def _last_sunday(self, year: int, month: int) -> datetime:
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1)
-        else:
-            next_month = datetime(year, month + 1, 1)
-        current = next_month - timedelta(days=1)
-        while current.weekday() != 6:
-            current -= timedelta(days=1)
-        return current
-
-    def _dst_window_utc(self, year: int) -> tuple[datetime, datetime]:
-        dst_start_local = self._last_sunday(year, 3).replace(hour=2)
-        dst_end_local = self._last_sunday(year, 10).replace(hour=3)
-        dst_start_utc = dst_start_local - timedelta(hours=1)
-        dst_end_utc = dst_end_local - timedelta(hours=2)
-        return dst_start_utc, dst_end_utc
-
-    def _is_dst(self, dt: datetime | None) -> bool:
-        if dt is None:
-            return False
-        naive = dt.replace(tzinfo=None)
-        dst_start_utc, dst_end_utc = self._dst_window_utc(naive.year)
-
-        if dt.tzinfo is self:
-            winter_candidate_utc = naive - timedelta(hours=1)
-            summer_candidate_utc = naive - timedelta(hours=2)
-
-            if dst_start_utc <= summer_candidate_utc < dst_end_utc:
-                return True
-            if dst_start_utc <= winter_candidate_utc < dst_end_utc and naive.hour >= 3:
-                return True
-            return False
-
-        if dt.tzinfo is timezone.utc:
-            utc_naive = naive
-        else:
-            utc_naive = (dt - (dt.utcoffset() or timedelta(0))).replace(tzinfo=None)
-
-        return dst_start_utc <= utc_naive < dst_end_utc
-
-    def utcoffset(self, dt: datetime | None) -> timedelta:
-        return timedelta(hours=2 if self._is_dst(dt) else 1)
-
-    def dst(self, dt: datetime | None) -> timedelta:
-        return timedelta(hours=1 if self._is_dst(dt) else 0)
-
-    def tzname(self, dt: datetime | None) -> str:
-        return "CEST" if self._is_dst(dt) else "CET"
-
-    def fromutc(self, dt: datetime) -> datetime:
-        standard_time = (dt + timedelta(hours=1)).replace(tzinfo=self)
-        if self._is_dst(standard_time):
-            return (dt + timedelta(hours=2)).replace(tzinfo=self)
-        return standard_time
+# Kept for callers that construct the Turin fallback directly; it is the EU-rule fallback.
+EuropeRomeFallbackTZ = EURuleFallbackTZ
 
 
 @dataclass(frozen=True)
@@ -93,14 +54,15 @@ class TurinSimulationConfig:
     albedo: float = cfg.SIMULATION_PARAMS["albedo"]
     site_calibration_factor: float = cfg.SIMULATION_PARAMS["site_calibration_factor"]
     seed: int = cfg.SIMULATION_PARAMS["seed"]
+    noise_mode: str = cfg.SIMULATION_PARAMS.get("noise_mode", "sha256")
 
     @property
-    def tzinfo(self) -> tzinfo:
+    def tzinfo(self) -> ZoneInfo | EURuleFallbackTZ:
         try:
             return ZoneInfo(self.timezone)
         except ZoneInfoNotFoundError:
-            if self.timezone == "Europe/Rome":
-                return EuropeRomeFallbackTZ()
+            if self.timezone in EU_RULE_ZONES:
+                return fallback_timezone(self.timezone)
             raise
 
 
@@ -115,6 +77,24 @@ def stable_noise(*parts: object, low: float = -1.0, high: float = 1.0) -> float:
     return low + (high - low) * fraction
 
 
+def simulation_noise(
+    config: TurinSimulationConfig,
+    day: date,
+    tag: str,
+    hour: int | None = None,
+    low: float = -1.0,
+    high: float = 1.0,
+) -> float:
+    if config.noise_mode == "counter":
+        hours = None if hour is None else [hour]
+        return float(counter_noise(config.seed, [day], tag, low=low, high=high, hours=hours).reshape(-1)[0])
+    if config.noise_mode != "sha256":
+        raise ValueError(f"Unknown noise mode {config.noise_mode!r}; expected one of {NOISE_MODES}")
+    if hour is None:
+        return stable_noise(config.seed, day, tag, low=low, high=high)
+    return stable_noise(config.seed, day, hour, tag, low=low, high=high)
+
+
 def interpolate_monthly_value(values: list[float], timestamp: datetime) -> float:
     month_index = timestamp.month - 1
     next_index = (month_index + 1) % 12
@@ -167,6 +147,17 @@ def solar_position(timestamp: datetime, latitude: float, longitude: float) -> di
     }
 
 
+def ephemeris_position(timestamp: datetime, config: TurinSimulationConfig) -> dict[str, float]:
+    if (timestamp.minute, timestamp.second, timestamp.microsecond) == (0, 0, 0):
+        table = solar_ephemeris(
+            timestamp.year, config.latitude, config.longitude, config.timezone, tz=config.tzinfo
+        )
+        position = table.position_at(timestamp)
+        if position is not None:
+            return position
+    return solar_position(timestamp, config.latitude, config.longitude)
+
+
 def clear_sky_irradiance_wm2(cos_zenith: float) -> float:
     if cos_zenith <= 0:
         return 0.0
@@ -233,7 +224,7 @@ def simulate_hour(
     else:
         timestamp = timestamp.astimezone(config.tzinfo)
 
-    position = solar_position(timestamp, config.latitude, config.longitude)
+    position = ephemeris_position(timestamp, config)
     day_of_year = position["day_of_year"]
     solar_factor = position["solar_factor"]
 
@@ -244,19 +235,19 @@ def simulate_hour(
     mean_cloud = interpolate_monthly_value(MONTHLY_NORMALS["cloud_cover_pct"], timestamp)
     mean_wind = interpolate_monthly_value(MONTHLY_NORMALS["wind_speed_kmh"], timestamp)
 
-    daily_temp_shift = stable_noise(config.seed, timestamp.date(), "temp", low=-3.5, high=3.5)
-    hourly_temp_shift = stable_noise(config.seed, timestamp.date(), timestamp.hour, "temp-hour", low=-1.0, high=1.0)
+    daily_temp_shift = simulation_noise(config, timestamp.date(), "temp", low=-3.5, high=3.5)
+    hourly_temp_shift = simulation_noise(config, timestamp.date(), "temp-hour", timestamp.hour, low=-1.0, high=1.0)
     diurnal_phase = 2 * math.pi * (timestamp.hour - 14) / 24
     diurnal_span = max(4.0, (max_temp - min_temp) / 2)
     temperature_c = mean_temp + daily_temp_shift + diurnal_span * math.cos(diurnal_phase) + hourly_temp_shift
 
-    cloud_state = daily_cloud_state if daily_cloud_state is not None else stable_noise(
-        config.seed, timestamp.date(), "cloud-day", low=-18.0, high=18.0
+    cloud_state = daily_cloud_state if daily_cloud_state is not None else simulation_noise(
+        config, timestamp.date(), "cloud-day", low=-18.0, high=18.0
     )
-    hourly_cloud_shift = stable_noise(config.seed, timestamp.date(), timestamp.hour, "cloud-hour", low=-10.0, high=10.0)
+    hourly_cloud_shift = simulation_noise(config, timestamp.date(), "cloud-hour", timestamp.hour, low=-10.0, high=10.0)
     cloud_cover_pct = clamp(mean_cloud + cloud_state + hourly_cloud_shift - 12 * solar_factor, 0.0, 100.0)
 
-    humidity_shift = stable_noise(config.seed, timestamp.date(), timestamp.hour, "humidity", low=-6.0, high=6.0)
+    humidity_shift = simulation_noise(config, timestamp.date(), "humidity", timestamp.hour, low=-6.0, high=6.0)
     humidity_pct = clamp(
         mean_humidity
         - 2.2 * (temperature_c - mean_temp)
@@ -266,7 +257,7 @@ def simulate_hour(
         99.0,
     )
 
-    wind_shift = stable_noise(config.seed, timestamp.date(), timestamp.hour, "wind", low=-1.7, high=1.7)
+    wind_shift = simulation_noise(config, timestamp.date(), "wind", timestamp.hour, low=-1.7, high=1.7)
     diurnal_wind = 1.4 * max(0.0, math.sin(2 * math.pi * (timestamp.hour - 11) / 24))
     wind_speed_kmh = clamp(mean_wind + diurnal_wind + 0.05 * abs(cloud_state) + wind_shift, 1.0, 28.0)
 
@@ -339,7 +330,7 @@ def generate_hourly_dataset(year: int, config: TurinSimulationConfig | None = No
 
     while current < end:
         cloud_state = clamp(
-            0.62 * cloud_state + stable_noise(config.seed, current.date(), "front", low=-20.0, high=20.0),
+            0.62 * cloud_state + simulation_noise(config, current.date(), "front", low=-20.0, high=20.0),
             -30.0,
             30.0,
         )
@@ -351,25 +342,54 @@ def generate_hourly_dataset(year: int, config: TurinSimulationConfig | None = No
     return rows
 
 
-def build_live_panel_event(
-    panel_id: str,
+@lru_cache(maxsize=64)
+def _panel_variation_factors(seed: int, panel_ids: tuple[str, ...]) -> np.ndarray:
+    factors = np.array([stable_noise(seed, panel_id, "panel-variance", low=0.97, high=1.03) for panel_id in panel_ids])
+    factors.flags.writeable = False
+    return factors
+
+
+def panel_variation_factors(panel_ids: list[str] | tuple[str, ...], seed: int) -> np.ndarray:
+    return _panel_variation_factors(seed, tuple(panel_ids))
+
+
+def build_fleet_events(
+    panel_ids: list[str] | tuple[str, ...],
     when: datetime | None = None,
     config: TurinSimulationConfig | None = None,
-) -> dict[str, float | str]:
+) -> list[dict[str, float | str]]:
     config = config or TurinSimulationConfig()
     local_now = when.astimezone(config.tzinfo) if when else datetime.now(config.tzinfo)
     row = simulate_hour(local_now, config=config)
-    panel_variation = stable_noise(config.seed, panel_id, "panel-variance", low=0.97, high=1.03)
-    production_kw = round(float(row["production_kw"]) * panel_variation, 3)
+    factors = panel_variation_factors(panel_ids, config.seed)
+    # Built-in round per value, as the single-panel path did; np.round scales by 10**3 first and can
+    # land on the other side of a .5 boundary.
+    production = [round(value, 3) for value in (float(row["production_kw"]) * factors).tolist()]
+
+    timestamp = datetime.now(ZoneInfo("UTC")).isoformat()
+    temperature_c = row["temperature"]
+    cloud_factor = round(float(row["cloud_factor"]), 3)
+    temp_efficiency = round(float(row["temp_efficiency"]), 3)
+
+    return [
+        {
+            "timestamp": timestamp,
+            "panel_id": panel_id,
+            "panel_power_kw": config.system_size_kw,
+            "production_kw": production_kw,
+            "temperature_c": temperature_c,
+            "cloud_factor": cloud_factor,
+            "temp_efficiency": temp_efficiency,
+            "status": "active" if production_kw > 0 else "idle",
+            "city": config.city,
+        }
+        for panel_id, production_kw in zip(panel_ids, production)
+    ]
 
-    return {
-        "timestamp": datetime.now(ZoneInfo("UTC")).isoformat(),
-        "panel_id": panel_id,
-        "panel_power_kw": config.system_size_kw,
-        "production_kw": production_kw,
-        "temperature_c": row["temperature"],
-        "cloud_factor": round(float(row["cloud_factor"]), 3),
-        "temp_efficiency": round(float(row["temp_efficiency"]), 3),
-        "status": "active" if production_kw > 0 else "idle",
-        "city": config.city,
-    }
+
+def build_live_panel_event(
+    panel_id: str,
+    when: datetime | None = None,
+    config: TurinSimulationConfig | None = None,
+) -> dict[str, float | str]:
+    return build_fleet_events([panel_id], when=when, config=config)[0]
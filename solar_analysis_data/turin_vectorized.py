@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+
+try:
+    from .ephemeris import ephemeris_for_days
+    from .hourly_frame import HourlyFrame
+    from .noise import HOURS, bulk_noise
+    from .turin_model import MONTHLY_NORMALS, TurinSimulationConfig, clamp
+except ImportError:
+    from solar_analysis_data.ephemeris import ephemeris_for_days
+    from solar_analysis_data.hourly_frame import HourlyFrame
+    from solar_analysis_data.noise import HOURS, bulk_noise
+    from solar_analysis_data.turin_model import MONTHLY_NORMALS, TurinSimulationConfig, clamp
+
+
+# Row fields rounded to these digits match the scalar `simulate_hour` rows exactly except where a
+# value sits on a rounding boundary, in which case they differ by one unit in the last decimal.
+ROUNDED_FIELDS = {
+    "temperature": 2,
+    "wind_speed": 2,
+    "uv_index": 1,
+    "solar_elevation_deg": 3,
+    "solar_azimuth_deg": 3,
+    "solar_angle": 6,
+    "cloud_factor": 6,
+    "temp_efficiency": 6,
+    "uv_factor": 6,
+    "clear_sky_ghi_wm2": 2,
+    "ghi_wm2": 2,
+    "poa_irradiance_wm2": 2,
+    "cell_temperature_c": 2,
+    "production_kw": 6,
+}
+
+
+def day_range(start: date, n_days: int) -> list[date]:
+    return [start + timedelta(days=offset) for offset in range(n_days)]
+
+
+def _noise_grid(
+    config: TurinSimulationConfig,
+    days: list[date],
+    tag: str,
+    low: float,
+    high: float,
+    hourly: bool = True,
+    hours: np.ndarray = HOURS,
+) -> np.ndarray:
+    hours = hours if hourly else None
+    return bulk_noise(config.seed, days, tag, low=low, high=high, hours=hours, mode=config.noise_mode).reshape(-1)
+
+
+def daily_cloud_states(
+    days: list[date],
+    config: TurinSimulationConfig,
+    initial_state: float = 0.0,
+) -> np.ndarray:
+    fronts = _noise_grid(config, days, "front", -20.0, 20.0, hourly=False)
+    states = np.empty(len(days))
+    state = initial_state
+    for index, front in enumerate(fronts):
+        state = clamp(0.62 * state + float(front), -30.0, 30.0)
+        states[index] = state
+    return states
+
+
+def calendar_columns(days: list[date]) -> dict[str, np.ndarray]:
+    day_ordinal = np.array([day.toordinal() for day in days], dtype=np.int64)
+    month = np.array([day.month for day in days], dtype=np.int64)
+    day_of_month = np.array([day.day for day in days], dtype=np.int64)
+    day_of_year = np.array([day.timetuple().tm_yday for day in days], dtype=np.int64)
+    days_in_month = np.array(
+        [((day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)).day for day in days],
+        dtype=np.int64,
+    )
+    weekday = np.array([day.weekday() for day in days], dtype=np.int64)
+    year = np.array([day.year for day in days], dtype=np.int64)
+
+    return {
+        "day_ordinal": np.repeat(day_ordinal, 24),
+        "year": np.repeat(year, 24),
+        "month": np.repeat(month, 24),
+        "day": np.repeat(day_of_month, 24),
+        "day_of_year": np.repeat(day_of_year, 24),
+        "days_in_month": np.repeat(days_in_month, 24),
+        "weekday": np.repeat(weekday, 24),
+        "hour": np.tile(np.arange(24, dtype=np.int64), len(days)),
+    }
+
+
+def interpolate_monthly_values(
+    values: list[float],
+    month: np.ndarray,
+    day: np.ndarray,
+    fractional_hour: np.ndarray,
+    days_in_month: np.ndarray,
+) -> np.ndarray:
+    table = np.asarray(values, dtype=float)
+    month_index = month - 1
+    next_index = (month_index + 1) % 12
+    fraction = ((day - 1) + fractional_hour / 24) / days_in_month
+    return table[month_index] + (table[next_index] - table[month_index]) * fraction
+
+
+def clear_sky_irradiance_array(cos_zenith: np.ndarray) -> np.ndarray:
+    positive = cos_zenith > 0
+    safe = np.where(positive, cos_zenith, 1.0)
+    return np.where(positive, 1098 * safe * np.exp(-0.059 / safe), 0.0)
+
+
+def uv_index_array(solar_factor: np.ndarray, cloud_cover_pct: np.ndarray) -> np.ndarray:
+    cloud_transmittance = 1 - 0.55 * ((cloud_cover_pct / 100) ** 2.2)
+    uv = np.round(np.clip(11 * (solar_factor**1.25) * cloud_transmittance, 0.0, 10.5), 1)
+    return np.where(solar_factor > 0, uv, 0.0)
+
+
+def plane_of_array_irradiance_array(
+    ghi_wm2: np.ndarray,
+    solar_factor: np.ndarray,
+    declination_deg: np.ndarray,
+    hour_angle_deg: np.ndarray,
+    latitude_deg: float,
+    tilt_deg: float,
+    azimuth_from_south_deg: float,
+    cloud_cover_pct: np.ndarray,
+    albedo: float,
+) -> np.ndarray:
+    latitude_rad = np.radians(latitude_deg)
+    declination_rad = np.radians(declination_deg)
+    hour_angle_rad = np.radians(hour_angle_deg)
+    tilt_rad = np.radians(tilt_deg)
+    surface_azimuth_rad = np.radians(azimuth_from_south_deg)
+
+    cos_incidence = (
+        np.sin(declination_rad) * np.sin(latitude_rad) * np.cos(tilt_rad)
+        - np.sin(declination_rad) * np.cos(latitude_rad) * np.sin(tilt_rad) * np.cos(surface_azimuth_rad)
+        + np.cos(declination_rad) * np.cos(latitude_rad) * np.cos(tilt_rad) * np.cos(hour_angle_rad)
+        + np.cos(declination_rad) * np.sin(latitude_rad) * np.sin(tilt_rad) * np.cos(surface_azimuth_rad) * np.cos(hour_angle_rad)
+        + np.cos(declination_rad) * np.sin(tilt_rad) * np.sin(surface_azimuth_rad) * np.sin(hour_angle_rad)
+    )
+    cos_incidence = np.maximum(0.0, cos_incidence)
+
+    diffuse_fraction = np.clip(0.22 + 0.42 * (cloud_cover_pct / 100), 0.18, 0.72)
+    diffuse_horizontal = ghi_wm2 * diffuse_fraction
+    beam_horizontal = np.maximum(0.0, ghi_wm2 - diffuse_horizontal)
+    beam_ratio = cos_incidence / np.maximum(solar_factor, 1e-6)
+
+    beam_tilted = beam_horizontal * beam_ratio
+    diffuse_tilted = diffuse_horizontal * (1 + np.cos(tilt_rad)) / 2
+    ground_reflected = ghi_wm2 * albedo * (1 - np.cos(tilt_rad)) / 2
+
+    poa = np.maximum(0.0, beam_tilted + diffuse_tilted + ground_reflected)
+    return np.where((ghi_wm2 > 0) & (solar_factor > 0), poa, 0.0)
+
+
+HOURLY_NOISE = {
+    "temp-hour": (-1.0, 1.0),
+    "cloud-hour": (-10.0, 10.0),
+    "humidity": (-6.0, 6.0),
+    "wind": (-1.7, 1.7),
+}
+
+
+def weather_and_production(
+    config: TurinSimulationConfig,
+    normals: dict[str, list[float]],
+    calendar: dict[str, np.ndarray],
+    fractional_hour: np.ndarray,
+    position: dict[str, np.ndarray],
+    cloud_state: np.ndarray,
+    daily_temp_shift: np.ndarray,
+    noise: dict[str, np.ndarray],
+) -> dict[str, np.ndarray]:
+    utc_offset = position["utc_offset_hours"]
+    solar_factor = position["solar_factor"]
+
+    def monthly(name: str) -> np.ndarray:
+        return interpolate_monthly_values(
+            normals[name], calendar["month"], calendar["day"], fractional_hour, calendar["days_in_month"]
+        )
+
+    mean_temp = monthly("temp_mean_c")
+    min_temp = monthly("temp_min_c")
+    max_temp = monthly("temp_max_c")
+    mean_humidity = monthly("humidity_pct")
+    mean_cloud = monthly("cloud_cover_pct")
+    mean_wind = monthly("wind_speed_kmh")
+
+    hourly_temp_shift = noise["temp-hour"]
+    diurnal_phase = 2 * np.pi * (fractional_hour - 14) / 24
+    diurnal_span = np.maximum(4.0, (max_temp - min_temp) / 2)
+    temperature_c = mean_temp + daily_temp_shift + diurnal_span * np.cos(diurnal_phase) + hourly_temp_shift
+
+    hourly_cloud_shift = noise["cloud-hour"]
+    cloud_cover_pct = np.clip(mean_cloud + cloud_state + hourly_cloud_shift - 12 * solar_factor, 0.0, 100.0)
+
+    humidity_shift = noise["humidity"]
+    humidity_pct = np.clip(
+        mean_humidity - 2.2 * (temperature_c - mean_temp) + 0.18 * (cloud_cover_pct - mean_cloud) + humidity_shift,
+        28.0,
+        99.0,
+    )
+
+    wind_shift = noise["wind"]
+    diurnal_wind = 1.4 * np.maximum(0.0, np.sin(2 * np.pi * (fractional_hour - 11) / 24))
+    wind_speed_kmh = np.clip(mean_wind + diurnal_wind + 0.05 * np.abs(cloud_state) + wind_shift, 1.0, 28.0)
+
+    clear_sky_ghi = clear_sky_irradiance_array(solar_factor)
+    cloud_transmittance = np.clip(1 - 0.72 * ((cloud_cover_pct / 100) ** 3.2), 0.16, 1.0)
+    haze_factor = np.clip(1 - ((humidity_pct - 55) / 230), 0.82, 1.0)
+    ghi_wm2 = clear_sky_ghi * cloud_transmittance * haze_factor
+    poa_irradiance_wm2 = plane_of_array_irradiance_array(
+        ghi_wm2=ghi_wm2,
+        solar_factor=solar_factor,
+        declination_deg=position["declination_deg"],
+        hour_angle_deg=position["hour_angle_deg"],
+        latitude_deg=config.latitude,
+        tilt_deg=config.panel_tilt_deg,
+        azimuth_from_south_deg=config.panel_azimuth_deg,
+        cloud_cover_pct=cloud_cover_pct,
+        albedo=config.albedo,
+    )
+
+    cell_temperature_c = temperature_c + ((config.noct_c - 20) / 800.0) * poa_irradiance_wm2
+    temp_efficiency = np.where(
+        cell_temperature_c <= 25,
+        1.0,
+        np.maximum(0.0, 1 - (cell_temperature_c - 25) * config.temp_coefficient),
+    )
+    production_kw = np.maximum(
+        0.0,
+        config.system_size_kw
+        * (poa_irradiance_wm2 / 1000.0)
+        * config.derating_factor
+        * config.site_calibration_factor
+        * temp_efficiency,
+    )
+    uv_index = uv_index_array(solar_factor, cloud_cover_pct)
+
+    return {
+        "utc_offset_hours": utc_offset,
+        "is_daylight": (solar_factor > 0).astype(np.int64),
+        "temperature": temperature_c,
+        "humidity": humidity_pct,
+        "wind_speed": wind_speed_kmh,
+        "cloudcover": cloud_cover_pct,
+        "uv_index": uv_index,
+        "solar_elevation_deg": position["elevation_deg"],
+        "solar_azimuth_deg": position["azimuth_deg"],
+        "declination_deg": position["declination_deg"],
+        "hour_angle_deg": position["hour_angle_deg"],
+        "solar_angle": solar_factor,
+        "cloud_factor": cloud_transmittance,
+        "temp_efficiency": temp_efficiency,
+        "uv_factor": np.clip(uv_index / 10.0, 0.0, 1.0),
+        "clear_sky_ghi_wm2": clear_sky_ghi,
+        "ghi_wm2": ghi_wm2,
+        "poa_irradiance_wm2": poa_irradiance_wm2,
+        "cell_temperature_c": cell_temperature_c,
+        "production_kw": production_kw,
+    }
+
+
+def simulate_days(
+    days: list[date],
+    config: TurinSimulationConfig | None = None,
+    cloud_states: np.ndarray | None = None,
+    normals: dict[str, list[float]] | None = None,
+    hours: list[int] | np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    config = config or TurinSimulationConfig()
+    normals = normals or MONTHLY_NORMALS
+    if cloud_states is None:
+        cloud_states = daily_cloud_states(days, config)
+
+    # Noise is keyed by the hour itself, so a subset of hours (a live tick) draws exactly the values
+    # the full-day run would, without evaluating the rest of the day.
+    hours_of_day = HOURS if hours is None else np.asarray(hours, dtype=np.int64)
+    selected = (np.arange(len(days))[:, None] * 24 + hours_of_day).reshape(-1)
+    columns = {name: values[selected] for name, values in calendar_columns(days).items()}
+    position = ephemeris_for_days(days, config.latitude, config.longitude, config.timezone, tz=config.tzinfo)
+    position = {name: values[selected] for name, values in position.items()}
+    noise = {
+        tag: _noise_grid(config, days, tag, low, high, hours=hours_of_day) for tag, (low, high) in HOURLY_NOISE.items()
+    }
+    columns.update(
+        weather_and_production(
+            config,
+            normals,
+            columns,
+            columns["hour"].astype(float),
+            position,
+            cloud_state=np.repeat(np.asarray(cloud_states, dtype=float), len(hours_of_day)),
+            daily_temp_shift=np.repeat(
+                _noise_grid(config, days, "temp", -3.5, 3.5, hourly=False), len(hours_of_day)
+            ),
+            noise=noise,
+        )
+    )
+    return columns
+
+
+def simulate_year(
+    year: int,
+    config: TurinSimulationConfig | None = None,
+    normals: dict[str, list[float]] | None = None,
+) -> dict[str, np.ndarray]:
+    start = date(year, 1, 1)
+    return simulate_days(day_range(start, (date(year + 1, 1, 1) - start).days), config=config, normals=normals)
+
+
+def frame_from_arrays(
+    arrays: dict[str, np.ndarray],
+    config: TurinSimulationConfig | None = None,
+) -> HourlyFrame:
+    config = config or TurinSimulationConfig()
+    rounded = {name: np.round(arrays[name], digits) for name, digits in ROUNDED_FIELDS.items()}
+
+    # Calendar columns fit in small integers; every value a row exposes keeps the rounding the
+    # row fields always had. The production aliases share one buffer.
+    columns = {
+        "day_ordinal": arrays["day_ordinal"].astype(np.int32),
+        "weekday": arrays["weekday"].astype(np.int8),
+        "utc_offset_hours": arrays["utc_offset_hours"].astype(np.float64),
+        "hour": arrays["hour"].astype(np.int8),
+        "month": arrays["month"].astype(np.int8),
+        "day_of_year": arrays["day_of_year"].astype(np.int16),
+        "is_daylight": arrays["is_daylight"].astype(np.int8),
+        "temperature": rounded["temperature"],
+        "humidity": np.rint(arrays["humidity"]).astype(np.int16),
+        "wind_speed": rounded["wind_speed"],
+        "cloudcover": np.rint(arrays["cloudcover"]).astype(np.int16),
+    }
+    for name in ROUNDED_FIELDS:
+        columns.setdefault(name, rounded[name])
+    columns["hourly_production_kwh"] = columns["production_kw"]
+    columns["solar_potential"] = columns["production_kw"]
+    return HourlyFrame(config.city, columns)
+
+
+def rows_from_arrays(
+    arrays: dict[str, np.ndarray],
+    config: TurinSimulationConfig | None = None,
+) -> list[dict[str, float | int | str]]:
+    return list(frame_from_arrays(arrays, config=config).rows())
+
+
+def generate_hourly_frame(year: int, config: TurinSimulationConfig | None = None) -> HourlyFrame:
+    config = config or TurinSimulationConfig()
+    return frame_from_arrays(simulate_year(year, config=config), config=config)
+
+
+def generate_hourly_rows(year: int, config: TurinSimulationConfig | None = None) -> list[dict[str, float | int | str]]:
+    config = config or TurinSimulationConfig()
+    return rows_from_arrays(simulate_year(year, config=config), config=config)
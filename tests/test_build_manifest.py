@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import userdata_config as cfg
+from solar_analysis_data.reliable_analysis import run_reliable_analysis
+from solar_analysis_data.simulation_cache import SimulationCache
+
+
+def test_run_reliable_analysis_skips_stages_whose_inputs_did_not_change(tmp_path):
+    cache, build_dir = SimulationCache(tmp_path / "cache"), tmp_path / "build"
+    first = run_reliable_analysis(2026, cache=cache, build_dir=build_dir)
+    assert first["build"]["skipped"] == []
+
+    second = run_reliable_analysis(2026, cache=cache, build_dir=build_dir)
+    assert second["build"] == {"ran": [], "skipped": ["profile", "economics", "cube", "hourly", "report"]}
+    assert second["summary"]["optimal_system"] == first["summary"]["optimal_system"]
+
+    with patch.dict(cfg.TARIFF_PARAMS, {"mode": "bands"}):
+        banded = run_reliable_analysis(2026, cache=cache, build_dir=build_dir)
+    assert banded["build"] == {"ran": ["economics", "report"], "skipped": ["profile", "cube", "hourly"]}
+    assert banded["summary"]["tariff"] == "bands"
+    assert "monte_carlo" not in banded["summary"]
+
+    with patch.dict(cfg.SIMULATION_PARAMS, {"monte_carlo_draws": 4}):
+        sampled = run_reliable_analysis(2026, cache=cache, build_dir=build_dir)
+    assert sampled["build"] == {"ran": ["economics", "report"], "skipped": ["profile", "cube", "hourly"]}
+    monte_carlo = sampled["summary"]["monte_carlo"]
+    assert monte_carlo["draws"] == 4 and monte_carlo["master_seed"] == cfg.SIMULATION_PARAMS["seed"]
+    assert monte_carlo["npv_25_years_euro"]["p10"] <= monte_carlo["npv_25_years_euro"]["p90"]
+    assert set(monte_carlo) >= {"payback_years", "self_consumption_pct", "vary_rates"}
+
+    with patch.dict(cfg.SIMULATION_PARAMS, {"monte_carlo_draws": 4, "monte_carlo_seed": 7}):
+        reseeded = run_reliable_analysis(2026, cache=cache, build_dir=build_dir)
+    assert reseeded["build"]["ran"] == ["economics", "report"]
+    assert reseeded["summary"]["monte_carlo"]["master_seed"] == 7
+
+    forced = run_reliable_analysis(2026, cache=cache, build_dir=build_dir, force=True)
+    assert forced["build"]["skipped"] == []
+    assert forced["summary"]["tariff"] == "flat"
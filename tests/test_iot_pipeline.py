@@ -1,7 +1,8 @@
 import datetime as dt
+import json
 import sys
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -36,3 +37,46 @@ def test_generate_solar_event_uses_turin_model(mock_build_live_panel_event, mock
     assert event["panel_power_kw"] == solar_producer.cfg.PANEL_PARAMS["panel_power_kw"]
     assert event["cloud_factor"] == 0.88
     assert event["production_kw"] > 0
+
+
+@patch("ingestion.iot.solar_producer.build_fleet_events")
+def test_generate_fleet_events_simulates_tick_once_for_all_panels(mock_build_fleet_events):
+    mock_build_fleet_events.return_value = [
+        {
+            "panel_id": panel_id,
+            "panel_power_kw": solar_producer.cfg.PANEL_PARAMS["panel_power_kw"],
+            "production_kw": 1.5,
+            "temperature_c": 18.0,
+            "cloud_factor": 0.9,
+            "temp_efficiency": 1.0,
+            "status": "active",
+            "city": "Turin",
+        }
+        for panel_id in solar_producer.PANEL_IDS
+    ]
+
+    events = solar_producer.generate_fleet_events()
+
+    mock_build_fleet_events.assert_called_once()
+    assert [event["panel_id"] for event in events] == solar_producer.PANEL_IDS
+    assert len({event["event_id"] for event in events}) == len(events)
+
+
+@patch("ingestion.iot.solar_producer.datetime")
+def test_send_event_stamps_each_event_when_it_is_produced(mock_datetime):
+    mock_datetime.now.side_effect = [
+        dt.datetime(2026, 4, 12, 12, 0, 0, tzinfo=dt.timezone.utc),
+        dt.datetime(2026, 4, 12, 12, 0, 2, tzinfo=dt.timezone.utc),
+    ]
+    producer = MagicMock()
+    batch = [
+        {"event_id": str(index), "panel_id": f"IoT-Data-Panel-00{index}", "timestamp": "stale", "production_kw": 1.0}
+        for index in (1, 2)
+    ]
+
+    sent = [solar_producer.send_event(producer, event) for event in batch]
+
+    assert [event["timestamp"] for event in sent] == ["2026-04-12T12:00:00+00:00", "2026-04-12T12:00:02+00:00"]
+    assert batch[0]["timestamp"] == "stale"
+    assert producer.produce.call_count == 2
+    assert json.loads(producer.produce.call_args.kwargs["value"])["timestamp"] == sent[1]["timestamp"]
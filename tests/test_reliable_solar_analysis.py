@@ -1,16 +1,68 @@
 import sys
-from datetime import datetime, timedelta
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from unittest.mock import patch
-from zoneinfo import ZoneInfoNotFoundError
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import pytest
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from solar_analysis_data.reliable_analysis import run_reliable_analysis
+from config import userdata_config as cfg
+from solar_analysis_data.artifacts import read_columns, read_frame, resolve_format, write_columns, write_frame
+from solar_analysis_data.battery import (
+    battery_capacities,
+    best_battery_configuration,
+    dispatch_battery,
+    evaluate_battery_grid,
+)
+from solar_analysis_data.community import Community, community_balance, simulate_community
+from solar_analysis_data.econ_sweep import sweep_economics
+from solar_analysis_data.energy_index import EnergyBalanceIndex
+from solar_analysis_data.ephemeris import solar_ephemeris
+from solar_analysis_data.fleet import WEATHER_COLUMNS, fleet_production, fleet_tick, generate_fleet, uniform_fleet
+from solar_analysis_data.load_profiles import load_profiles, year_calendar
+from solar_analysis_data.load_shifting import DeferrableLoad, shift_deferrable_loads
+from solar_analysis_data.monte_carlo import run_monte_carlo
+from solar_analysis_data.multi_year import simulate_years
+from solar_analysis_data.noise import HOURS, bulk_noise
+from solar_analysis_data.reliable_analysis import (
+    ScenarioEvaluator,
+    build_household_load,
+    energy_balance,
+    evaluate_system_size,
+    optimize_system_size,
+    run_reliable_analysis,
+    scenario_rank,
+)
+from solar_analysis_data.simulation_cache import SimulationCache, cache_key
+from solar_analysis_data.site_batch import SiteSpec, group_sites_by_location, plan_site_tasks, run_site_batch
+from solar_analysis_data.streaming import stream_simulation
+from solar_analysis_data.tariffs import band_tariff, f_band_masks, flat_tariff, price_curve_tariff
+from solar_analysis_data.timezones import fallback_timezone
 from solar_analysis_data.turin_model import (
     EuropeRomeFallbackTZ,
+    MONTHLY_NORMALS,
     TurinSimulationConfig,
+    build_fleet_events,
+    build_live_panel_event,
     generate_hourly_dataset,
+    simulate_hour,
+    solar_position,
+    stable_noise,
+)
+from solar_analysis_data.turin_vectorized import (
+    ROUNDED_FIELDS,
+    day_range,
+    frame_from_arrays,
+    generate_hourly_frame,
+    generate_hourly_rows,
+    rows_from_arrays,
+    simulate_days,
+    simulate_year,
 )
 
 
@@ -28,8 +80,456 @@ def test_generate_hourly_dataset_covers_full_year_with_day_night_behavior():
     assert june_noon["solar_elevation_deg"] > january_noon["solar_elevation_deg"]
 
 
-def test_run_reliable_analysis_writes_outputs_and_consistent_metrics():
-    result = run_reliable_analysis(2026)
+def test_vectorized_year_matches_scalar_model_within_rounding():
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    scalar_rows = generate_hourly_dataset(2026, config=config)
+    vector_rows = generate_hourly_rows(2026, config=config)
+
+    assert len(vector_rows) == len(scalar_rows)
+    for scalar, vector in zip(scalar_rows, vector_rows):
+        assert vector.keys() == scalar.keys()
+        assert vector["timestamp"] == scalar["timestamp"]
+        for name, digits in ROUNDED_FIELDS.items():
+            assert abs(vector[name] - scalar[name]) <= 10**-digits
+        assert abs(vector["humidity"] - scalar["humidity"]) <= 1
+        assert abs(vector["cloudcover"] - scalar["cloudcover"]) <= 1
+
+    arrays = simulate_year(2026, config=config)
+    assert arrays["production_kw"].shape == (365 * 24,)
+
+
+def test_bulk_noise_sha256_mode_reproduces_stable_noise_and_counter_mode_is_deterministic():
+    days = day_range(date(2026, 3, 1), 3)
+    grid = bulk_noise(2602, days, "wind", low=-1.7, high=1.7, hours=HOURS)
+    daily = bulk_noise(2602, days, "front", low=-20.0, high=20.0)
+
+    assert grid.shape == (3, 24)
+    assert grid[1, 7] == stable_noise(2602, days[1], 7, "wind", low=-1.7, high=1.7)
+    assert daily[2] == stable_noise(2602, days[2], "front", low=-20.0, high=20.0)
+
+    counter = bulk_noise(2602, days, "wind", low=-1.7, high=1.7, hours=HOURS, mode="counter")
+    assert (counter == bulk_noise(2602, days, "wind", low=-1.7, high=1.7, hours=HOURS, mode="counter")).all()
+    assert (counter >= -1.7).all() and (counter < 1.7).all()
+
+    config = replace(TurinSimulationConfig(), noise_mode="counter")
+    scalar_day = generate_hourly_dataset(2026, config=config)[:48]
+    assert generate_hourly_rows(2026, config=config)[:48] == scalar_day
+
+
+def test_simulate_years_parallel_chunks_match_serial_run_and_single_years():
+    config = TurinSimulationConfig(system_size_kw=3.0, noise_mode="counter")
+    parallel = simulate_years(2027, 2, config=config, max_workers=2, chunk="month")
+    serial = simulate_years(2027, 2, config=config, max_workers=1, chunk="year")
+    second_year = simulate_year(2028, config=config)
+
+    assert len(parallel["production_kw"]) == (365 + 366) * 24
+    for name, values in serial.items():
+        assert np.array_equal(parallel[name], values)
+        assert np.array_equal(parallel[name][365 * 24 :], second_year[name])
+
+
+def test_stream_simulation_yields_bounded_daily_chunks_matching_hourly_model():
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    hourly = simulate_year(2026, config=config)
+    chunks = stream_simulation(date(2026, 3, 28), date(2026, 3, 31), config=config, resolution_minutes=1)
+
+    for chunk in chunks:
+        assert chunk["production_kw"].shape == (24 * 60,)
+        start = (int(chunk["day_of_year"][0]) - 1) * 24
+        on_the_hour = chunk["minute"] == 0
+        for name in ("temperature", "cloudcover", "ghi_wm2", "production_kw"):
+            assert np.allclose(chunk[name][on_the_hour], hourly[name][start : start + 24])
+        assert np.abs(np.diff(chunk["temperature"])).max() < 0.5
+        assert np.isclose(chunk["interval_energy_kwh"].sum(), chunk["production_kw"].mean() * 24)
+
+    quarter_hours = next(stream_simulation(date(2026, 12, 31), date(2027, 1, 2), config=config))
+    assert len(quarter_hours["production_kw"]) == 96
+
+
+def test_simulation_cache_reuses_years_and_evicts_least_recently_used(tmp_path):
+    cache = SimulationCache(tmp_path, max_bytes=2**40)
+    config = TurinSimulationConfig(system_size_kw=3.0)
+
+    first = cache.get_or_simulate(2026, config=config)
+    second = cache.get_or_simulate(2026, config=config)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert (second["production_kw"] == first["production_kw"]).all()
+    assert second["production_kw"].filename is not None
+    assert cache_key(config, 2026) != cache_key(replace(config, seed=1), 2026)
+
+    cache.get_or_simulate(2026, config=replace(config, seed=1))
+    cache.max_bytes = cache.size_bytes() - 1
+    cache.get_or_simulate(2026, config=config)
+    evicted = cache.evict()
+
+    assert evicted == [cache_key(replace(config, seed=1), 2026)]
+    assert cache.load(2026, config) is not None
+
+
+def test_solar_ephemeris_is_shared_across_configs_and_matches_scalar_position():
+    config = TurinSimulationConfig()
+    table = solar_ephemeris(2026, config.latitude, config.longitude, config.timezone, tz=config.tzinfo)
+    tilted = replace(config, seed=7, panel_tilt_deg=20, system_size_kw=6.0)
+
+    assert solar_ephemeris(2026, tilted.latitude, tilted.longitude, tilted.timezone) is table
+    assert len(table) == 365 * 24
+
+    summer_noon = datetime(2026, 7, 15, 12, tzinfo=config.tzinfo)
+    cached = table.position_at(summer_noon)
+    direct = solar_position(summer_noon, config.latitude, config.longitude)
+    assert abs(cached["elevation_deg"] - direct["elevation_deg"]) < 1e-9
+    assert abs(cached["azimuth_deg"] - direct["azimuth_deg"]) < 1e-9
+    assert table.position_at(summer_noon.replace(minute=30)) is None
+
+
+def test_build_fleet_events_matches_per_panel_events():
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    when = datetime(2026, 6, 21, 13, 0, tzinfo=config.tzinfo)
+    panel_ids = [f"IoT-Data-Panel-{i:03d}" for i in range(1, 51)]
+
+    fleet = build_fleet_events(panel_ids, when=when, config=config)
+    singles = [build_live_panel_event(panel_id, when=when, config=config) for panel_id in panel_ids]
+
+    assert [event["panel_id"] for event in fleet] == panel_ids
+    for batched, single in zip(fleet, singles):
+        batched.pop("timestamp")
+        single.pop("timestamp")
+        assert batched == single
+    assert len({event["production_kw"] for event in fleet}) > 1
+
+    row_production = float(simulate_hour(when, config=config)["production_kw"])
+    for event in fleet:
+        variance = stable_noise(config.seed, event["panel_id"], "panel-variance", low=0.97, high=1.03)
+        assert event["production_kw"] == round(row_production * variance, 3)
+
+
+def test_fleet_model_matches_single_config_and_handles_heterogeneous_panels():
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    weather = simulate_year(2026, config=config)
+    uniform = uniform_fleet([f"IoT-Data-Panel-{i:03d}" for i in range(1, 11)], config=config)
+
+    production = fleet_production(uniform, weather, config=config)
+    assert production.shape == (365 * 24, 10)
+    assert abs(production.sum(axis=1) - weather["production_kw"]).max() < 1e-9
+
+    fleet = generate_fleet(2000, config=config, seed=11)
+    tick = fleet_tick(fleet, when=datetime(2026, 6, 21, 13, tzinfo=config.tzinfo), config=config)
+    assert tick.shape == (2000,)
+    assert (tick > 0).all()
+    assert tick.std() > 0
+    assert (fleet_tick(fleet.subset(slice(0, 5)), when=datetime(2026, 6, 21, 1, tzinfo=config.tzinfo)) == 0).all()
+
+    # A tick simulates only its hour and matches that hour of the full-day run.
+    day = simulate_days([date(2026, 6, 21)], config=config)
+    hour = {name: day[name][13:14] for name in WEATHER_COLUMNS}
+    assert np.array_equal(tick, fleet_production(fleet, hour, config=config)[0])
+
+    future = replace(uniform, install_year=np.full(10, 2027))
+    assert (fleet_production(future, weather, config=config) == 0).all()
+
+
+def test_run_site_batch_groups_shared_locations_and_keeps_input_order(tmp_path):
+    sunny = dict(MONTHLY_NORMALS, cloud_cover_pct=[value - 15 for value in MONTHLY_NORMALS["cloud_cover_pct"]])
+    sites = [
+        SiteSpec("Turin A", 45.0703, 7.6869),
+        SiteSpec("Palermo", 38.1157, 13.3615, monthly_normals=sunny),
+        SiteSpec("Turin B", 45.0703, 7.6869, system_size_kw=4.0, household_consumption_kwh=3500),
+    ]
+
+    assert [len(group) for group in group_sites_by_location(sites)] == [2, 1]
+
+    results = run_site_batch(sites, 2026, max_workers=2, candidate_sizes=[3.0, 4.0], cache_dir=tmp_path)
+
+    assert [result["site"] for result in results] == ["Turin A", "Palermo", "Turin B"]
+    turin, palermo, turin_b = (result["current_system"] for result in results)
+    assert palermo["annual_production_kwh"] > turin["annual_production_kwh"]
+    assert turin_b["panel_size_kw"] == 4.0
+    assert results[0]["optimal_system"]["panel_size_kw"] in (3.0, 4.0)
+
+
+def test_run_site_batch_splits_a_single_location_across_workers(tmp_path):
+    sites = [SiteSpec(f"Turin {size}", 45.0703, 7.6869 + 1e-12, system_size_kw=size) for size in (2.0, 3.0, 4.0, 5.0)]
+
+    chunks = plan_site_tasks(sites, 2)
+    assert len(group_sites_by_location(sites)) == 1
+    assert [[index for index, _ in chunk] for chunk in chunks] == [[0, 1], [2, 3]]
+
+    parallel = run_site_batch(sites, 2026, max_workers=2, candidate_sizes=[3.0], cache_dir=tmp_path / "parallel")
+    serial = run_site_batch(sites, 2026, max_workers=1, candidate_sizes=[3.0], cache_dir=tmp_path / "serial")
+    assert parallel == serial
+    assert [result["current_system"]["panel_size_kw"] for result in parallel] == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_hourly_frame_keeps_columns_typed_and_slices_without_copying():
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    arrays = simulate_year(2026, config=config)
+    frame = frame_from_arrays(arrays, config=config)
+    rows = list(frame.rows())
+
+    assert rows == rows_from_arrays(arrays, config=config) and len(frame) == len(rows) == 8760
+    assert list(rows[0]) == frame.fieldnames
+    assert frame["hour"].dtype == np.int8 and not frame["hour"].flags.writeable
+    assert np.shares_memory(frame["production_kw"], frame["hourly_production_kwh"])
+    assert frame.nbytes * 10 < sum(sys.getsizeof(row) + 32 * len(row) for row in rows)
+
+    july = frame.month(7)
+    assert len(july) == 31 * 24 and np.shares_memory(july["temperature"], frame["temperature"])
+    assert np.all(july["month"] == 7) and next(july.rows())["date"] == "2026-07-01"
+    day = frame.day(date(2026, 3, 29))
+    assert len(day) == 24 and {row["timestamp"][-6:] for row in day.rows()} == {"+01:00", "+02:00"}
+
+    build_household_load(frame, 2700)
+    assert frame.fieldnames[-1] == "load_kwh" and np.isclose(frame["load_kwh"].sum(), 2700)
+    assert frame.month(7)["load_kwh"].size == 31 * 24
+
+
+def test_frame_artifacts_round_trip_with_memory_mapped_column_selection(tmp_path):
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+
+    formats = ("npy", "parquet") if find_spec("pyarrow") else ("npy",)
+    for artifact_format in formats:
+        path = write_frame(frame, tmp_path / f"hourly_{artifact_format}", artifact_format=artifact_format)
+        loaded = read_frame(path)
+        assert loaded.city == frame.city and loaded.fieldnames == frame.fieldnames
+        assert list(loaded.rows()) == list(frame.rows())
+        assert np.shares_memory(loaded["production_kw"], loaded["solar_potential"])
+
+        selected = read_frame(path, columns=["month", "load_kwh", "hourly_production_kwh"])
+        assert list(selected.columns) == ["month", "load_kwh", "hourly_production_kwh"]
+        assert np.array_equal(selected.month(2)["load_kwh"], frame.month(2)["load_kwh"])
+
+    assert resolve_format() == "npy"
+    mapped, metadata = read_columns(write_columns({"hour": np.arange(48) % 24}, tmp_path / "plain", {"years": 2}))
+    assert isinstance(mapped["hour"], np.memmap) and metadata == {"years": 2}
+    with pytest.raises(KeyError):
+        read_columns(tmp_path / "plain.columns", columns=["missing"])
+
+    write_columns({"hour": np.arange(24)}, tmp_path / "plain", {"years": 1})
+    replaced, metadata = read_columns(tmp_path / "plain.columns")
+    assert len(replaced["hour"]) == 24 and metadata == {"years": 1}
+    assert not [entry.name for entry in tmp_path.iterdir() if entry.name.startswith(".")]
+
+
+def test_energy_balance_index_matches_row_scan_at_any_scale():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    index = EnergyBalanceIndex.from_frame(frame)
+
+    for scale in (0.0, 0.25, 1.0, 1.83, 4.0, 50.0):
+        expected = energy_balance(frame, scale)
+        actual = index.balance(scale)
+        assert actual.keys() == expected.keys()
+        for name, value in expected.items():
+            assert np.isclose(actual[name], value, rtol=1e-12, atol=1e-9)
+
+    batch = index.balances(np.array([0.5, 1.0]))
+    for position, scale in enumerate((0.5, 1.0)):
+        assert np.isclose(batch["annual_self_consumed_kwh"][position], index.balance(scale)["annual_self_consumed_kwh"])
+
+
+def test_an_index_without_producing_hours_is_used_as_given():
+    index = EnergyBalanceIndex.from_arrays(np.zeros(24), np.full(24, 0.5))
+    assert len(index) == 0
+
+    scenario = evaluate_system_size(None, 3.0, 3.0, index=index)
+    assert scenario["year_one"]["annual_production_kwh"] == 0.0
+    assert scenario["year_one"]["annual_imported_kwh"] == 12.0
+
+    evaluator = ScenarioEvaluator(None, 3.0, index=index)
+    assert evaluator.index is index
+    assert evaluator.evaluate(3.0)["year_one"] == scenario["year_one"]
+
+
+def test_optimize_system_size_matches_fine_grid_search_with_few_evaluations():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    evaluator = ScenarioEvaluator(frame, 3.0)
+    econ = {"sell_back_rate": 0.0, "incentive_rate": 0.0}
+
+    search = optimize_system_size(evaluator, low=0.5, high=8.0, econ=econ)
+    fine_grid = [evaluator.evaluate(round(0.5 + step * 0.01, 2), econ=econ) for step in range(751)]
+
+    assert search["evaluations"] < 100
+    assert 0.5 < search["optimal"]["panel_size_kw"] < 8.0 and not search["at_bound"]
+    assert search["optimal"]["npv_25_years_euro"] == max(fine_grid, key=scenario_rank)["npv_25_years_euro"]
+
+    clamped = optimize_system_size(evaluator, low=0.5, high=8.0)
+    assert clamped["optimal"]["panel_size_kw"] == 8.0 and clamped["at_bound"]
+
+
+def test_run_monte_carlo_is_reproducible_across_worker_counts():
+    config = TurinSimulationConfig(system_size_kw=3.0, noise_mode="counter")
+    parallel = run_monte_carlo(30, 2026, config=config, master_seed=7, vary_rates=True, max_workers=2)
+    serial = run_monte_carlo(30, 2026, config=config, master_seed=7, vary_rates=True, max_workers=1)
+    fixed_rates = run_monte_carlo(30, 2026, config=config, master_seed=7, max_workers=1)
+
+    assert parallel == serial
+    npv = parallel["npv_25_years_euro"]
+    assert npv["p10"] < npv["p50"] < npv["p90"]
+    assert parallel["self_consumption_pct"]["p10"] <= parallel["self_consumption_pct"]["p90"]
+    assert fixed_rates["annual_production_kwh"] == parallel["annual_production_kwh"]
+    assert fixed_rates["npv_25_years_euro"] != npv
+
+
+def test_sweep_economics_matches_scalar_evaluation_on_every_grid_cell():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    index = EnergyBalanceIndex.from_frame(frame)
+    grid = {"electricity_rate": [0.2, 0.3, 0.4], "sell_back_rate": [0.0, 0.1], "installation_cost_per_kw": [1800, 5000]}
+
+    sweep = sweep_economics(index, 4.0, 3.0, grid)
+
+    assert sweep["shape"] == (3, 2, 2)
+    for cell in np.ndindex(*sweep["shape"]):
+        econ = {name: values[position] for (name, values), position in zip(grid.items(), cell)}
+        scenario = evaluate_system_size(frame, 4.0, 3.0, econ=econ, index=index)
+        assert np.isclose(sweep["npv_25_years_euro"][cell], scenario["npv_25_years_euro"])
+        assert np.isclose(sweep["roi_20_years"][cell], scenario["roi_20_years"])
+        payback = sweep["payback_years"][cell]
+        assert (np.isnan(payback) and scenario["payback_years"] is None) or payback == scenario["payback_years"]
+
+
+def test_battery_grid_reduces_to_pv_only_economics_and_conserves_energy():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    production = frame["hourly_production_kwh"]
+    load = frame["load_kwh"]
+
+    grid = evaluate_battery_grid(production, load, [2.0, 4.0], [0.0, 5.0], 3.0)
+    for column, size in enumerate((2.0, 4.0)):
+        scenario = evaluate_system_size(frame, size, 3.0)
+        assert np.isclose(grid["npv_25_years_euro"][0, column], scenario["npv_25_years_euro"])
+        assert grid["self_consumption_pct"][1, column] > grid["self_consumption_pct"][0, column]
+
+    dispatch = dispatch_battery(production, load, np.array([1.0]), np.array([5.0]), efficiency=0.9)
+    discharged = dispatch["battery_discharged_kwh"]
+    direct = dispatch["annual_self_consumed_kwh"] - discharged
+    charged = dispatch["annual_production_kwh"] - direct - dispatch["annual_exported_kwh"]
+    assert np.all(discharged > 0)
+    assert np.all(charged * 0.9 - discharged >= -1e-9)
+    assert np.allclose(dispatch["annual_self_consumed_kwh"] + dispatch["annual_imported_kwh"], load.sum())
+
+
+def test_best_battery_configuration_breaks_npv_ties_by_payback_and_sizes_the_configured_battery():
+    grid = {
+        "capacities_kwh": np.array([0.0, 5.0]),
+        "system_sizes_kw": np.array([3.0, 4.0]),
+        "installation_cost_euro": np.array([[4500.0, 6000.0], [7000.0, 8500.0]]),
+        "self_consumption_pct": np.array([[40.0, 35.0], [60.0, 55.0]]),
+        "demand_coverage_pct": np.array([[30.0, 33.0], [45.0, 50.0]]),
+        "npv_25_years_euro": np.array([[900.0, 1200.0], [1200.0, 1100.0]]),
+        "payback_years": np.array([[9.0, 11.0], [10.0, np.nan]]),
+    }
+    best = best_battery_configuration(grid)
+    assert (best["battery_capacity_kwh"], best["panel_size_kw"], best["payback_years"]) == (5.0, 3.0, 10)
+
+    with patch.dict(cfg.BATTERY_PARAMS, {"battery_capacity_kwh": 6.0}):
+        assert battery_capacities() == [0.0, 2.5, 5.0, 6.0, 7.5, 10.0, 15.0]
+
+
+def test_load_profiles_scale_archetypes_per_household_and_repeat_with_a_seed():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    calendar = year_calendar(2026)
+    assert all(np.array_equal(calendar[name], values) for name, values in frame.calendar().items())
+
+    commuter = load_profiles(calendar, "commuter", 2700)[0]
+    assert np.allclose(commuter, frame["load_kwh"], atol=1e-6)
+
+    archetypes = ["commuter", "home_office", "retired", "electric_heating"] * 3
+    annual = np.linspace(1800, 5200, len(archetypes))
+    profiles = load_profiles(calendar, archetypes, annual, seed=11)
+    assert profiles.shape == (12, 8760) and np.all(profiles >= 0)
+    assert np.allclose(profiles.sum(axis=1), annual)
+    assert np.array_equal(profiles, load_profiles(calendar, archetypes, annual, seed=11))
+    assert not np.array_equal(profiles, load_profiles(calendar, archetypes, annual, seed=12))
+
+    exact = load_profiles(calendar, ["home_office", "electric_heating"], 3000)
+    january, july = calendar["month"] == 1, calendar["month"] == 7
+    midday = (calendar["hour"] >= 11) & (calendar["hour"] <= 15) & (calendar["weekday"] < 5)
+    assert exact[1, january].sum() / exact[1, july].sum() > 2 * commuter[january].sum() / commuter[july].sum()
+    assert exact[0, midday].sum() > commuter[midday].sum() * 3000 / 2700
+
+
+def test_shift_deferrable_loads_keeps_daily_energy_and_raises_self_consumption():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    production = frame["hourly_production_kwh"]
+    load = frame["load_kwh"]
+    loads = [
+        DeferrableLoad("ev_charger", 3.0, max_power_kw=2.3, window_start_hour=8, baseline_start_hour=19),
+        DeferrableLoad("appliances", daily_energy_kwh=0.9, max_power_kw=1.0, window_start_hour=8, window_end_hour=22),
+    ]
+
+    result = shift_deferrable_loads(production, load, loads)
+
+    ev_days = result["schedules"]["ev_charger"].reshape(-1, 24)
+    assert np.allclose(ev_days.sum(axis=1), 3.0)
+    assert ev_days.max() <= 2.3 + 1e-12 and ev_days[:, :8].sum() == 0
+    assert np.isclose(result["shifted_load_kwh"].sum(), result["baseline_load_kwh"].sum())
+    shifted, baseline = result["shifted_balance"], result["baseline_balance"]
+    assert shifted["annual_self_consumed_kwh"] > baseline["annual_self_consumed_kwh"]
+
+
+def test_tariffs_price_every_hour_through_the_index(tmp_path):
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    calendar = frame.calendar()
+
+    masks = f_band_masks(calendar)
+    assert np.all(masks.sum(axis=0) == 1)
+    easter_monday = calendar["day_ordinal"] == date(2026, 4, 6).toordinal()
+    assert masks[2, easter_monday].all() and masks[0].sum() == 254 * 11
+
+    flat = evaluate_system_size(frame, 4.0, 3.0)
+    flat_priced = evaluate_system_size(frame, 4.0, 3.0, tariff=flat_tariff(len(frame)))
+    assert np.isclose(flat_priced["npv_25_years_euro"], flat["npv_25_years_euro"])
+    curve_path = tmp_path / "prices.csv"
+    curve_path.write_text("import_price_euro_kwh\n" + "0.30\n" * len(frame), encoding="utf-8")
+    curve = evaluate_system_size(frame, 4.0, 3.0, tariff=price_curve_tariff(curve_path))
+    assert np.isclose(curve["npv_25_years_euro"], flat["npv_25_years_euro"])
+
+    bands = band_tariff(calendar)
+    scenario = evaluate_system_size(frame, 4.0, 3.0, tariff=bands)
+    production = frame["hourly_production_kwh"] * 4.0 / 3.0
+    load = frame["load_kwh"]
+    self_consumed, exported = np.minimum(production, load), np.maximum(production - load, 0.0)
+    incentive = min(exported.sum(), (load - self_consumed).sum()) * 0.12
+    expected = self_consumed @ bands.import_price() + exported @ bands.export_price() + incentive - 150
+    assert np.isclose(scenario["cash_flow"][1], expected) and scenario["tariff"] == "bands"
+
+    index = EnergyBalanceIndex.from_frame(frame)
+    sweep = sweep_economics(index, 4.0, 3.0, {"discount_rate": [0.02, 0.05]}, tariff=bands)
+    assert np.isclose(sweep["npv_25_years_euro"][0], scenario["npv_25_years_euro"])
+
+
+def test_community_shares_overlap_and_single_member_matches_household_economics():
+    frame = generate_hourly_frame(2026, config=TurinSimulationConfig(system_size_kw=3.0))
+    build_household_load(frame, 2700)
+    per_kw = frame["hourly_production_kwh"] / 3.0
+    load = frame["load_kwh"]
+
+    solo = Community(np.array(["solo"]), np.array([3.0]), load[None, :], per_kw)
+    result = simulate_community(solo, econ={"incentive_rate": 0.0})
+    scenario = evaluate_system_size(frame, 3.0, 3.0, econ={"incentive_rate": 0.0})
+    assert np.isclose(result["members"]["npv_25_years_euro"][0], scenario["npv_25_years_euro"])
+
+    community = Community(
+        np.array(["a", "b", "c"]), np.array([4.0, 0.0, 2.0]), np.stack([load, load * 1.5, load * 0.5]), per_kw
+    )
+    for allocation in ("export_share", "import_share", "equal"):
+        balance = community_balance(community, allocation=allocation)
+        assert np.isclose(balance["allocated_shared_kwh"].sum(), balance["shared_kwh"].sum())
+        assert np.all(balance["shared_kwh"] <= balance["exported_kwh"].sum() + 1e-9)
+    balance = community_balance(community)
+    assert balance["allocated_shared_kwh"][1] == 0 and balance["shared_kwh"].sum() > 0
+    assert np.allclose(balance["self_consumed_kwh"] + balance["imported_kwh"], balance["load_kwh"])
+
+
+def test_run_reliable_analysis_writes_outputs_and_consistent_metrics(tmp_path):
+    result = run_reliable_analysis(2026, cache=SimulationCache(tmp_path), build_dir=tmp_path / "build")
     summary = result["summary"]
     current = summary["current_system"]
     optimal = summary["optimal_system"]
@@ -42,6 +542,18 @@ def test_run_reliable_analysis_writes_outputs_and_consistent_metrics():
     assert 0 <= current["year_one"]["self_consumption_pct"] <= 100
     assert 0 <= optimal["year_one"]["demand_coverage_pct"] <= 100
     assert len(summary["monthly_summary"]) == 12
+    assert summary["scenario_cache"]["misses"] >= len(summary["sensitivity"])
+    assert summary["scenario_cache"]["hits"] >= 1
+    smart = summary["smart_scheduling"]
+    assert smart["shifted"]["self_consumption_pct"] >= smart["baseline"]["self_consumption_pct"]
+    assert summary["battery_sizing"]["best"]["battery_capacity_kwh"] in summary["battery_sizing"]["capacities_kwh"]
+    low, high = summary["size_search"]["bounds_kw"]
+    assert high == cfg.PANEL_PARAMS["max_power_by_area_kw"] == 3.55
+    assert low <= optimal["panel_size_kw"] <= high
+    assert summary["size_search"]["at_bound"] == (optimal["panel_size_kw"] in (low, high))
+    if summary["size_search"]["at_bound"]:
+        assert "BEST SIZE WITHIN LIMITS" in result["report_path"].read_text(encoding="utf-8")
+    assert optimal["npv_25_years_euro"] >= max(row["npv_25_years_euro"] for row in summary["sensitivity"]) - 0.5
 
 
 def test_turin_timezone_falls_back_without_tzdata():
@@ -54,3 +566,22 @@ def test_turin_timezone_falls_back_without_tzdata():
     summer = datetime(2026, 7, 15, 12, 0, tzinfo=tz)
     assert winter.utcoffset() == timedelta(hours=1)
     assert summer.utcoffset() == timedelta(hours=2)
+
+
+def test_eu_rule_fallback_matches_zoneinfo_across_transitions():
+    with patch("solar_analysis_data.turin_model.ZoneInfo", side_effect=ZoneInfoNotFoundError("missing tzdata")):
+        assert replace(TurinSimulationConfig(), timezone="Europe/Lisbon").tzinfo is fallback_timezone("Europe/Lisbon")
+
+    for key in ("Europe/Rome", "Europe/London", "Europe/Helsinki"):
+        real, fallback = ZoneInfo(key), fallback_timezone(key)
+        instant = datetime(2026, 3, 28, tzinfo=ZoneInfo("UTC"))
+        while instant < datetime(2026, 11, 1, tzinfo=ZoneInfo("UTC")):
+            expected, actual = instant.astimezone(real), instant.astimezone(fallback)
+            assert (actual.replace(tzinfo=None), actual.fold, actual.tzname()) == (
+                expected.replace(tzinfo=None),
+                expected.fold,
+                expected.tzname(),
+            )
+            wall_clock = expected.replace(tzinfo=None)
+            assert wall_clock.replace(tzinfo=fallback).utcoffset() == wall_clock.replace(tzinfo=real).utcoffset()
+            instant += timedelta(minutes=30)
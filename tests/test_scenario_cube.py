@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import userdata_config as cfg
+from solar_analysis_data.reliable_analysis import build_household_load, evaluate_system_size
+from solar_analysis_data.scenario_cube import build_scenario_cube, cube_sizes, read_scenario_cube, write_scenario_cube
+from solar_analysis_data.tariffs import band_tariff
+from solar_analysis_data.turin_model import TurinSimulationConfig
+from solar_analysis_data.turin_vectorized import frame_from_arrays, simulate_year
+
+
+def test_scenario_cube_round_trips_under_budget_and_brackets_the_hourly_model(tmp_path):
+    config = TurinSimulationConfig(system_size_kw=3.0)
+    frame = frame_from_arrays(simulate_year(2026, config=config), config=config)
+    build_household_load(frame, cfg.ECON_PARAMS["household_consumption"])
+    sizes = cube_sizes(1.0, 6.0, 0.5)
+    cube = build_scenario_cube(frame, 3.0, sizes, tariffs={"flat": None, "bands": band_tariff(frame.calendar())})
+
+    path = write_scenario_cube(cube, tmp_path / "cube.bin", max_bytes=16 * 1024)
+    loaded = read_scenario_cube(path)
+    npv = loaded["arrays"]["npv_25_years_euro"]
+    assert loaded["tariffs"] == ["flat", "bands"]
+    assert npv.shape == (2, len(sizes), len(loaded["self_consumption"]))
+    assert np.allclose(npv, cube["metrics"]["npv_25_years_euro"], rtol=1e-6)
+    assert np.all(np.diff(npv, axis=2) > 0)
+
+    # At the hourly model's own share the flat slice lands close to the full evaluation.
+    size_index = list(sizes).index(4.0)
+    share = loaded["arrays"]["modelled_self_consumption"][size_index]
+    interpolated = np.interp(share, loaded["self_consumption"], npv[0, size_index])
+    assert interpolated == pytest.approx(evaluate_system_size(frame, 4.0, 3.0)["npv_25_years_euro"], rel=0.03)
+
+    with pytest.raises(ValueError, match="budget"):
+        write_scenario_cube(cube, tmp_path / "too_big.bin", max_bytes=1024)
@@ -0,0 +1,50 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from solar_analysis_data.reliable_analysis import evaluate_system_size
+from solar_analysis_data.scenario_service import ScenarioService, json_safe, make_server
+from solar_analysis_data.simulation_cache import SimulationCache
+
+
+def test_scenario_service_answers_from_memory_with_lru_eviction(tmp_path):
+    service = ScenarioService.from_config(2026, cache=SimulationCache(tmp_path), max_entries=2)
+    flat = service.query(3.5)
+    expected = evaluate_system_size(service.frame, 3.5, service.base_system_size_kw)
+    assert flat["npv_25_years_euro"] == pytest.approx(expected["npv_25_years_euro"])
+    flat["year_one"]["annual_production_kwh"] = -1.0
+    cached = service.query(3.501)
+    assert cached["npv_25_years_euro"] == flat["npv_25_years_euro"] and cached["year_one"]["annual_production_kwh"] > 0
+
+    banded = service.query(3.5, tariff="bands")
+    assert banded["tariff"] == "bands" and banded["npv_25_years_euro"] != flat["npv_25_years_euro"]
+    battery = service.query(3.0, battery_kwh=5.0)["battery"]
+    assert battery["battery_capacity_kwh"] == 5.0 and battery["panel_size_kw"] == 3.0
+    assert service.stats() == {"entries": 2, "max_entries": 2, "hits": 1, "misses": 3, "hit_rate": 0.25}
+    service.query(3.5)
+    assert service.stats()["misses"] == 4
+    assert json_safe({"rate": float("inf"), "draws": [1.0, float("nan")]}) == {"rate": None, "draws": [1.0, None]}
+    with pytest.raises(ValueError):
+        service.query(3.5, tariff="bands", battery_kwh=5.0)
+
+    server = make_server(service, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urlopen(f"{base}/scenario?size_kw=3.5&tariff=bands") as response:
+            assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3001"
+            assert json.loads(response.read())["npv_25_years_euro"] == pytest.approx(banded["npv_25_years_euro"])
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{base}/scenario?size_kw=3.5&tariff=unknown")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()